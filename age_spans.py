@@ -0,0 +1,182 @@
+# age_spans.py
+"""
+Age / grade parsing shared by upload_to_sheets and the scrapers.
+
+AgeText scans a text once for the places an age phrase can start (digits,
+"age", "grade", "under", "teen", ...). Every age rule is compiled once at
+import and only tried at its own anchors, so a text with no digits or age
+words costs a single scan no matter how many rules there are:
+
+    at = AgeText(description)
+    m = at.first(RANGE_RE, "age")      # same groups as RANGE_RE.search(at.text)
+    spans = extract_year_spans(text)   # [(min_years, max_years), ...]
+
+extract_year_spans() returns exactly the list the old ten-regex
+upload_to_sheets._extract_year_spans built, in the same order.
+"""
+import re
+
+MONTH_WORDS = r"(?:months?|mos?|mths?|mo|m)"
+YEAR_WORDS  = r"(?:years?|yrs?|y)"
+
+# Anchor kinds: every rule below can only start where its kind was seen
+_ANCHOR_RE = re.compile(
+    r"(?=(?P<digit>\d)|(?P<age>age)|(?P<grade>grade)|(?P<under>under|younger)"
+    r"|(?P<pre>pre)|(?P<kindergarten>kindergarten)|(?P<k>k)|(?P<elementary>elementary)"
+    r"|(?P<middle>middle)|(?P<high>high)|(?P<tween>tween)|(?P<teen>teen))",
+    re.I,
+)
+
+# --- year-span rules (same patterns and flags as the original per-call f-strings) ---
+_MONTH_RANGE_RE = re.compile(rf"(\d{{1,2}})\s*(?:[-–]|to)\s*(\d{{1,2}})\s*{MONTH_WORDS}\b", re.I)
+_MONTH_SINGLE_RE = re.compile(rf"(\d{{1,2}})\s*{MONTH_WORDS}\b", re.I)
+_YEAR_RANGE_RE = re.compile(rf"(\d{{1,2}})\s*[-–]\s*(\d{{1,2}})\s*{YEAR_WORDS}\b", re.I)
+_AGES_RE = re.compile(
+    rf"""
+    ages?\s*[: ]*                           # allow optional colon after 'age/ages'
+    (?!\d+\s*(?:[-–]|to)\s*\d+\s*{MONTH_WORDS}\b)   # not "ages 12–24 months" OR "ages 12 to 24 months"
+    (?!\d+\s*{MONTH_WORDS}\b)                      # not "ages 12 months"
+    (?!\d+\s*to\s*\d+\s*{MONTH_WORDS}\b)           # extra guard: not "ages 6 to 24 months"
+    (\d{{1,2}})(?:\s*(?:[-–]|to)\s*(\d{{1,2}}))?
+    \b
+    """,
+    re.I | re.X,
+)
+_PLUS_RE = re.compile(rf"(\d{{1,2}})\s*\+\s*(?:{YEAR_WORDS})?(?!\s*{MONTH_WORDS})\b", re.I)
+# the optional "age"/"target age" prefix never changes the captured number, so
+# this rule is tried at digits only (see AgeText.finditer)
+_AND_UP_RE = re.compile(
+    rf"""
+    (?:age|ages|target\s*age)?\s*[: ]*
+    (\d{{1,2}})
+    (?!\s*{MONTH_WORDS}\b)                 # don't match "12 months and older"
+    \s*(?:and\s+(?:above|over|up)|or\s+older)\b
+    """,
+    re.I | re.X,
+)
+_PREK_RE = re.compile(r"\b(pre[-\s]?k|prek|prekinder(?:garten)?)\b")
+_KINDERGARTEN_RE = re.compile(r"\bkindergarten\b|\bK\b", re.I)
+_GRADES_RE = re.compile(r"grades?\s*(\d{1,2})(?:\s*[-–]\s*(\d{1,2}))?\b", re.I)
+_ELEMENTARY_RE = re.compile(r"\belementary\b")
+_MIDDLE_SCHOOL_RE = re.compile(r"\bmiddle\s+school\b")
+_HIGH_SCHOOL_RE = re.compile(r"\bhigh\s+school\b")
+_TWEEN_RE = re.compile(r"\btween[s]?\b")
+_TEEN_RE = re.compile(r"\bteen[s]?\b")
+
+
+class AgeText:
+    """Lowercased text plus the positions of each anchor kind, found in one scan."""
+
+    __slots__ = ("text", "anchors")
+
+    def __init__(self, text, lower=True):
+        t = text or ""
+        self.text = t.lower() if lower else t
+        anchors = {}
+        for m in _ANCHOR_RE.finditer(self.text):
+            anchors.setdefault(m.lastgroup, []).append(m.start())
+        self.anchors = anchors
+
+    def has(self, *kinds) -> bool:
+        return any(kind in self.anchors for kind in kinds)
+
+    def _positions(self, kinds):
+        if isinstance(kinds, str):
+            return self.anchors.get(kinds, ())
+        merged = set()
+        for kind in kinds:
+            merged.update(self.anchors.get(kind, ()))
+        return sorted(merged)
+
+    def first(self, pattern, kinds):
+        """
+        pattern.search(text), trying only the `kinds` anchors. Valid when every
+        match of pattern starts at such an anchor, or an optional prefix before
+        it ("for ", "and ") does not change the groups.
+        """
+        t = self.text
+        for pos in self._positions(kinds):
+            m = pattern.match(t, pos)
+            if m:
+                return m
+        return None
+
+    def finditer(self, pattern, kinds):
+        """pattern.finditer(text) under the same condition as first()."""
+        t = self.text
+        end = 0
+        for pos in self._positions(kinds):
+            if pos < end:
+                continue
+            m = pattern.match(t, pos)
+            if m:
+                end = m.end()
+                yield m
+
+    def search(self, pattern, kinds) -> bool:
+        return self.first(pattern, kinds) is not None
+
+
+def _grade_to_year_range(g: int):
+    # crude but reliable mapping: K≈5-5.99 (we’ll treat 'K' separately), Grade N ≈ (N+5) to (N+5.99)
+    start = g + 5
+    return (start, start + 0.99)
+
+
+def extract_year_spans(text):
+    """
+    Returns a list of (min_years, max_years) tuples derived from months/years/grades in text.
+    Months are converted to years. Also recognizes Pre-K/K/Grades and school level phrases.
+    Accepts a str or an AgeText.
+    """
+    at = text if isinstance(text, AgeText) else AgeText(text)
+    spans = []
+
+    if at.has("digit"):
+        # --- MONTHS FIRST (ranges, then singles) ---
+        for m in at.finditer(_MONTH_RANGE_RE, "digit"):
+            spans.append((int(m.group(1))/12.0, int(m.group(2))/12.0))
+        for m in at.finditer(_MONTH_SINGLE_RE, "digit"):
+            v = int(m.group(1))/12.0
+            spans.append((v, v))
+
+        # --- EXPLICIT YEARS ---
+        for m in at.finditer(_YEAR_RANGE_RE, "digit"):
+            spans.append((int(m.group(1)), int(m.group(2))))
+        for m in at.finditer(_AGES_RE, "age"):
+            a = int(m.group(1)); b = int(m.group(2) or a)
+            spans.append((a, b))
+
+        # "X+ years" — also guard against "X+ months"
+        for m in at.finditer(_PLUS_RE, "digit"):
+            spans.append((int(m.group(1)), 99))
+
+        # "X and above / X and up / X and over / X or older" (treat like 'X+'), BUT not months
+        for m in at.finditer(_AND_UP_RE, "digit"):
+            a = int(m.group(1))
+            # Keep this clamp if you DON'T want 'Adults 18+' added for phrases like "16 and up".
+            # If you do want Adults in those cases, change 17.99 to 99.
+            hi = 17.99 if 12 <= a <= 17 else 99
+            spans.append((a, hi))
+
+    # --- GRADES & SCHOOL LEVELS ---
+    if at.search(_PREK_RE, "pre"):                       spans.append((3.0, 4.99))
+    if at.search(_KINDERGARTEN_RE, ("kindergarten", "k")): spans.append((5.0, 5.99))
+    for m in at.finditer(_GRADES_RE, "grade"):
+        g1 = int(m.group(1)); g2 = int(m.group(2) or g1)
+        a1, b1 = _grade_to_year_range(g1); a2, b2 = _grade_to_year_range(g2)
+        spans.append((min(a1, a2), max(b1, b2)))
+    if at.search(_ELEMENTARY_RE, "elementary"):   spans.append((5.0, 10.99))
+    if at.search(_MIDDLE_SCHOOL_RE, "middle"):    spans.append((11.0, 13.99))
+    if at.search(_HIGH_SCHOOL_RE, "high"):        spans.append((14.0, 17.99))
+    if at.search(_TWEEN_RE, "tween"):             spans.append((9.0, 12.99))
+    if at.search(_TEEN_RE, "teen"):               spans.append((12.0, 17.99))
+
+    return spans
+
+
+# --- phrases the scrapers' extract_ages / helpers use (all start at their anchor) ---
+AGE_RANGE_RE = re.compile(r"ages?\s*(\d{1,2})\s*[-–to]+\s*(\d{1,2})")
+AGE_THROUGH_RE = re.compile(r"ages?\s*\d+\s*(through|to)\s*\d+")
+UNDER_RE = re.compile(r"(?:under|younger than|and under)\s*(\d{1,2})")
+GRADE_RANGE_RE = re.compile(r"grades?\s*(\d{1,2})(?:\s*[-–to]+\s*(\d{1,2}))?")
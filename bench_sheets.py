@@ -0,0 +1,162 @@
+# bench_sheets.py
+"""
+Time upload_libraries_to_sheet and export_events_to_csv against the offline
+fake_sheets backend (no Google credentials, nothing leaves the machine).
+
+    python bench_sheets.py --rows 10000 --new 1000
+    python bench_sheets.py --rows 100000 --latency 0.3 --error-rate 0.02
+
+Phases, all on the same fake Master sheet:
+  1. seed     — upload --rows synthetic events into an empty Master
+  2. rerun    — upload the same events again plus --new fresh ones
+  3. export   — export_events_to_csv (CSV parts + the "on site" flip)
+
+Each phase prints wall time and the Sheets calls/cells it cost. The local
+mirror lives in a temp dir, so runs never touch .master_mirror.sqlite3.
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+MASTER_HEADERS = [
+    "Event Name", "Event Link", "Event Status", "Time", "Ages", "Location",
+    "Month", "Day", "Year", "Event Description", "Series", "Program Type",
+    "Categories", "Last Updated", "Status", "Site Sync Status",
+]
+
+LIBRARIES = ["vbpl", "npl", "chpl", "nnpl", "hpl", "spl", "ppl"]
+
+TITLES = [
+    "Baby Storytime", "Toddler Time", "Lego Club", "Teen Anime Club", "Family Movie Night",
+    "STEM Explorers", "Homework Help", "Paws to Read", "Preschool Storytime", "Craft Corner",
+]
+AGES = ["Babies (0-2)", "Toddlers (2-3)", "Preschool (3-5)", "School Age (5-12)", "Teens (12-18)", "Family"]
+TIMES = ["10:00 am - 11:00 am", "2:00 pm - 3:30 pm", "6:30 pm - 7:30 pm", "11:00 am"]
+DESCRIPTIONS = [
+    "Stories, songs and rhymes for ages 0-24 months with a caregiver.",
+    "Build and create with LEGO bricks. Grades 1-5.",
+    "Join other teens ages 12-18 to watch and talk about anime.",
+    "A free family event for all ages. Snacks provided!",
+    "Hands-on science experiments for kids 6 and up.",
+]
+
+
+def synthetic_events(n, start=0, seed=1):
+    """{library: [event, ...]} with n events spread over LIBRARIES; links are unique per index."""
+    rng = random.Random(seed + start)
+    base = date.today()
+    by_library = {lib: [] for lib in LIBRARIES}
+    for i in range(start, start + n):
+        lib = LIBRARIES[i % len(LIBRARIES)]
+        day = base + timedelta(days=rng.randint(0, 90))
+        by_library[lib].append({
+            "Event Name": f"{rng.choice(TITLES)} #{i}",
+            "Event Link": f"https://bench.example.org/{lib}/event/{i}",
+            "Event Status": "Available",
+            "Time": rng.choice(TIMES),
+            "Ages": rng.choice(AGES),
+            "Location": "Main Library",
+            "Month": day.strftime("%b"),
+            "Day": str(day.day),
+            "Year": str(day.year),
+            "Event Description": rng.choice(DESCRIPTIONS),
+            "Series": "",
+            "Program Type": "",
+            "Categories": "",
+        })
+    return by_library
+
+
+def _merge(a, b):
+    return {lib: a.get(lib, []) + b.get(lib, []) for lib in LIBRARIES}
+
+
+def _delta(before, after):
+    calls = {k: v - before["calls"].get(k, 0) for k, v in after["calls"].items()}
+    errors = {k: v - before["errors"].get(k, 0) for k, v in after["errors"].items()}
+    return {
+        "calls": {k: v for k, v in calls.items() if v},
+        "errors": {k: v for k, v in errors.items() if v},
+        "cells_read": after["cells_read"] - before["cells_read"],
+        "cells_written": after["cells_written"] - before["cells_written"],
+        "rows": after["rows"],
+    }
+
+
+def _phase(name, sheet, fn, quiet):
+    before = sheet.stats()
+    out = io.StringIO()
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(out) if quiet else contextlib.nullcontext():
+        fn()
+    elapsed = time.perf_counter() - started
+    d = _delta(before, sheet.stats())
+    print(f"⏱️ {name:<8} {elapsed:8.2f}s  rows={d['rows']:<7} "
+          f"cells read={d['cells_read']:<9} written={d['cells_written']:<9} "
+          f"calls={d['calls']} 429s={d['errors']}")
+    return elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000, help="events seeded into Master")
+    parser.add_argument("--new", type=int, default=1000, help="fresh events in the rerun")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per fake Sheets call")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of calls answered 429")
+    parser.add_argument("--quota", type=int, default=0, help="fake per-minute quota (0 = unlimited)")
+    parser.add_argument("--read-mode", default=None, help="MASTER_SNAPSHOT_READ: mirror / index / full")
+    parser.add_argument("--skip-export", action="store_true")
+    parser.add_argument("--verbose", action="store_true", help="show the upload/export logs")
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="bench_sheets_")
+    # module-level settings are read at import time
+    os.environ["MASTER_MIRROR_PATH"] = os.path.join(workdir, "mirror.sqlite3")
+    os.environ.setdefault("SHEETS_BASE_BACKOFF", "0.2")
+    if args.read_mode:
+        os.environ["MASTER_SNAPSHOT_READ"] = args.read_mode
+
+    import fake_sheets
+    import sheets_client
+    import upload_to_sheets
+
+    backend = fake_sheets.FakeBackend(latency=args.latency, error_rate=args.error_rate,
+                                      quota_per_min=args.quota, seed=0)
+    sheets_client.set_backend(backend)
+    master = sheets_client.worksheet(upload_to_sheets.MASTER_WORKSHEET_NAME,
+                                     key=upload_to_sheets.MASTER_SPREADSHEET_ID,
+                                     name=upload_to_sheets.MASTER_SPREADSHEET_NAME)
+    master.load([MASTER_HEADERS])
+
+    seed_events = synthetic_events(args.rows)
+    rerun_events = _merge(seed_events, synthetic_events(args.new, start=args.rows))
+    quiet = not args.verbose
+
+    print(f"🧪 Fake Master: {args.rows} seeded + {args.new} new events, latency={args.latency}s, "
+          f"error rate={args.error_rate}, quota={args.quota or 'unlimited'}/min")
+    _phase("seed", master, lambda: upload_to_sheets.upload_libraries_to_sheet(seed_events, sheet=master), quiet)
+    _phase("rerun", master, lambda: upload_to_sheets.upload_libraries_to_sheet(rerun_events, sheet=master), quiet)
+
+    if not args.skip_export:
+        import export_to_csv
+        cwd = os.getcwd()
+        os.chdir(workdir)   # export writes its CSV parts to the working directory
+        try:
+            _phase("export", master, lambda: export_to_csv.export_events_to_csv(
+                library="master", return_df=True, needs_bucket=[], send_email=False), quiet)
+        finally:
+            os.chdir(cwd)
+
+    print(f"📁 Bench files in {workdir}")
+    sheets_client.set_backend(None)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
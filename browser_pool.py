@@ -0,0 +1,189 @@
+# browser_pool.py
+"""
+One headless Chromium per process, shared by every Playwright scraper.
+
+The browser lives on a dedicated event-loop thread, so sync scrapers (SPL's
+fallback, called from run_all_scrapers' worker threads) and async ones
+(scrape_vbpl, the NNPL preview) can all use it. Each caller gets its own
+isolated BrowserContext with request routing that drops images, media, fonts
+and analytics beacons, and map_pages() drives N detail tabs at once:
+
+    async def _scrape_on_pool(pool):
+        async with pool.context() as ctx:
+            page = await ctx.new_page()
+            ...
+            return await pool.map_pages(ctx, links, _read_detail)
+
+    events = browser_pool.run(_scrape_on_pool)            # from sync code
+    events = await browser_pool.submit(_scrape_on_pool)   # from any asyncio loop
+
+If Chromium dies mid-run it is relaunched for the next context.
+"""
+import asyncio
+import atexit
+import os
+import threading
+from contextlib import asynccontextmanager
+from urllib.parse import urlsplit
+
+# Detail tabs open at once inside one map_pages() call
+DETAIL_TABS = int(os.environ.get("BROWSER_DETAIL_TABS", "4"))
+# Contexts alive at once across all scrapers (bounds Chromium memory)
+MAX_CONTEXTS = int(os.environ.get("BROWSER_MAX_CONTEXTS", "3"))
+# Stylesheets stay on by default: some waits rely on CSS visibility
+BLOCK_CSS = os.environ.get("BROWSER_BLOCK_CSS", "").lower() in ("1", "true", "yes")
+
+LAUNCH_ARGS = ["--disable-dev-shm-usage", "--disable-gpu"]
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font"} | ({"stylesheet"} if BLOCK_CSS else set())
+BLOCKED_HOSTS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "facebook.net",
+    "facebook.com",
+    "hotjar.com",
+    "newrelic.com",
+    "nr-data.net",
+    "siteimproveanalytics.com",
+    "addthis.com",
+    "sharethis.com",
+)
+
+
+def _is_blocked(request) -> bool:
+    if request.resource_type in BLOCKED_RESOURCE_TYPES:
+        return True
+    host = (urlsplit(request.url).netloc or "").lower()
+    return any(host == h or host.endswith("." + h) for h in BLOCKED_HOSTS)
+
+
+async def _route(route):
+    if _is_blocked(route.request):
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+class BrowserPool:
+    """Lives on the pool thread's loop; only touch it from coroutines run there."""
+
+    def __init__(self):
+        self._playwright = None
+        self._browser = None
+        self._launch_lock = asyncio.Lock()
+        self._contexts = asyncio.Semaphore(max(1, MAX_CONTEXTS))
+
+    async def browser(self):
+        async with self._launch_lock:
+            if self._browser is None or not self._browser.is_connected():
+                if self._playwright is None:
+                    from playwright.async_api import async_playwright
+                    self._playwright = await async_playwright().start()
+                if self._browser is not None:
+                    print("♻️ Chromium disconnected; relaunching.")
+                print("🧭 Launching shared Chromium...")
+                self._browser = await self._playwright.chromium.launch(headless=True, args=LAUNCH_ARGS)
+            return self._browser
+
+    @asynccontextmanager
+    async def context(self, **kwargs):
+        """Fresh isolated context with resource blocking; closed on exit."""
+        async with self._contexts:
+            browser = await self.browser()
+            ctx = await browser.new_context(**kwargs)
+            await ctx.route("**/*", _route)
+            try:
+                yield ctx
+            finally:
+                try:
+                    await ctx.close()
+                except Exception:
+                    pass
+
+    async def map_pages(self, ctx, items, fn, tabs=DETAIL_TABS):
+        """
+        await fn(page, item) for every item, each in its own tab, at most `tabs`
+        open at once. Results come back in item order; a failed item gives None.
+        """
+        limit = asyncio.Semaphore(max(1, tabs))
+
+        async def one(item):
+            async with limit:
+                page = await ctx.new_page()
+                try:
+                    return await fn(page, item)
+                except Exception as e:
+                    print(f"⚠️ Browser tab failed: {e}")
+                    return None
+                finally:
+                    await page.close()
+
+        return await asyncio.gather(*(one(item) for item in items))
+
+    async def close(self):
+        if self._browser is not None:
+            try:
+                await self._browser.close()
+            except Exception:
+                pass
+            self._browser = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+
+_loop = None
+_pool = None
+_thread = None
+_start_lock = threading.Lock()
+
+
+def _ensure_started():
+    global _loop, _thread
+    with _start_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def _serve():
+                global _pool
+                asyncio.set_event_loop(_loop)
+                _pool = BrowserPool()
+                ready.set()
+                _loop.run_forever()
+
+            _thread = threading.Thread(target=_serve, name="browser-pool", daemon=True)
+            _thread.start()
+            ready.wait()
+    return _loop
+
+
+def run(fn, *args, **kwargs):
+    """Run `await fn(pool, *args, **kwargs)` on the pool loop and block for the result."""
+    loop = _ensure_started()
+    return asyncio.run_coroutine_threadsafe(fn(_pool, *args, **kwargs), loop).result()
+
+
+async def submit(fn, *args, **kwargs):
+    """Async twin of run(), awaitable from any other event loop."""
+    loop = _ensure_started()
+    future = asyncio.run_coroutine_threadsafe(fn(_pool, *args, **kwargs), loop)
+    return await asyncio.wrap_future(future)
+
+
+def close():
+    """Shut Chromium and the pool thread down (also runs at interpreter exit)."""
+    global _loop, _pool, _thread
+    with _start_lock:
+        if _loop is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(_pool.close(), _loop).result(timeout=30)
+        except Exception as e:
+            print(f"⚠️ Browser pool shutdown: {e}")
+        _loop.call_soon_threadsafe(_loop.stop)
+        _thread.join(timeout=5)
+        _loop, _pool, _thread = None, None, None
+
+
+atexit.register(close)
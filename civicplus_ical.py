@@ -0,0 +1,367 @@
+# civicplus_ical.py
+"""
+One source adapter for CivicPlus town calendars (iCalendar.aspx feeds).
+
+Every site is a CIVICPLUS_SITES entry: its base URL, the category feeds to
+read and a few per-site filters. All feeds of a site are fetched at once
+(conditional GETs, paced per host by http_client), then streamed in config
+order through ical_stream and merged through one UID/EID index, so an event
+listed under several categories becomes one row. Venue names come from
+LIBRARY_CONSTANTS[<site>]["venue_names"], base tags from its
+"always_on_categories".
+
+Adding another CivicPlus town = a new CIVICPLUS_SITES entry + constants block.
+"""
+import os
+import re, html
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import http_client
+import ical_stream
+import library_rules
+from age_spans import AgeText, AGE_RANGE_RE, UNDER_RE, GRADE_RANGE_RE
+from constants import UNWANTED_TITLE_KEYWORDS
+
+EASTERN = ZoneInfo("America/New_York")
+
+FEED_WORKERS = int(os.environ.get("CIVICPLUS_FEED_WORKERS", "8"))
+
+FEED_PATH = "/common/modules/iCalendar/iCalendar.aspx?catID={cid}&feed=calendar"
+
+CIVICPLUS_SITES = {
+    "visitnorfolk": {
+        "label": "VisitNorfolk",
+        "base_url": "https://www.norfolk.gov",
+        "cat_ids": ["24", "152", "75", "145", "163"],
+        # 🚫 Skip events that start at 7:00 PM or later (keep true all-day events)
+        "skip_after_7pm": True,
+        "skip_unwanted_titles": True,
+        "unwanted_locations": {
+            "endtime united church of jesus",
+            "pretlow branch library",
+        },
+    },
+    "visityorktown": {
+        "label": "VisitYorktown",
+        "base_url": "https://www.visityorktown.org",
+        "cat_ids": ["36", "25", "37", "26", "28", "29", "30", "31", "40", "14", "32", "33", "39"],
+        "skip_after_7pm": False,
+        "skip_unwanted_titles": False,
+        "unwanted_locations": set(),
+    },
+}
+
+# Some LOCATION values include HTML like <p>Venue</p> - 123 St
+TAG_RE = re.compile(r"<[^>]+>")
+
+ADDR_SPLIT_RE = re.compile(r"\s[-–]\s")   # "Venue - 123 St" or "Venue – 123 St"
+
+# Age bucket → audience tags (the site's location tag is appended per site)
+AGE_AUDIENCE_TAGS = {
+    "Infant":       "Audience > Audience - Toddler/Infant, Audience > Audience - Free Event",
+    "Preschool":    "Audience > Audience - Preschool Age, Audience > Audience - Free Event, Audience > Audience - Parent & Me",
+    "School Age":   "Audience > Audience - School Age, Audience > Audience - Free Event",
+    "Tweens":       "Audience > Audience - School Age, Audience > Audience - Free Event",
+    "Teens":        "Audience > Audience - Teens, Audience > Audience - Free Event",
+    "All Ages":     "Audience > Audience - Free Event",
+    "Adults 18+":   "Audience > Audience - Free Event",
+}
+
+
+def feed_urls(site: dict):
+    return [site["base_url"] + FEED_PATH.format(cid=cid) for cid in site["cat_ids"]]
+
+
+def _starts_at_or_after_7pm_local(dt):
+    """Return True if the datetime (any tz) is 7:00 PM or later in EASTERN."""
+    if not isinstance(dt, datetime):
+        return False
+    local = dt.astimezone(EASTERN)
+    return (local.hour > 19) or (local.hour == 19 and local.minute >= 0)
+
+def _strip_address(loc: str) -> str:
+    """
+    Keep just the venue name:
+    - If there's a " - " or " – " separator, take the left side.
+    - Otherwise, if there's a street number (space + 2–5 digits), cut before it.
+      (Prevents chopping names like 'Studio 54' which have digits but not as an address.)
+    """
+    s = _clean_text(loc)
+    # Case 1: split on hyphen/en dash separators
+    parts = ADDR_SPLIT_RE.split(s, maxsplit=1)
+    if len(parts) == 2:
+        return parts[0].strip()
+
+    # Case 2: trim when an address number appears after a space (e.g., "Venue 4320 Hampton Blvd")
+    m = re.search(r"\s\d{2,5}\b", s)
+    if m:
+        return s[:m.start()].rstrip()
+
+    return s
+
+def _clean_text(s: str) -> str:
+    if not s:
+        return ""
+    s = html.unescape(s)
+    s = TAG_RE.sub("", s)
+    s = re.sub(r"\s+", " ", s).strip()
+    return s
+
+def _fmt_time_range(start_dt, end_dt):
+    """Return 'H:MM AM - H:MM PM'. If end missing or == start, synthesize +60m."""
+    if not start_dt:
+        return ""
+    s_local = start_dt.astimezone(EASTERN)
+    if end_dt:
+        e_local = end_dt.astimezone(EASTERN)
+        if e_local == s_local:
+            e_local = s_local + timedelta(hours=1)
+    else:
+        e_local = s_local + timedelta(hours=1)
+    s = s_local.strftime("%-I:%M %p")
+    e = e_local.strftime("%-I:%M %p")
+    return f"{s} - {e}"
+
+def _infer_ages(text: str) -> str:
+    """Infer age buckets from title+description."""
+    t = (text or "").lower()
+    buckets = set()
+
+    # explicit ranges like "ages 6-11" or "ages 6 to 11"
+    at = AgeText(t)
+    m = at.first(AGE_RANGE_RE, "age")
+    if m:
+        high = int(m.group(2))
+        if high <= 3: buckets.add("Infant")
+        elif high <= 5: buckets.add("Preschool")
+        elif high <= 12: buckets.add("School Age")
+        elif high <= 17: buckets.add("Teens")
+        else: buckets.add("Adults 18+")
+
+    # "under X" / "X and under"
+    m = at.first(UNDER_RE, "under")
+    if m:
+        age = int(m.group(1))
+        if age <= 3: buckets.add("Infant")
+        elif age <= 5: buckets.add("Preschool")
+        else: buckets.add("School Age")
+
+    # grade ranges (e.g., grades 3-5)
+    gm = at.first(GRADE_RANGE_RE, "grade")
+    if gm:
+        start_g = int(gm.group(1))
+        end_g = int(gm.group(2)) if gm.group(2) else start_g
+        if end_g <= 5: buckets.add("School Age")
+        else: buckets.add("Teens")
+
+    # keyword-based signals
+    if any(k in t for k in ["infants", "babies", "baby", "0-2"]): buckets.add("Infant")
+    if any(k in t for k in ["toddlers", "toddler", "preschool", "3-5", "ages 3-5", "2-3", "age 2", "age 3"]): buckets.add("Preschool")
+    if any(k in t for k in ["school age", "elementary", "grade", "5-8", "ages 5"]): buckets.add("School Age")
+    if any(k in t for k in ["tween", "tweens", "middle school"]): buckets.add("Tweens")
+    if any(k in t for k in ["teen", "teens", "high school", "young adult"]): buckets.add("Teens")
+    if "all ages" in t: buckets.add("All Ages")
+
+    # Return sorted, comma-separated
+    return ", ".join(sorted(buckets))
+
+def _age_to_categories(ages_str: str, location_tag: str):
+    """Map inferred age buckets to category tags for one site."""
+    out = []
+    for a in [x.strip() for x in (ages_str or "").split(",") if x.strip()]:
+        if a in AGE_AUDIENCE_TAGS:
+            out.extend([c.strip() for c in AGE_AUDIENCE_TAGS[a].split(",")])
+            out.append(location_tag)
+    return out
+
+def _keyword_categories(title: str, desc: str):
+    """Map keywords to categories using constants.TITLE_KEYWORD_TO_CATEGORY."""
+    txt = f"{title} {desc}".lower()
+    tags = []
+    for kw, cat in library_rules.TITLE_KEYWORD_TAGS:
+        if kw in txt:
+            tags.extend(cat)
+    return tags
+
+def _dedupe_preserve_order(items):
+    seen, out = set(), []
+    for x in items:
+        if x and x not in seen:
+            out.append(x); seen.add(x)
+    return out
+
+def _is_cancelled(name: str, desc: str) -> bool:
+    t = f"{name} {desc}".lower()
+    return ("canceled" in t) or ("cancelled" in t)
+
+def _eid_link_re(base_url: str):
+    # canonical event links like: https://www.norfolk.gov/calendar.aspx?EID=14902
+    return re.compile(re.escape(base_url) + r"/calendar\.aspx\?EID=\d+")
+
+def _canonical_link(description: str, uid: str, base_url: str, eid_re) -> str:
+    m = eid_re.search(description or "")
+    if m:
+        return m.group(0)
+    # Fallback: build from numeric UID if present
+    if uid and uid.isdigit():
+        return f"{base_url}/calendar.aspx?EID={uid}"
+    # Last resort: empty string (will be skipped by uploader if missing)
+    return ""
+
+def _fetch_feed(url):
+    """Feed text or the exception (so one bad category feed doesn't sink the batch)."""
+    try:
+        # Conditional GET: an unchanged feed is served from the local copy
+        return http_client.get_feed(url, timeout=30)
+    except Exception as e:
+        return e
+
+def _fetch_feeds(urls):
+    with ThreadPoolExecutor(max_workers=max(1, min(FEED_WORKERS, len(urls)))) as executor:
+        return list(executor.map(_fetch_feed, urls))
+
+def scrape_civicplus_site(library: str, mode="all"):
+    """
+    Scrape one CIVICPLUS_SITES entry and return normalized events.
+    Returns a list of dicts ready for upload_to_sheets.py.
+    """
+    site = CIVICPLUS_SITES[library]
+    label = site["label"]
+    base_url = site["base_url"]
+    eid_re = _eid_link_re(base_url)
+    site_rules = library_rules.rules_for(library)
+    venue_map = site_rules.venue_names
+    always_on = list(site_rules.always_on_categories)
+    location_tag = next((t for t in always_on if t.startswith("Event Location")), "")
+
+    print(f"🗓️  Scraping {label} iCal feeds…")
+
+    today_utc = datetime.now(timezone.utc)
+    if mode == "weekly":
+        date_start = today_utc
+        date_end   = today_utc + timedelta(days=7)
+    elif mode == "monthly":
+        date_start = today_utc
+        date_end   = today_utc + timedelta(days=30)   # rolling 30 days
+    else:
+        date_start = today_utc
+        date_end   = today_utc + timedelta(days=90)
+
+    urls = feed_urls(site)
+    texts = _fetch_feeds(urls)
+
+    events = []
+    # one index across every feed: numeric UID (== EID on CivicPlus) and canonical link
+    seen_uids = set()
+    seen_links = set()
+
+    for url, feed_text in zip(urls, texts):
+        if isinstance(feed_text, Exception):
+            print(f"❌ Failed to fetch iCal: {url} — {feed_text}")
+            continue
+        try:
+            for ev in ical_stream.iter_vevents(feed_text, since=date_start, until=date_end):
+                try:
+                    if not ev.begin:
+                        continue
+
+                    uid = _clean_text(ev.uid or "")
+                    if uid and uid in seen_uids:
+                        continue
+
+                    start_dt = ev.begin
+                    end_dt   = ev.end
+
+                    start_utc = start_dt.astimezone(timezone.utc)
+                    if not (date_start <= start_utc <= date_end):
+                        continue
+
+                    if site["skip_after_7pm"]:
+                        is_all_day = bool(ev.all_day)
+
+                        # Heuristic to treat all-day iCal (00:00 start and ~24h duration) as all-day
+                        if not is_all_day:
+                            try:
+                                if start_dt and end_dt:
+                                    dur = (end_dt - start_dt)
+                                    if start_dt.time().hour == 0 and start_dt.time().minute == 0 and dur >= timedelta(hours=23):
+                                        is_all_day = True
+                            except Exception:
+                                pass
+
+                        if not is_all_day and _starts_at_or_after_7pm_local(start_dt):
+                            print(f"⏭️ Skipping late event (>=7 PM): {ev.name} @ {start_dt.astimezone(EASTERN).strftime('%-I:%M %p')}")
+                            continue
+
+                    title = _clean_text(ev.name or "")
+                    description = _clean_text(ev.description or "")
+                    location = _clean_text(ev.location or "")
+
+                    # 🚫 Skip unwanted title keywords
+                    if site["skip_unwanted_titles"] and any(bad_word.lower() in title.lower() for bad_word in UNWANTED_TITLE_KEYWORDS):
+                        print(f"⏭️ Skipping (unwanted title match): {title}")
+                        continue
+
+                    # Normalize location against constants
+                    location = venue_map.get(location, location)
+
+                    # strip any appended address, then remove any leading stray hyphen
+                    location = _strip_address(location)
+                    location = re.sub(r"^\s*-\s*", "", location)
+
+                    # 🚫 Skip events at unwanted locations
+                    if any(bad in location.lower() for bad in site["unwanted_locations"]):
+                        print(f"⏭️ Skipping (unwanted location): {title} @ {location}")
+                        continue
+
+                    # Build canonical link
+                    link = _canonical_link(description, uid, base_url, eid_re)
+                    if not link:
+                        # If we truly can't get a canonical link, skip (uploader expects a link key)
+                        print(f"⏭️  Skipping (no link): {title}")
+                        continue
+
+                    if link in seen_links:
+                        continue
+                    seen_links.add(link)
+                    if uid:
+                        seen_uids.add(uid)
+
+                    # Time & date parts
+                    time_str = _fmt_time_range(start_dt, end_dt)
+                    start_local = start_dt.astimezone(EASTERN)
+                    end_local = (end_dt.astimezone(EASTERN) if end_dt else start_local + timedelta(hours=1))
+
+                    # Ages + categories
+                    ages = _infer_ages(f"{title} {description}")
+                    keyword_tags = _keyword_categories(title, description)
+                    age_tags = _age_to_categories(ages, location_tag)
+
+                    all_tags = _dedupe_preserve_order(always_on + keyword_tags + age_tags)
+
+                    events.append({
+                        "Event Name": title,
+                        "Event Link": link,
+                        "Event Status": "Cancelled" if _is_cancelled(title, description) else "Available",
+                        "Time": time_str,
+                        "Ages": ages,                           # keep raw inferred ages; uploader augments categories too
+                        "Location": location,
+                        "Month": start_local.strftime("%b"),
+                        "Day": str(start_local.day),
+                        "Year": str(start_local.year),
+                        "Event Date": start_local.strftime("%Y-%m-%d"),
+                        "Event End Date": end_local.strftime("%Y-%m-%d"),
+                        "Event Description": description,
+                        "Series": "",
+                        "Program Type": "",
+                        "Categories": ", ".join(all_tags),
+                    })
+                except Exception as e:
+                    print(f"⚠️  Error parsing event in {url}: {e}")
+        except Exception as e:
+            print(f"❌ Failed to read iCal: {url} — {e}")
+
+    print(f"✅ Scraped {len(events)} {label} events.")
+    return events
@@ -1,10 +1,8 @@
-import gspread
 import pandas as pd
 from datetime import datetime, timedelta
 import base64
 import os
 import json
-from google.oauth2 import service_account
 from googleapiclient.discovery import build
 from googleapiclient.http import MediaFileUpload
 import smtplib
@@ -12,15 +10,16 @@ from email.mime.text import MIMEText
 import re
 from config import get_library_config
 from constants import LIBRARY_CONSTANTS
-from gspread.utils import rowcol_to_a1
+from gspread.utils import rowcol_to_a1, a1_to_rowcol
 import unicodedata
 from email.mime.base import MIMEBase
 from email import encoders
 from email.mime.multipart import MIMEMultipart
-import time
-from gspread.exceptions import APIError
 import html
 from urllib.parse import urlsplit, urlunsplit
+import sheet_mirror
+import sheets_io
+import sheets_client
 
 STRICT_VENUE_LIBS = {"vbpl", "npl", "chpl", "nnpl", "hpl", "spl", "ppl"}
 NEEDS_ATTENTION_EMAIL = os.environ.get("NEEDS_ATTENTION_EMAIL")  # set in Render
@@ -83,29 +82,8 @@ def _to_his(time_str: str) -> str:
     return ""
 
 
-def _infer_library_from_url(u: str):
-    u = (u or "").lower()
-    # Library-specific URL fingerprints
-    if "vbpl.librarymarket.com" in u: return "vbpl"
-    if "chesapeakelibrary.libnet.info" in u or "chesapeake.librarycalendar.com" in u: return "chpl"
-    if "norfolk.libcal.com" in u: return "npl"
-    if "suffolkpubliclibrary" in u: return "spl"
-    if "portsmouthpubliclibrary" in u: return "ppl"
-    if "calendar.hampton.gov" in u: return "hpl"
-    if "calendar.nnpl.org" in u: return "nnpl"
-    if "poquoson.librarycalendar.com" in u: return "poquosonpl"
-    if "yorkcountyva.librarycalendar.com" in u: return "ypl"
-    if "portsvaevents" in u: return "portsvaevents"
-    if "visithampton" in u: return "visithampton"
-    if "apm.activecommunities.com/vbparksrec" in u: return "vbpr"
-    if "visitchesapeake.com" in u: return "visitchesapeake"
-    if "visitnewportnews.com" in u: return "visitnewportnews"
-    if "visitsuffolkva.com" in u: return "visitsuffolk"
-    if "norfolk.gov" in u: return "visitnorfolk"
-    if "visityorktown.org" in u: return "visityorktown"
-    if "langleylibrary.org" in u: return "langleylibrary"
-        
-    return None
+# URL fingerprints live with the Master mirror, which indexes rows by library
+_infer_library_from_url = sheet_mirror.library_for_link
 
 def _infer_library_from_venue(v: str):
     v = (v or "").lower()
@@ -141,31 +119,80 @@ def _write_chunked_csvs(df, base_name: str, library: str, chunk_size: int = 100)
 
 
 def _open_target_sheet(client, spreadsheet_name, worksheet_name):
+    # handles come from the process-wide cache; `client` is kept for callers
     if USE_MASTER_SHEET:
-        if MASTER_SPREADSHEET_ID:
-            return _retry(client.open_by_key, MASTER_SPREADSHEET_ID).worksheet(MASTER_WORKSHEET_NAME)
-        return _retry(client.open, MASTER_SPREADSHEET_NAME).worksheet(MASTER_WORKSHEET_NAME)
+        return _open_master_sheet(client)
     # legacy (not used when USE_MASTER_SHEET=True)
-    return _retry(client.open, spreadsheet_name).worksheet(worksheet_name)
+    return sheets_client.worksheet(worksheet_name, name=spreadsheet_name)
 
-def _open_master_sheet(client):
-    if MASTER_SPREADSHEET_ID:
-        return _retry(client.open_by_key, MASTER_SPREADSHEET_ID).worksheet(MASTER_WORKSHEET_NAME)
-    return _retry(client.open, MASTER_SPREADSHEET_NAME).worksheet(MASTER_WORKSHEET_NAME)
+def _open_master_sheet(client=None):
+    return sheets_client.worksheet(MASTER_WORKSHEET_NAME, key=MASTER_SPREADSHEET_ID, name=MASTER_SPREADSHEET_NAME)
 
-def _retry(fn, *args, **kwargs):
-    delay = 6
-    for attempt in range(6):
+def _read_master_grid(sheet):
+    """
+    The Master grid (get_all_values shape), from the local mirror when it is
+    available (re-read only if the sheet changed), else one full read.
+    Records and the "on site" flip are both built from it. Returns (values, mirror|None).
+    """
+    mirror = sheet_mirror.get_mirror()
+    if mirror is not None:
         try:
-            return fn(*args, **kwargs)
-        except APIError as e:
-            if "429" in str(e):
-                sleep_for = delay * (attempt + 1)
-                print(f"⏳ Sheets 429 rate limit; retrying in {sleep_for}s...")
-                time.sleep(sleep_for)
-                continue
-            raise
-    raise
+            _retry(mirror.sync, sheet)
+            return mirror.values(), mirror
+        except Exception as e:
+            print(f"⚠️ Master mirror unavailable ({e}); reading the sheet")
+    return _retry(sheet.get_all_values), None
+
+
+FLIP_MAX_RANGES = int(os.environ.get("FLIP_MAX_RANGES", "200"))    # ranges per batch_update
+FLIP_MAX_CELLS = int(os.environ.get("FLIP_MAX_CELLS", "5000"))     # cells per batch_update
+
+
+def _coalesce_column_ranges(row_nums, col, value):
+    """Rows to set in one column → [{"range": "P5:P9", "values": [[v]]*5}, ...], one per contiguous run."""
+    updates = []
+    rows = sorted(set(row_nums))
+    i = 0
+    while i < len(rows):
+        j = i
+        while j + 1 < len(rows) and rows[j + 1] == rows[j] + 1:
+            j += 1
+        start, end = rows[i], rows[j]
+        a1 = rowcol_to_a1(start, col) if start == end else f"{rowcol_to_a1(start, col)}:{rowcol_to_a1(end, col)}"
+        updates.append({"range": a1, "values": [[value]] * (end - start + 1)})
+        i = j + 1
+    return updates
+
+
+def _chunk_updates(updates, max_ranges=None, max_cells=None):
+    """Split batch_update payloads so none exceeds max_ranges ranges or max_cells cells (runs are split too)."""
+    max_ranges = max_ranges or FLIP_MAX_RANGES
+    max_cells = max_cells or FLIP_MAX_CELLS
+    pieces = []
+    for u in updates:
+        r1, c1 = a1_to_rowcol(u["range"].split(":")[0])
+        values = u["values"]
+        for k in range(0, len(values), max_cells):
+            part = values[k:k + max_cells]
+            start = rowcol_to_a1(r1 + k, c1)
+            a1 = start if len(part) == 1 else f"{start}:{rowcol_to_a1(r1 + k + len(part) - 1, c1)}"
+            pieces.append({"range": a1, "values": part})
+
+    chunks, current, cells = [], [], 0
+    for piece in pieces:
+        n = len(piece["values"])
+        if current and (len(current) >= max_ranges or cells + n > max_cells):
+            chunks.append(current)
+            current, cells = [], 0
+        current.append(piece)
+        cells += n
+    if current:
+        chunks.append(current)
+    return chunks
+
+def _retry(fn, *args, **kwargs):
+    """Sheets read through the shared quota/backoff scheduler (writes use sheets_io.write)."""
+    return sheets_io.read(fn, *args, **kwargs)
 
 
 def send_notification_email_with_attachment(file_path, subject, recipient):
@@ -318,20 +345,13 @@ def send_notification_email(file_url, subject, recipient):
 def export_events_to_csv(library="master", return_df=False, needs_bucket=None, send_email=True):
     use_master = USE_MASTER_SHEET or (str(library).strip().lower() == "master")
 
-    creds = service_account.Credentials.from_service_account_file(
-        "/etc/secrets/GOOGLE_APPLICATION_CREDENTIALS_JSON",
-        scopes=[
-            "https://www.googleapis.com/auth/spreadsheets",
-            "https://www.googleapis.com/auth/drive",
-            "https://www.googleapis.com/auth/gmail.send"
-        ]
-    )
-    client = gspread.authorize(creds)
+    client = sheets_client.get_client()
 
     if use_master:
         # Read everything from Master; no per-library config/constants
         sheet = _open_master_sheet(client)
-        df = pd.DataFrame(_retry(sheet.get_all_records))
+        values, mirror = _read_master_grid(sheet)
+        df = pd.DataFrame(sheet_mirror.records_from_values(values))
         organizer_name = os.environ.get("MASTER_ORGANIZER_NAME", "Master Events")
         constants = {}
         name_suffix_map = {}
@@ -344,8 +364,9 @@ def export_events_to_csv(library="master", return_df=False, needs_bucket=None, s
         suffix = config.get("event_name_suffix", "")
         organizer_name = config["organizer_name"]
 
-        sheet = _retry(client.open, config["spreadsheet_name"]).worksheet(config["worksheet_name"])
-        df = pd.DataFrame(_retry(sheet.get_all_records))
+        sheet = _open_target_sheet(client, config["spreadsheet_name"], config["worksheet_name"])
+        values, mirror = _retry(sheet.get_all_values), None
+        df = pd.DataFrame(sheet_mirror.records_from_values(values))
 
     # If you ever want to export only one library’s rows from Master, uncomment:
     # if use_master and "Library" in df.columns and library not in (None, "", "master", "ALL"):
@@ -729,7 +750,7 @@ def export_events_to_csv(library="master", return_df=False, needs_bucket=None, s
     df.loc[:, "Site Sync Status"] = "on site"
     
     # ✅ Mark exported rows as "on site" in the SHEET using (link + date [+ time]) keys
-    values = _retry(sheet.get_all_values)  # full grid
+    # reuse the grid the records were built from (no second download)
     if values:
         headers = values[0]
     
@@ -772,22 +793,31 @@ def export_events_to_csv(library="master", return_df=False, needs_bucket=None, s
             df_years  = df["Year"].astype(str).str.strip()
             df_times  = df["Time"].astype(str).str.strip() if "Time" in df.columns else pd.Series([""] * len(df), index=df.index)
     
-            updates, missing = [], []
+            flip_rows, missing = [], []
             for link, m, d, y, t in zip(df_links, df_months, df_days, df_years, df_times):
                 key_with_time = (link, m, d, y, t)
                 key_no_time   = (link, m, d, y, "")
                 rows = key_to_rows.get(key_with_time) or key_to_rows.get(key_no_time)
                 if rows:
-                    for row_num in rows:
-                        a1 = rowcol_to_a1(row_num, c_sync + 1)
-                        updates.append({"range": a1, "values": [["on site"]]})
+                    flip_rows.extend(rows)
                 else:
                     missing.append(key_with_time)
                     print("⚠️ flip-miss link:", link)
-    
+
+            # contiguous rows → one column range; big payloads split into several calls
+            updates = _coalesce_column_ranges(flip_rows, c_sync + 1, "on site")
             if updates:
-                _retry(sheet.batch_update, [{"range": u["range"], "values": u["values"]} for u in updates])
-                print(f"✅ Flipped {len(updates)} exported rows to 'on site'.")
+                chunks = _chunk_updates(updates)
+                # still at the version the mirror synced? then the version after the flip is ours
+                clean = mirror is not None and _retry(mirror.is_current, sheet)
+                for chunk in chunks:
+                    sheets_io.write(sheet.batch_update, chunk)
+                    if mirror is not None:
+                        mirror.apply_values(chunk)
+                if mirror is not None:
+                    _retry(mirror.settle, sheet, clean)
+                print(f"✅ Flipped {len(set(flip_rows))} exported rows to 'on site' "
+                      f"({len(updates)} ranges, {len(chunks)} request(s)).")
             if missing:
                 print(f"🔎 {len(missing)} exported rows not found for flip (showing 5): {missing[:5]}")
     else:
@@ -0,0 +1,295 @@
+# fake_sheets.py
+"""
+Offline stand-in for the gspread worksheets upload/export use, so both can
+be run and timed without Google credentials.
+
+FakeWorksheet keeps the grid in memory and implements the subset the repo
+calls: get_all_values, get_all_records, batch_get, batch_update,
+append_rows, append_row, row_values (plus .id/.title/.spreadsheet with
+get_lastUpdateTime, which sheet_mirror uses to detect remote changes).
+Each call can be slowed down and made to fail the way Sheets does:
+
+    FAKE_SHEETS_LATENCY=0.2         seconds added to every call
+    FAKE_SHEETS_ERROR_RATE=0.02     share of calls answered with a 429
+    FAKE_SHEETS_QUOTA_PER_MIN=60    reads/writes per minute before 429s
+
+Plug it in through sheets_client so every connect_* / _open_* helper
+returns fake worksheets:
+
+    backend = fake_sheets.FakeBackend(latency=0.1)
+    backend.worksheet("Master Events").load(rows)
+    sheets_client.set_backend(backend)
+
+Errors raised are FakeAPIError with .response.status_code / .headers, which
+sheets_io retries exactly like gspread's APIError.
+"""
+import os
+import random
+import re
+import threading
+import time
+from collections import Counter, deque
+from itertools import count
+
+LATENCY = float(os.environ.get("FAKE_SHEETS_LATENCY", "0"))
+ERROR_RATE = float(os.environ.get("FAKE_SHEETS_ERROR_RATE", "0"))
+QUOTA_PER_MIN = int(os.environ.get("FAKE_SHEETS_QUOTA_PER_MIN", "0"))   # 0 = unlimited
+RETRY_AFTER = os.environ.get("FAKE_SHEETS_RETRY_AFTER", "1")
+
+WRITE_METHODS = {"batch_update", "append_rows", "append_row"}
+
+_RANGE_RE = re.compile(r"(?:.*!)?([A-Z]+)(\d*)(?::([A-Z]+)(\d*))?$")
+_ids = count(1)
+
+
+def _col_number(letters):
+    n = 0
+    for ch in letters:
+        n = n * 26 + (ord(ch) - 64)
+    return n
+
+
+def _col_letters(n):
+    out = ""
+    while n:
+        n, rem = divmod(n - 1, 26)
+        out = chr(65 + rem) + out
+    return out
+
+
+def _parse_range(a1, n_rows):
+    """'A5:P9' / "'Tab'!B2:D" / 'P7' → (row, col, end_row, end_col), 1-based; open ends run to n_rows."""
+    m = _RANGE_RE.match((a1 or "").replace("$", "").upper())
+    if not m:
+        raise ValueError(f"unsupported range: {a1!r}")
+    c1 = _col_number(m.group(1))
+    r1 = int(m.group(2) or 1)
+    if m.group(3) is None:
+        return r1, c1, r1, c1
+    c2 = _col_number(m.group(3))
+    r2 = int(m.group(4)) if m.group(4) else max(n_rows, r1)
+    return r1, c1, r2, c2
+
+
+def _trim(block):
+    """Drop trailing empty cells and rows, like the Sheets values API."""
+    out = []
+    for row in block:
+        end = len(row)
+        while end and row[end - 1] in ("", None):
+            end -= 1
+        out.append(row[:end])
+    while out and not out[-1]:
+        out.pop()
+    return out
+
+
+class _Response:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class FakeAPIError(Exception):
+    """Shaped like gspread.exceptions.APIError for sheets_io._status_of / _retry_after."""
+
+    def __init__(self, status_code, message, retry_after=None):
+        super().__init__(f"{status_code}: {message}")
+        headers = {"Retry-After": str(retry_after)} if retry_after is not None else {}
+        self.response = _Response(status_code, headers)
+        self.code = status_code
+
+
+class FakeSpreadsheet:
+    def __init__(self, title="Master Events", key=None):
+        self.title = title
+        self.id = key or f"fake-{next(_ids)}"
+        self._version = 0
+        self._lock = threading.Lock()
+
+    def touch(self):
+        with self._lock:
+            self._version += 1
+
+    def get_lastUpdateTime(self):
+        return f"fake-v{self._version}"
+
+
+class FakeWorksheet:
+    """In-memory worksheet with gspread's method names and Sheets-like trimming/appends."""
+
+    def __init__(self, title="Master Events", spreadsheet=None, rows=None,
+                 latency=None, error_rate=None, quota_per_min=None, seed=None):
+        self.title = title
+        self.id = next(_ids)
+        self.spreadsheet = spreadsheet or FakeSpreadsheet(title)
+        self.latency = LATENCY if latency is None else latency
+        self.error_rate = ERROR_RATE if error_rate is None else error_rate
+        self.quota_per_min = QUOTA_PER_MIN if quota_per_min is None else quota_per_min
+        self.calls = Counter()        # method → calls that went through
+        self.errors = Counter()       # method → simulated 429s
+        self.cells_read = 0
+        self.cells_written = 0
+        self._grid = []
+        self._random = random.Random(seed)
+        self._windows = {"read": deque(), "write": deque()}
+        self._lock = threading.Lock()
+        if rows:
+            self.load(rows)
+
+    # --- test/benchmark helpers (no latency, no errors) ---
+    def load(self, rows):
+        """Replace the grid with `rows` (header first)."""
+        with self._lock:
+            self._grid = [["" if v is None else str(v) for v in row] for row in rows]
+        self.spreadsheet.touch()
+        return self
+
+    def snapshot(self):
+        with self._lock:
+            return [list(row) for row in self._grid]
+
+    def stats(self):
+        return {
+            "calls": dict(self.calls),
+            "errors": dict(self.errors),
+            "cells_read": self.cells_read,
+            "cells_written": self.cells_written,
+            "rows": len(self._grid),
+        }
+
+    # --- simulated API behaviour ---
+    def _enter(self, method):
+        if self.latency:
+            time.sleep(self.latency)
+        kind = "write" if method in WRITE_METHODS else "read"
+        with self._lock:
+            if self.quota_per_min:
+                window = self._windows[kind]
+                now = time.monotonic()
+                while window and now - window[0] >= 60:
+                    window.popleft()
+                if len(window) >= self.quota_per_min:
+                    self.errors[method] += 1
+                    raise FakeAPIError(429, f"Quota exceeded for {kind} requests per minute",
+                                       retry_after=RETRY_AFTER)
+                window.append(now)
+            if self.error_rate and self._random.random() < self.error_rate:
+                self.errors[method] += 1
+                raise FakeAPIError(429, "Simulated rate limit", retry_after=RETRY_AFTER)
+            self.calls[method] += 1
+
+    def _block(self, r1, c1, r2, c2):
+        out = []
+        for r in range(r1 - 1, min(r2, len(self._grid))):
+            row = self._grid[r]
+            out.append(row[c1 - 1:c2])
+        return out
+
+    def _write_block(self, r1, c1, values):
+        for i, row_values in enumerate(values):
+            r = r1 - 1 + i
+            while len(self._grid) <= r:
+                self._grid.append([])
+            row = self._grid[r]
+            end = c1 - 1 + len(row_values)
+            if len(row) < end:
+                row.extend([""] * (end - len(row)))
+            row[c1 - 1:end] = ["" if v is None else str(v) for v in row_values]
+            self.cells_written += len(row_values)
+
+    def _last_row(self):
+        for r in range(len(self._grid), 0, -1):
+            if any(v not in ("", None) for v in self._grid[r - 1]):
+                return r
+        return 0
+
+    # --- gspread subset ---
+    def get_all_values(self, **kwargs):
+        self._enter("get_all_values")
+        with self._lock:
+            rows = self._grid[:self._last_row()]
+            width = max((len(row) for row in rows), default=0)
+            out = [list(row) + [""] * (width - len(row)) for row in rows]
+            self.cells_read += width * len(out)
+        return out
+
+    def get_all_records(self, **kwargs):
+        from sheet_mirror import records_from_values   # gspread-style numericised records
+        return records_from_values(self.get_all_values())
+
+    def batch_get(self, ranges, **kwargs):
+        self._enter("batch_get")
+        out = []
+        with self._lock:
+            n_rows = self._last_row()
+            for a1 in ranges:
+                block = _trim(self._block(*_parse_range(a1, n_rows)))
+                self.cells_read += sum(len(row) for row in block)
+                out.append(block)
+        return out
+
+    def row_values(self, row, **kwargs):
+        self._enter("row_values")
+        with self._lock:
+            block = _trim(self._block(row, 1, row, 10 ** 4))
+        return block[0] if block else []
+
+    def batch_update(self, data, **kwargs):
+        self._enter("batch_update")
+        cells = 0
+        with self._lock:
+            n_rows = self._last_row()
+            for request in data:
+                r1, c1, _, _ = _parse_range(request["range"], n_rows)
+                self._write_block(r1, c1, request["values"])
+                cells += sum(len(row) for row in request["values"])
+        self.spreadsheet.touch()
+        return {"totalUpdatedRanges": len(data), "totalUpdatedCells": cells}
+
+    def append_rows(self, values, value_input_option="RAW", **kwargs):
+        self._enter("append_rows")
+        with self._lock:
+            start = self._last_row() + 1
+            self._write_block(start, 1, values)
+            width = max((len(row) for row in values), default=1)
+            end = start + len(values) - 1
+        self.spreadsheet.touch()
+        return {
+            "tableRange": f"'{self.title}'!A1:{_col_letters(width)}{start - 1}",
+            "updates": {
+                "updatedRange": f"'{self.title}'!A{start}:{_col_letters(width)}{end}",
+                "updatedRows": len(values),
+            },
+        }
+
+    def append_row(self, values, value_input_option="RAW", **kwargs):
+        return self.append_rows([values], value_input_option=value_input_option, **kwargs)
+
+
+class FakeBackend:
+    """sheets_client backend: worksheets created on first use, shared per spreadsheet."""
+
+    def __init__(self, **worksheet_options):
+        self.worksheet_options = worksheet_options
+        self._spreadsheets = {}
+        self._worksheets = {}
+        self._lock = threading.Lock()
+
+    def client(self):
+        return self
+
+    def worksheet(self, worksheet_name, key=None, name=None):
+        book_key = key or name or "default"
+        with self._lock:
+            book = self._spreadsheets.get(book_key)
+            if book is None:
+                book = self._spreadsheets[book_key] = FakeSpreadsheet(name or worksheet_name, key=key)
+            ws = self._worksheets.get((book_key, worksheet_name))
+            if ws is None:
+                ws = FakeWorksheet(worksheet_name, spreadsheet=book, **self.worksheet_options)
+                self._worksheets[(book_key, worksheet_name)] = ws
+            return ws
+
+    def worksheets(self):
+        return dict(self._worksheets)
@@ -1,6 +1,7 @@
 import json, requests, os
 import re
 from typing import Dict, Optional
+from age_spans import AgeText
 from datetime import datetime, timedelta
 
 
@@ -125,6 +126,10 @@ _AGE_BUCKETS = [
     (13, 18, "Audience - Teens"),
 ]
 
+_AGES_AND_UP_RE = re.compile(r"(?:for\s+)?ages?\s*(\d{1,2})\s*(?:\+|and\s+up)\b")
+_AGES_RANGE_RE = re.compile(r"(?:for\s+)?ages?\s*(\d{1,2})\s*(?:-|to|through)\s*(\d{1,2})\b")
+_AGES_SINGLE_RE = re.compile(r"(?:for\s+)?ages?\s*(\d{1,2})\b(?!\s*(?:\+|and\s+up|-|to|through))")
+
 def infer_age_categories_from_description(description: str) -> Dict[str, Optional[str]]:
     """
     Parse a description for phrases like:
@@ -146,23 +151,26 @@ def infer_age_categories_from_description(description: str) -> Dict[str, Optiona
     txt = txt.replace("–", "-").replace("—", "-")  # normalize dashes
 
     min_age = max_age = None
+    at = AgeText(txt)
+    if not (at.has("age") and at.has("digit")):
+        return {"min_age": None, "max_age": None, "categories": ""}
 
     # Case A: "ages 7 and up" / "age 7+" / "ages 7+"
-    m = re.search(r"(?:for\s+)?ages?\s*(\d{1,2})\s*(?:\+|and\s+up)\b", txt)
+    m = at.first(_AGES_AND_UP_RE, "age")
     if m:
         min_age = int(m.group(1))
         max_age = 18
 
     # Case B: "ages 2-4" / "ages 2 to 4" / "ages 2 through 4"
     if min_age is None:
-        m = re.search(r"(?:for\s+)?ages?\s*(\d{1,2})\s*(?:-|to|through)\s*(\d{1,2})\b", txt)
+        m = at.first(_AGES_RANGE_RE, "age")
         if m:
             a, b = int(m.group(1)), int(m.group(2))
             min_age, max_age = (a, b) if a <= b else (b, a)
 
     # Case C: single age "for ages 3" / "age 3"
     if min_age is None:
-        m = re.search(r"(?:for\s+)?ages?\s*(\d{1,2})\b(?!\s*(?:\+|and\s+up|-|to|through))", txt)
+        m = at.first(_AGES_SINGLE_RE, "age")
         if m:
             min_age = max_age = int(m.group(1))
 
@@ -0,0 +1,221 @@
+# http_cache.py
+"""
+Persistent on-disk cache for scraper GETs (mostly event detail pages).
+
+Bodies are zlib-compressed into one SQLite file keyed by sha256(url). Each
+source has its own TTL (CACHE_TTLS); when the file grows past
+HTTP_CACHE_MAX_BYTES the least-recently-used entries are evicted. Hit/miss
+counters are kept per source for the end-of-run summary.
+
+Used through http_client:  http_client.get(url, cache="vbpl")
+
+Feeds (iCal) are kept separately: their ETag/Last-Modified validators plus
+the pickled parse result, so http_client.get_feed can answer a 304 without
+downloading or re-parsing anything.
+"""
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import zlib
+
+CACHE_PATH = os.environ.get("HTTP_CACHE_PATH", ".http_cache.sqlite3")
+CACHE_MAX_BYTES = int(os.environ.get("HTTP_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+CACHE_DISABLED = os.environ.get("HTTP_CACHE_DISABLED", "").lower() in ("1", "true", "yes")
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+# Seconds a cached body stays fresh, per source
+CACHE_TTLS = {
+    "vbpl": 3 * DAY,
+    "ypl": 3 * DAY,
+    "poquosonpl": 3 * DAY,
+    "portsvaevents": 2 * DAY,
+    "chpl": 3 * DAY,
+    "npl": 7 * DAY,
+    "ppl": 3 * DAY,
+    "visithampton": 2 * DAY,
+    "spl": 3 * DAY,
+}
+DEFAULT_TTL = DAY
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key           TEXT PRIMARY KEY,
+    source        TEXT,
+    url           TEXT,
+    status        INTEGER,
+    headers       TEXT,
+    body          BLOB,
+    size          INTEGER,
+    fetched_at    REAL,
+    last_access   REAL
+);
+CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access);
+CREATE TABLE IF NOT EXISTS feeds (
+    url           TEXT PRIMARY KEY,
+    etag          TEXT,
+    last_modified TEXT,
+    parser        TEXT,
+    body          BLOB,
+    parsed        BLOB,
+    fetched_at    REAL
+);
+"""
+
+
+def cache_key(url: str) -> str:
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    def __init__(self, path=CACHE_PATH, max_bytes=CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = None
+        self.hits = {}
+        self.misses = {}
+
+    def _db(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+        return self._conn
+
+    def _count(self, counter, source):
+        counter[source] = counter.get(source, 0) + 1
+
+    def get(self, url, source, ttl=None):
+        """Fresh entry → dict(status, headers, body, url, fetched_at); else None."""
+        ttl = CACHE_TTLS.get(source, DEFAULT_TTL) if ttl is None else ttl
+        key = cache_key(url)
+        now = time.time()
+        with self._lock:
+            row = self._db().execute(
+                "SELECT status, headers, body, fetched_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if not row or now - row[3] > ttl:
+                self._count(self.misses, source)
+                return None
+            self._db().execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self._count(self.hits, source)
+        status, headers, body, fetched_at = row
+        return {
+            "url": url,
+            "status": status,
+            "headers": json.loads(headers or "{}"),
+            "body": zlib.decompress(body),
+            "fetched_at": fetched_at,
+        }
+
+    def put(self, url, source, status, headers, body: bytes):
+        blob = zlib.compress(body or b"", 6)
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            db.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, source, url, status, headers, body, size, fetched_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (cache_key(url), source, url, status, json.dumps(dict(headers or {})),
+                 blob, len(blob), now, now),
+            )
+            self._evict(db)
+
+    def _evict(self, db):
+        total = db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # drop least-recently-used rows until we're back under budget
+        freed = 0
+        doomed = []
+        for key, size in db.execute("SELECT key, size FROM responses ORDER BY last_access ASC"):
+            doomed.append((key,))
+            freed += size
+            if total - freed <= self.max_bytes:
+                break
+        db.executemany("DELETE FROM responses WHERE key = ?", doomed)
+
+    # ── feeds (conditional GET) ──────────────────────────────────────
+    def get_feed(self, url, parser=""):
+        """Stored validators/body/parsed result for a feed URL, or None."""
+        with self._lock:
+            row = self._db().execute(
+                "SELECT etag, last_modified, parser, body, parsed FROM feeds WHERE url = ?", (url,)
+            ).fetchone()
+        if not row:
+            return None
+        etag, last_modified, stored_parser, body, parsed = row
+        result = {
+            "etag": etag,
+            "last_modified": last_modified,
+            "body": zlib.decompress(body).decode("utf-8"),
+            "parsed": None,
+        }
+        # only reuse a parse produced by the same parser function
+        if parsed is not None and stored_parser == parser:
+            try:
+                result["parsed"] = pickle.loads(zlib.decompress(parsed))
+            except Exception:
+                result["parsed"] = None
+        return result
+
+    def put_feed(self, url, etag, last_modified, body: str, parsed=None, parser=""):
+        blob = None
+        if parsed is not None:
+            try:
+                blob = zlib.compress(pickle.dumps(parsed, protocol=pickle.HIGHEST_PROTOCOL), 6)
+            except Exception:
+                blob = None  # unpicklable → re-parse the stored body on 304
+        with self._lock:
+            self._db().execute(
+                "INSERT OR REPLACE INTO feeds (url, etag, last_modified, parser, body, parsed, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, parser, zlib.compress((body or "").encode("utf-8"), 6),
+                 blob, time.time()),
+            )
+
+    def count(self, source, hit: bool):
+        with self._lock:
+            self._count(self.hits if hit else self.misses, source)
+
+    def stats(self):
+        sources = sorted(set(self.hits) | set(self.misses))
+        return {s: {"hits": self.hits.get(s, 0), "misses": self.misses.get(s, 0)} for s in sources}
+
+    def print_stats(self):
+        stats = self.stats()
+        if not stats:
+            return
+        print("🗄️  HTTP cache:")
+        for source, c in stats.items():
+            total = c["hits"] + c["misses"]
+            rate = (100.0 * c["hits"] / total) if total else 0.0
+            print(f"   {source:<18} {c['hits']} hits / {c['misses']} misses ({rate:.0f}% hit)")
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """Process-wide cache (None when HTTP_CACHE_DISABLED is set)."""
+    global _cache
+    if CACHE_DISABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache()
+        return _cache
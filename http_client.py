@@ -0,0 +1,196 @@
+# http_client.py
+"""
+Shared HTTP layer for the scrapers.
+
+One keep-alive requests.Session per host (so detail-page loops reuse the same
+TCP/TLS connection), a default timeout for every call, gzip/deflate and one
+set of default headers. Call it like requests:
+
+    import http_client
+    resp = http_client.get(url, headers=HEADERS, timeout=20)
+
+Pass cache="<source>" on GETs whose body rarely changes (detail pages) to
+serve them from the on-disk cache in http_cache.py. iCal feeds go through
+get_feed(), which does a conditional GET and reuses the last parse on 304.
+"""
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+import http_cache
+import rate_limiter
+
+# (connect, read) seconds — used when the caller doesn't pass timeout=
+DEFAULT_TIMEOUT = (
+    float(os.environ.get("HTTP_CONNECT_TIMEOUT", "10")),
+    float(os.environ.get("HTTP_READ_TIMEOUT", "30")),
+)
+
+# Extra attempts after a 429/503 (each waits out the host's backoff first)
+THROTTLE_RETRIES = int(os.environ.get("HTTP_THROTTLE_RETRIES", "3"))
+
+# Connections kept alive per host (matches the widest thread pool we use)
+POOL_MAXSIZE = int(os.environ.get("HTTP_POOL_MAXSIZE", "16"))
+
+DEFAULT_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.8",
+    "Accept-Encoding": "gzip, deflate",
+}
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def _host_of(url: str) -> str:
+    return (urlsplit(url).netloc or "").lower()
+
+
+def get_session(url_or_host: str) -> requests.Session:
+    """Pooled keep-alive Session for a host (accepts a full URL or a bare host)."""
+    host = _host_of(url_or_host) if "://" in url_or_host else url_or_host.lower()
+    with _sessions_lock:
+        session = _sessions.get(host)
+        if session is None:
+            session = requests.Session()
+            session.headers.update(DEFAULT_HEADERS)
+            # retry connection errors only; status handling stays with the callers
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_MAXSIZE, max_retries=2)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _sessions[host] = session
+        return session
+
+
+def request(method: str, url: str, **kwargs) -> requests.Response:
+    """
+    requests.request() routed through the host's pooled Session, paced by the
+    host's adaptive token bucket. 429/503 slow the host down and are retried
+    (honouring Retry-After) up to THROTTLE_RETRIES times.
+    """
+    if kwargs.get("timeout") is None:
+        kwargs["timeout"] = DEFAULT_TIMEOUT
+    session = get_session(url)
+
+    for attempt in range(THROTTLE_RETRIES + 1):
+        rate_limiter.wait(url)
+        t0 = time.monotonic()
+        try:
+            resp = session.request(method, url, **kwargs)
+        except requests.RequestException:
+            rate_limiter.penalize(url)
+            raise
+        rate_limiter.feedback(url, resp.status_code, time.monotonic() - t0,
+                              resp.headers.get("Retry-After"))
+        if resp.status_code not in rate_limiter.THROTTLE_STATUSES or attempt == THROTTLE_RETRIES:
+            return resp
+        resp.close()
+    return resp
+
+
+def _response_from_cache(entry) -> requests.Response:
+    resp = requests.Response()
+    resp.status_code = entry["status"]
+    resp.headers = CaseInsensitiveDict(entry["headers"])
+    resp._content = entry["body"]
+    resp.url = entry["url"]
+    resp.encoding = get_encoding_from_headers(resp.headers)
+    resp.from_cache = True
+    return resp
+
+
+def get(url: str, cache: str = None, cache_ttl: float = None, **kwargs) -> requests.Response:
+    """
+    GET through the pooled Session. With cache="<source>", a fresh copy from
+    the on-disk cache is returned without touching the network, and 200s are
+    stored for next time (TTL from http_cache.CACHE_TTLS unless cache_ttl=).
+    """
+    store = http_cache.get_cache() if cache else None
+    if store is None:
+        return request("GET", url, **kwargs)
+
+    full_url = requests.Request("GET", url, params=kwargs.get("params")).prepare().url
+    entry = store.get(full_url, cache, ttl=cache_ttl)
+    if entry is not None:
+        return _response_from_cache(entry)
+
+    resp = request("GET", url, **kwargs)
+    if resp.status_code == 200:
+        # body is already decoded (gzip handled by urllib3); drop stale encoding headers
+        headers = {k: v for k, v in resp.headers.items()
+                   if k.lower() not in ("content-encoding", "content-length", "transfer-encoding")}
+        store.put(full_url, cache, resp.status_code, headers, resp.content)
+    resp.from_cache = False
+    return resp
+
+
+def get_feed(url: str, parse=None, **kwargs):
+    """
+    Conditional GET for feeds. Sends If-None-Match / If-Modified-Since from the
+    last successful fetch; on 304 returns the stored parse result (or re-parses
+    the stored body if it couldn't be pickled). Returns parse(text), or the
+    text when parse is None. Non-2xx responses raise.
+    """
+    store = http_cache.get_cache()
+    parser = f"{parse.__module__}.{parse.__qualname__}" if parse else ""
+    cached = store.get_feed(url, parser) if store else None
+
+    headers = dict(kwargs.pop("headers", None) or {})
+    if cached:
+        if cached["etag"]:
+            headers["If-None-Match"] = cached["etag"]
+        if cached["last_modified"]:
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+    resp = request("GET", url, headers=headers, **kwargs)
+
+    if resp.status_code == 304 and cached:
+        store.count("feeds", hit=True)
+        print(f"♻️ Feed unchanged (304): {url}")
+        if cached["parsed"] is not None:
+            return cached["parsed"]
+        return parse(cached["body"]) if parse else cached["body"]
+
+    resp.raise_for_status()
+    text = resp.text
+    parsed = parse(text) if parse else text
+
+    if store:
+        store.count("feeds", hit=False)
+        etag = resp.headers.get("ETag")
+        last_modified = resp.headers.get("Last-Modified")
+        if etag or last_modified:
+            store.put_feed(url, etag, last_modified, text, parsed if parse else None, parser)
+    return parsed
+
+
+def should_retry(exc) -> bool:
+    """
+    Is a failed call worth another attempt? Transport errors, throttles and
+    5xx are (request() has already slowed the host down for the first two);
+    404s and other client errors won't fix themselves.
+    """
+    status = getattr(getattr(exc, "response", None), "status_code", None)
+    return status is None or status >= 500 or status in rate_limiter.THROTTLE_STATUSES
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    return request("POST", url, **kwargs)
+
+
+def close_all():
+    """Drop every pooled connection (end of run / tests)."""
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
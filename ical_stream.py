@@ -0,0 +1,248 @@
+# ical_stream.py
+"""
+Streaming VEVENT reader shared by the iCal scrapers (replaces ics.Calendar).
+
+Lines are unfolded lazily, only the properties a scraper reads are kept, and
+an event whose DTSTART falls outside [since, until] is dropped as soon as its
+DTSTART line is seen — the rest of its block is skipped without building
+anything. Nested components (VALARM) are ignored.
+
+    for ev in ical_stream.iter_vevents(text, since=start, until=end):
+        ev.begin, ev.end, ev.name, ev.description, ev.location, ev.url, ev.uid
+
+Datetimes follow what ics 0.7 gave the scrapers: always timezone-aware, Z →
+UTC, TZID=… → that zone, floating times → UTC, DATE values → midnight UTC with
+all_day=True. A TZID that is neither IANA nor a known Windows/Outlook name
+falls back to DEFAULT_TZ (every feed we read is in Virginia) with a warning. `since`/`until` are a coarse pre-filter — callers keep their own
+exact date checks.
+
+iter_vevent_blocks() yields the raw {PROP: value, "__PROP_params": ...} dicts
+used by scrape_visithampton_hmva_ical.
+"""
+import io
+import re
+import os
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+# Properties kept by iter_vevents (everything else is skipped while streaming)
+EVENT_PROPS = frozenset({
+    "UID", "SUMMARY", "DESCRIPTION", "LOCATION", "URL",
+    "DTSTART", "DTEND", "DURATION", "CATEGORIES",
+})
+
+# Zone for TZIDs we can't resolve (all our feeds are Virginia calendars)
+DEFAULT_TZ = os.environ.get("ICAL_DEFAULT_TZ", "America/New_York")
+
+# Windows / legacy zone names seen in municipal feeds
+_TZ_ALIASES = {
+    "eastern standard time": "America/New_York",
+    "eastern daylight time": "America/New_York",
+    "us-eastern": "America/New_York",
+    "us/eastern": "America/New_York",
+}
+
+_DT_RE = re.compile(r"^(\d{4})(\d{2})(\d{2})(?:T(\d{2})(\d{2})(\d{2})?)?(Z)?$")
+_DURATION_RE = re.compile(
+    r"^([+-])?P(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?$"
+)
+_TZID_RE = re.compile(r"(?:^|;)TZID=(?:\"([^\"]*)\"|([^;:]+))", re.I)
+_TEXT_ESCAPES = re.compile(r"\\([\\;,nN])")
+
+_zones = {}
+
+
+def iter_unfolded_lines(text):
+    """Yield logical lines, joining RFC 5545 continuation lines as they stream by."""
+    pending = None
+    for line in io.StringIO(text):
+        line = line.rstrip("\r\n")
+        if pending is not None and line.startswith((" ", "\t")):
+            pending += line[1:]
+            continue
+        if pending is not None:
+            yield pending
+        pending = line
+    if pending is not None:
+        yield pending
+
+
+def unescape_text(value):
+    """Undo iCal TEXT escaping (\\n, \\, \\; \\\\)."""
+    if "\\" not in value:
+        return value
+    return _TEXT_ESCAPES.sub(lambda m: "\n" if m.group(1) in "nN" else m.group(1), value)
+
+
+def split_content_line(line):
+    """'NAME;PARAM="a:b":value' → ('NAME;PARAM="a:b"', 'value'); colons inside quotes don't split."""
+    in_quotes = False
+    for i, ch in enumerate(line):
+        if ch == '"':
+            in_quotes = not in_quotes
+        elif ch == ":" and not in_quotes:
+            return line[:i], line[i + 1:]
+    return line, None
+
+
+def _tzid(params):
+    """TZID parameter value (quoted or bare), '' when absent."""
+    m = _TZID_RE.search(params or "")
+    if not m:
+        return ""
+    return m.group(1) if m.group(1) is not None else m.group(2)
+
+
+def _zone(tzid):
+    key = tzid.strip()
+    zone = _zones.get(key)
+    if zone is None:
+        low = key.lower()
+        name = _TZ_ALIASES.get(low, key)
+        if name == key and "eastern" in low:
+            # Outlook style: "(UTC-05:00) Eastern Time (US & Canada)"
+            name = "America/New_York"
+        try:
+            zone = ZoneInfo(name)
+        except Exception:
+            print(f"⚠️ Unknown iCal TZID {key!r}; assuming {DEFAULT_TZ}")
+            zone = ZoneInfo(DEFAULT_TZ)
+        _zones[key] = zone
+    return zone
+
+
+def parse_datetime(value, params=""):
+    """DTSTART/DTEND value → (aware datetime, is_date). (None, False) if unparseable."""
+    m = _DT_RE.match((value or "").strip())
+    if not m:
+        return None, False
+    y, mo, d = int(m.group(1)), int(m.group(2)), int(m.group(3))
+    if m.group(4) is None:
+        return datetime(y, mo, d, tzinfo=timezone.utc), True
+    hh, mi, ss = int(m.group(4)), int(m.group(5)), int(m.group(6) or 0)
+    if m.group(7):
+        tz = timezone.utc
+    else:
+        tzid = _tzid(params)
+        tz = _zone(tzid) if tzid else timezone.utc
+    return datetime(y, mo, d, hh, mi, ss, tzinfo=tz), False
+
+
+def parse_duration(value):
+    m = _DURATION_RE.match((value or "").strip())
+    if not m:
+        return None
+    sign, weeks, days, hours, minutes, seconds = m.groups()
+    delta = timedelta(weeks=int(weeks or 0), days=int(days or 0), hours=int(hours or 0),
+                      minutes=int(minutes or 0), seconds=int(seconds or 0))
+    return -delta if sign == "-" else delta
+
+
+def _outside(begin, since, until):
+    return (since is not None and begin < since) or (until is not None and begin > until)
+
+
+def iter_vevent_blocks(text, props=None, since=None, until=None):
+    """
+    Yield one dict per VEVENT: {PROP: raw value} (repeated props joined with ","),
+    plus "__PROP_params" for props that carried parameters. `props` limits what
+    is kept; since/until drop events by DTSTART before the block is finished.
+    """
+    cur = None
+    skipping = False
+    nested = 0
+    for line in iter_unfolded_lines(text):
+        if line.startswith("BEGIN:"):
+            if line == "BEGIN:VEVENT" and cur is None and not skipping:
+                cur = {}
+            elif cur is not None or skipping:
+                nested += 1
+            continue
+        if line.startswith("END:"):
+            if nested:
+                nested -= 1
+            elif line == "END:VEVENT":
+                if cur is not None and not skipping:
+                    yield cur
+                cur = None
+                skipping = False
+            continue
+        if cur is None or skipping or nested or ":" not in line:
+            continue
+
+        prop, value = split_content_line(line)
+        if value is None:
+            continue
+        name, _, params = prop.partition(";")
+        name = name.upper()
+        if name == "DTSTART" and (since is not None or until is not None):
+            begin, _ = parse_datetime(value, params)
+            if begin is not None and _outside(begin, since, until):
+                skipping = True
+                cur = None
+                continue
+        if props is not None and name not in props:
+            continue
+        if cur.get(name):
+            cur[name] += "," + value
+        else:
+            cur[name] = value
+        if params:
+            cur[f"__{name}_params"] = params
+
+
+class VEvent:
+    """The handful of VEVENT fields the scrapers use, already decoded."""
+
+    __slots__ = ("uid", "name", "description", "location", "url",
+                 "begin", "end", "all_day", "categories", "tzid")
+
+    def __init__(self, uid="", name="", description="", location="", url="",
+                 begin=None, end=None, all_day=False, categories=(), tzid=""):
+        self.uid = uid
+        self.name = name
+        self.description = description
+        self.location = location
+        self.url = url
+        self.begin = begin
+        self.end = end
+        self.all_day = all_day
+        self.categories = list(categories)
+        self.tzid = tzid
+
+    def __repr__(self):
+        return f"VEvent({self.name!r}, {self.begin!r})"
+
+
+def vevent_from_block(block):
+    """Raw block dict → VEvent (end falls back to DURATION, then begin / +1 day like ics)."""
+    start_params = block.get("__DTSTART_params", "")
+    begin, all_day = parse_datetime(block.get("DTSTART", ""), start_params)
+    end = None
+    if begin is not None:
+        if block.get("DTEND"):
+            end, _ = parse_datetime(block["DTEND"], block.get("__DTEND_params", ""))
+        if end is None and block.get("DURATION"):
+            duration = parse_duration(block["DURATION"])
+            end = begin + duration if duration is not None else None
+        if end is None:
+            end = begin + timedelta(days=1) if all_day else begin
+    categories = [unescape_text(c).strip() for c in re.split(r"(?<!\\),", block.get("CATEGORIES", ""))]
+    return VEvent(
+        uid=block.get("UID", "").strip(),
+        name=unescape_text(block.get("SUMMARY", "")),
+        description=unescape_text(block.get("DESCRIPTION", "")),
+        location=unescape_text(block.get("LOCATION", "")),
+        url=block.get("URL", "").strip(),
+        begin=begin,
+        end=end,
+        all_day=all_day,
+        categories=[c for c in categories if c],
+        tzid=_tzid(start_params),
+    )
+
+
+def iter_vevents(text, since=None, until=None, props=EVENT_PROPS):
+    """Stream VEvents from an iCal body, skipping those starting outside [since, until]."""
+    for block in iter_vevent_blocks(text, props=props, since=since, until=until):
+        yield vevent_from_block(block)
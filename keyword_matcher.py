@@ -0,0 +1,106 @@
+# keyword_matcher.py
+"""
+Whole-word keyword matching for the category tables, built once at import.
+
+All keywords go into one Aho-Corasick automaton, so a text is scanned once no
+matter how many keywords there are. hits() returns exactly the keywords for
+which the old per-keyword check
+
+    re.search(rf'(?<!\\w){re.escape(kw.lower())}(?!\\w)', text.lower())
+
+would succeed: the text is lowercased, and a match only counts when the
+characters just before and after it are not word characters (str.isalnum()
+or "_", which is what `\\w` means for str patterns).
+
+    hits = CATEGORY_KEYWORDS.hits(full_text)
+    for keyword, cat in TITLE_KEYWORD_TO_CATEGORY.items():
+        if keyword in hits: ...
+"""
+import re
+
+from constants import TITLE_KEYWORD_TO_CATEGORY, COMBINED_KEYWORD_TO_CATEGORY
+
+_EMPTY_KW_RE = re.compile(r"(?<!\w)(?!\w)")
+
+
+def _is_word(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+class KeywordMatcher:
+    def __init__(self, keywords):
+        self._originals = {}   # lowercased keyword → original spellings
+        self._empty = ()       # "" behaves specially (matches any non-word gap)
+        for kw in keywords:
+            key = (kw or "").lower()
+            self._originals.setdefault(key, []).append(kw)
+        if "" in self._originals:
+            self._empty = tuple(self._originals.pop(""))
+        self._build(self._originals)
+
+    def _build(self, keys):
+        goto = [{}]
+        out = [[]]
+        for key in keys:
+            state = 0
+            for ch in key:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    out.append([])
+                state = nxt
+            out[state].append((key, len(key)))
+
+        # breadth-first failure links; outputs of the fallback state are inherited
+        fail = [0] * len(goto)
+        queue = list(goto[0].values())
+        for state in queue:
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0) if goto[f].get(ch, 0) != nxt else 0
+                out[nxt] = out[nxt] + out[fail[nxt]]
+
+        self._goto = goto
+        self._fail = fail
+        self._out = out
+
+    def hits(self, text: str) -> set:
+        """Original keywords that occur in text as whole words/phrases (case-insensitive)."""
+        t = (text or "").lower()
+        found = set()
+        goto, fail, out = self._goto, self._fail, self._out
+        n = len(t)
+        state = 0
+        for i, ch in enumerate(t):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if not out[state]:
+                continue
+            after_ok = i + 1 >= n or not _is_word(t[i + 1])
+            if not after_ok:
+                continue
+            for key, length in out[state]:
+                if key in found:
+                    continue
+                start = i - length + 1
+                if start == 0 or not _is_word(t[start - 1]):
+                    found.add(key)
+        result = set()
+        for key in found:
+            result.update(self._originals[key])
+        if self._empty and _EMPTY_KW_RE.search(t):
+            result.update(self._empty)
+        return result
+
+
+# Every keyword from the single and paired category tables, one automaton per process
+CATEGORY_KEYWORDS = KeywordMatcher(
+    list(TITLE_KEYWORD_TO_CATEGORY)
+    + [kw for pair in COMBINED_KEYWORD_TO_CATEGORY for kw in pair]
+)
@@ -0,0 +1,82 @@
+# library_rules.py
+"""
+LIBRARY_CONSTANTS and the keyword tables compiled once per process.
+
+Category strings ("Audience > …, Event Location … > …") are split into
+tuples of stripped tags, venue maps get a lowercased twin, and everything is
+wrapped read-only, so the per-event paths in upload_to_sheets and the
+scrapers only do lookups:
+
+    rules = library_rules.rules_for("hpl")
+    rules.program_type_to_categories.get("storytime", ())   # → tuple of tags
+    rules.venue_names_lc.get(location.lower(), location)
+
+    for keyword, tags in library_rules.TITLE_KEYWORD_TAGS: ...
+"""
+from functools import lru_cache
+from types import MappingProxyType
+
+from constants import LIBRARY_CONSTANTS, TITLE_KEYWORD_TO_CATEGORY, COMBINED_KEYWORD_TO_CATEGORY
+
+# Multi-word label kept intact while splitting on commas
+SPECIAL_MULTIWORD = "List - All Seasons > List - Cosplay Anime Comics"
+PLACEHOLDER = "LIST_COSPLAY_ANIME_COMICS"  # something that will never appear naturally
+
+_EMPTY = MappingProxyType({})
+
+
+@lru_cache(maxsize=4096)
+def split_categories(value) -> tuple:
+    """'a, b ,c' → ('a', 'b', 'c'); empties dropped, special labels kept whole. Cached per string."""
+    safe = str(value or "").replace(SPECIAL_MULTIWORD, PLACEHOLDER)
+    out = []
+    for part in safe.split(","):
+        part = part.strip()
+        if part:
+            out.append(part.replace(PLACEHOLDER, SPECIAL_MULTIWORD))
+    return tuple(out)
+
+
+def compile_category_map(mapping) -> MappingProxyType:
+    """{key: "tag, tag"} → read-only {key: (tag, tag)}."""
+    if not mapping:
+        return _EMPTY
+    return MappingProxyType({k: split_categories(v) for k, v in mapping.items()})
+
+
+class LibraryRules:
+    """Read-only lookup tables for one LIBRARY_CONSTANTS entry."""
+
+    __slots__ = ("library", "program_type_to_categories", "age_to_categories",
+                 "venue_names", "venue_names_lc", "name_suffix_map",
+                 "always_on_categories", "event_name_suffix")
+
+    def __init__(self, library, constants):
+        constants = constants or {}
+        venue_names = constants.get("venue_names", {}) or {}
+        set_ = object.__setattr__
+        set_(self, "library", library)
+        set_(self, "program_type_to_categories", compile_category_map(constants.get("program_type_to_categories")))
+        set_(self, "age_to_categories", compile_category_map(constants.get("age_to_categories")))
+        set_(self, "venue_names", MappingProxyType(dict(venue_names)))
+        set_(self, "venue_names_lc", MappingProxyType({k.lower(): v for k, v in venue_names.items()}))
+        set_(self, "name_suffix_map", MappingProxyType(dict(constants.get("name_suffix_map", {}) or {})))
+        set_(self, "always_on_categories", tuple(constants.get("always_on_categories", []) or ()))
+        set_(self, "event_name_suffix", constants.get("event_name_suffix", "") or "")
+
+    def __setattr__(self, name, value):
+        raise AttributeError("LibraryRules is read-only")
+
+
+# One compiled entry per library, built at import
+RULES = MappingProxyType({lib: LibraryRules(lib, consts) for lib, consts in LIBRARY_CONSTANTS.items()})
+
+
+def rules_for(library) -> LibraryRules:
+    rules = RULES.get(library)
+    return rules if rules is not None else LibraryRules(library, {})
+
+
+# Keyword → pre-split tags, in table order (tag order in the sheet depends on it)
+TITLE_KEYWORD_TAGS = tuple((kw, split_categories(cat)) for kw, cat in TITLE_KEYWORD_TO_CATEGORY.items())
+COMBINED_KEYWORD_TAGS = tuple((pair, split_categories(cat)) for pair, cat in COMBINED_KEYWORD_TO_CATEGORY.items())
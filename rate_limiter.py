@@ -0,0 +1,140 @@
+# rate_limiter.py
+"""
+Per-host adaptive token buckets so scrapers run as fast as each site allows.
+
+http_client calls wait(url) before every request and feedback(...) after it,
+so scrapers don't sleep on their own. Each host starts at HOST_RATES (or
+DEFAULT_RATE) requests/second and adjusts AIMD-style:
+  - fast 2xx/3xx responses add RATE_STEP req/s (up to MAX_RATE)
+  - 429/503 (or penalize() after a failure) halve the rate (down to MIN_RATE)
+    and pause the host for Retry-After seconds when the server sends one
+"""
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+DEFAULT_RATE = float(os.environ.get("HTTP_DEFAULT_RPS", "4"))
+MIN_RATE = float(os.environ.get("HTTP_MIN_RPS", "0.2"))
+MAX_RATE = float(os.environ.get("HTTP_MAX_RPS", "12"))
+RATE_STEP = 0.25
+BURST = float(os.environ.get("HTTP_BURST", "2"))
+
+# responses quicker than this (seconds) count as "host is comfortable"
+FAST_RESPONSE = 0.75
+# pause used when a 429/503 carries no Retry-After
+DEFAULT_BACKOFF = 2.0
+MAX_BACKOFF = 120.0
+
+THROTTLE_STATUSES = {429, 503}
+
+# Starting rates per host (old fixed sleeps: 0.5s VBPL/NPL, 0.4s Poquoson, 0.1s portsva)
+HOST_RATES = {
+    "vbpl.librarymarket.com": float(os.environ.get("VBPL_RPS", "4")),
+    "norfolk.libcal.com": 2.0,
+    "poquoson.librarycalendar.com": 2.5,
+    "portsvaevents.com": 8.0,
+    "suffolkpubliclibrary.libcal.com": 2.0,
+}
+
+
+def parse_retry_after(value) -> float:
+    """Retry-After header (delta-seconds or HTTP-date) → seconds; None if absent/bad."""
+    if not value:
+        return None
+    value = str(value).strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+    except Exception:
+        return None
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float = BURST):
+        self.rate = min(MAX_RATE, max(MIN_RATE, rate))
+        self.capacity = max(1.0, burst)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        """Take one token, sleeping (outside the lock) until one is available."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self.blocked_until:
+                    delay = self.blocked_until - now
+                else:
+                    self._refill(now)
+                    if self.tokens >= 1.0:
+                        self.tokens -= 1.0
+                        return
+                    delay = (1.0 - self.tokens) / self.rate
+            time.sleep(delay)
+
+    def speed_up(self):
+        with self._lock:
+            self.rate = min(MAX_RATE, self.rate + RATE_STEP)
+
+    def back_off(self, retry_after: float = None):
+        with self._lock:
+            self.rate = max(MIN_RATE, self.rate / 2.0)
+            pause = DEFAULT_BACKOFF if retry_after is None else retry_after
+            pause = min(MAX_BACKOFF, pause)
+            self.blocked_until = max(self.blocked_until, time.monotonic() + pause)
+            self.tokens = 0.0
+
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+def _host_of(url_or_host: str) -> str:
+    if "://" in url_or_host:
+        return (urlsplit(url_or_host).netloc or "").lower()
+    return url_or_host.lower()
+
+
+def bucket_for(url_or_host: str) -> TokenBucket:
+    host = _host_of(url_or_host)
+    with _buckets_lock:
+        bucket = _buckets.get(host)
+        if bucket is None:
+            bucket = TokenBucket(HOST_RATES.get(host, DEFAULT_RATE))
+            _buckets[host] = bucket
+        return bucket
+
+
+def wait(url_or_host: str):
+    bucket_for(url_or_host).acquire()
+
+
+def feedback(url_or_host: str, status: int, elapsed: float, retry_after=None):
+    """Adjust the host's rate from one response (status code + seconds taken)."""
+    bucket = bucket_for(url_or_host)
+    if status in THROTTLE_STATUSES:
+        seconds = parse_retry_after(retry_after)
+        bucket.back_off(seconds)
+        print(f"🐢 {_host_of(url_or_host)} throttled ({status}); now {bucket.rate:.2f} req/s"
+              + (f", pausing {seconds:.0f}s" if seconds else ""))
+    elif status < 400 and elapsed < FAST_RESPONSE:
+        bucket.speed_up()
+
+
+def penalize(url_or_host: str, retry_after: float = None):
+    """Caller-side failure (timeout, connection reset): slow the host down before retrying."""
+    bucket_for(url_or_host).back_off(retry_after)
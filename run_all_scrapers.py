@@ -1,5 +1,10 @@
 # run_all_scrapers.py
 
+import os
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 
 # ── Scraper imports (kept exactly as in your current file) ───────────
@@ -22,8 +27,8 @@ from scrap_visityorktown_events import scrap_visityorktown_events
 from scrape_poquosonpl_events import scrape_poquosonpl_events
 from scrap_langleylibrary_events import scrap_langleylibrary
 
-from upload_to_sheets import upload_events_to_sheet
-from constants import LIBRARY_CONSTANTS
+from upload_to_sheets import upload_libraries_to_sheet
+import http_cache
 
 # ── Libraries registry (unchanged) ───────────────────────────────────
 LIBRARIES = [
@@ -77,6 +82,47 @@ CALL_MAP = {
     "langleylibrary": scrap_langleylibrary,
 }
 
+# ── Concurrency knobs ────────────────────────────────────────────────
+# Scrapers are I/O-bound against different hosts, so run them side by side.
+# SCRAPER_MAX_WORKERS=1 restores the old one-after-another behaviour.
+SCRAPER_MAX_WORKERS = int(os.environ.get("SCRAPER_MAX_WORKERS", "6"))
+# Max scrapers allowed to hit the same upstream host at once
+SCRAPER_PER_HOST_LIMIT = int(os.environ.get("SCRAPER_PER_HOST_LIMIT", "1"))
+
+# Upstream host each scraper talks to (sources sharing a backend share a cap)
+LIBRARY_HOSTS = {
+    "vbpl": "vbpl.librarymarket.com",
+    "npl": "norfolk.libcal.com",
+    "chpl": "events.chesapeakelibrary.org",
+    "nnpl": "calendar.nnpl.org",
+    "hpl": "api.withapps.io",
+    "spl": "suffolkpubliclibrary.libcal.com",
+    "ppl": "www.portsmouthpubliclibrary.org",
+    "ypl": "yorkcountyva.librarycalendar.com",
+    "vbpr": "anc.apm.activecommunities.com",
+    "visithampton": "api.withapps.io",
+    "visitchesapeake": "www.visitchesapeake.com",
+    "visitnewportnews": "www.visitnewportnews.com",
+    "portsvaevents": "portsvaevents.com",
+    "visitsuffolk": "www.visitsuffolkva.com",
+    "visitnorfolk": "www.norfolk.gov",
+    "visityorktown": "www.visityorktown.org",
+    "poquosonpl": "poquoson.librarycalendar.com",
+    "langleylibrary": "www.langleylibrary.org",
+}
+
+_host_semaphores = {}
+_host_semaphores_lock = threading.Lock()
+
+def _host_semaphore(library):
+    host = LIBRARY_HOSTS.get(library, library)
+    with _host_semaphores_lock:
+        sem = _host_semaphores.get(host)
+        if sem is None:
+            sem = threading.BoundedSemaphore(max(1, SCRAPER_PER_HOST_LIMIT))
+            _host_semaphores[host] = sem
+        return sem
+
 def _parse_date(ev):
     """
     Try several common keys your scrapers return and normalize to date().
@@ -100,46 +146,103 @@ def _within_window(ev, last_day):
     # keep undated events so you can see/fix them; otherwise filter by cutoff
     return True if d is None else (d <= last_day)
 
-def run_all_scrapers(window: str = "12w"):
+# _scrape_one statuses
+SCRAPE_OK = "ok"
+SCRAPE_NOT_WIRED = "not wired"
+SCRAPE_FAILED = "failed"
+
+ScrapeResult = namedtuple("ScrapeResult", "events seconds status error")
+
+def _scrape_one(library, last_day, days):
+    """
+    Scrape + window-filter a single source. Never raises: returns a
+    ScrapeResult (status SCRAPE_OK / SCRAPE_NOT_WIRED / SCRAPE_FAILED) so one
+    broken site can't sink the run.
+    """
+    fn = CALL_MAP.get(library)
+    if not fn:
+        return ScrapeResult(None, 0.0, SCRAPE_NOT_WIRED, None)
+
+    t0 = time.perf_counter()
+    try:
+        with _host_semaphore(library):
+            print(f"\n🚀 Scraping {library.upper()}...")
+            t0 = time.perf_counter()
+            # Call each scraper with a wide mode; override per-site here if needed
+            events = fn(mode=SCRAPER_CALL_MODE)
+            elapsed = time.perf_counter() - t0
+
+        print(f"✅ {len(events)} events scraped from {library.upper()} in {elapsed:.1f}s")
+
+        # Central date-window filter
+        filtered = [e for e in events if _within_window(e, last_day)]
+        print(f"🧮 {len(filtered)}/{len(events)} within {days} days for {library.upper()}")
+        return ScrapeResult(filtered, elapsed, SCRAPE_OK, None)
+    except Exception as e:
+        return ScrapeResult(None, time.perf_counter() - t0, SCRAPE_FAILED, e)
+
+def _print_timings(timings, upload_s, total):
+    print("\n⏱️  Per-source wall time:")
+    for library in LIBRARIES:
+        if library not in timings:
+            continue
+        scrape_s, status = timings[library]
+        print(f"   {library:<18} scrape {scrape_s:7.1f}s  {status}")
+    summed = sum(t[0] for t in timings.values())
+    print(f"   {'upload (all)':<18} {upload_s:.1f}s")
+    print(f"   {'total':<18} {total:.1f}s wall (scrapes alone would take {summed:.1f}s serially)")
+
+def run_all_scrapers(window: str = "12w", max_workers: int = None):
     window = (window or "").lower().strip()
     if window not in WINDOW_MAP:
         raise SystemExit("Usage: run_all_scrapers.py [4w|12w]")
 
+    workers = max(1, max_workers or SCRAPER_MAX_WORKERS)
     today = datetime.today().date()
     last_day = today + timedelta(days=WINDOW_MAP[window])
-    print(f"🗓️  Mode: {window} → collecting events through {last_day}")
-
+    print(f"🗓️  Mode: {window} → collecting events through {last_day} ({workers} workers)")
+
+    run_start = time.perf_counter()
+    results = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(_scrape_one, library, last_day, WINDOW_MAP[window]): library
+            for library in LIBRARIES
+        }
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+
+    timings = {}
+    to_upload = {}
     for library in LIBRARIES:
-        print(f"\n🚀 Scraping {library.upper()}...")
-        try:
-            fn = CALL_MAP.get(library)
-            if not fn:
-                print(f"⚠️ No scraper wired for {library}")
-                continue
-
-            # Call each scraper with a wide mode; override per-site here if needed
-            events = fn(mode=SCRAPER_CALL_MODE)
-            print(f"✅ {len(events)} events scraped from {library.upper()}")
-
-            # Central date-window filter
-            filtered = [e for e in events if _within_window(e, last_day)]
-            print(f"🧮 {len(filtered)}/{len(events)} within {WINDOW_MAP[window]} days for {library.upper()}")
-
-            if filtered:
-                constants = LIBRARY_CONSTANTS.get(library, {})
-                upload_events_to_sheet(
-                    filtered,
-                    mode=window,               # log 4w / 12w in your Master Events Log
-                    library=library,
-                    age_to_categories=constants.get("age_to_categories"),
-                    name_suffix_map=constants.get("name_suffix_map"),
-                )
-                print(f"📤 Uploaded {library.upper()} events to sheet.")
-            else:
-                print(f"⚠️ No events to upload for {library.upper()} after window filter.")
-
-        except Exception as e:
-            print(f"❌ Failed to scrape/upload for {library.upper()}: {e}")
+        filtered, scrape_s, status, error = results[library]
+        if status == SCRAPE_NOT_WIRED:
+            print(f"⚠️ No scraper wired for {library}")
+            continue
+        if status == SCRAPE_FAILED:
+            print(f"❌ Failed to scrape/upload for {library.upper()}: {error}")
+            timings[library] = (scrape_s, "scrape failed")
+            continue
+        if not filtered:
+            print(f"⚠️ No events to upload for {library.upper()} after window filter.")
+            timings[library] = (scrape_s, "no events")
+            continue
+        to_upload[library] = filtered
+        timings[library] = (scrape_s, f"{len(filtered)} events")
+
+    # One Master snapshot + one consolidated write for every library (LIBRARIES order)
+    upload_s = 0.0
+    if to_upload:
+        t0 = time.perf_counter()
+        upload_libraries_to_sheet(to_upload, mode=window)   # log 4w / 12w in your Master Events Log
+        upload_s = time.perf_counter() - t0
+        print(f"📤 Uploaded {len(to_upload)} libraries to sheet in {upload_s:.1f}s.")
+
+    _print_timings(timings, upload_s, time.perf_counter() - run_start)
+    cache = http_cache.get_cache()
+    if cache is not None:
+        cache.print_stats()
+    return timings
 
 if __name__ == "__main__":
     import sys
@@ -1,8 +1,9 @@
-import requests, re
+import http_client
 from bs4 import BeautifulSoup
 from helpers import rJson, wJson
 from datetime import datetime, timedelta, timezone
-from constants import TITLE_KEYWORD_TO_CATEGORY
+import library_rules
+from age_spans import AgeText, AGE_RANGE_RE, UNDER_RE, GRADE_RANGE_RE
 from constants import UNWANTED_TITLE_KEYWORDS
 
 BASE_URL = "https://www.langleylibrary.org"
@@ -44,7 +45,8 @@ def _infer_ages(text: str) -> str:
     buckets = set()
 
     # explicit ranges like "ages 6-11" or "ages 6 to 11"
-    m = re.search(r"ages?\s*(\d{1,2})\s*(?:[-–to]+)\s*(\d{1,2})", t)
+    at = AgeText(t)
+    m = at.first(AGE_RANGE_RE, "age")
     if m:
         low, high = int(m.group(1)), int(m.group(2))
         if high <= 3: buckets.add("Infant")
@@ -54,7 +56,7 @@ def _infer_ages(text: str) -> str:
         else: buckets.add("Adults 18+")
 
     # "under X" / "X and under"
-    m = re.search(r"(?:under|younger than|and under)\s*(\d{1,2})", t)
+    m = at.first(UNDER_RE, "under")
     if m:
         age = int(m.group(1))
         if age <= 3: buckets.add("Infant")
@@ -62,7 +64,7 @@ def _infer_ages(text: str) -> str:
         else: buckets.add("School Age")
 
     # grade ranges (e.g., grades 3-5)
-    gm = re.search(r"grades?\s*(\d{1,2})(?:\s*[-–to]+\s*(\d{1,2}))?", t)
+    gm = at.first(GRADE_RANGE_RE, "grade")
     if gm:
         start_g = int(gm.group(1))
         end_g = int(gm.group(2)) if gm.group(2) else start_g
@@ -101,9 +103,9 @@ def _keyword_categories(title: str, desc: str, cats: str):
     """Map keywords to categories using constants.TITLE_KEYWORD_TO_CATEGORY."""
     txt = f"{title} {desc} {cats}".lower()
     tags = []
-    for kw, cat in TITLE_KEYWORD_TO_CATEGORY.items():
+    for kw, cat in library_rules.TITLE_KEYWORD_TAGS:
         if kw in txt:
-            tags.extend([c.strip() for c in cat.split(",")])
+            tags.extend(cat)
     return tags
 
 def _dedupe_preserve_order(items):
@@ -229,7 +231,7 @@ def fetch_events(url):
     }
 
     # Send request
-    response = requests.get(url, headers=headers)
+    response = http_client.get(url, headers=headers)
     response.raise_for_status()  # raise error if request failed
     
 
@@ -1,21 +1,28 @@
-import requests, time, requests
+import requests
+import http_client
 from bs4 import BeautifulSoup
 from datetime import datetime, timedelta, timezone
 from helpers import wJson, rJson, infer_age_categories_from_description
 import re
+import time
 from constants import TITLE_KEYWORD_TO_CATEGORY_RAW
 
 def fetch_event_page(url: str, *, retries: int = 5, timeout: int = 25) -> BeautifulSoup | None:
+    attempts = 0
     for i in range(retries):
+        attempts += 1
         try:
-            resp = requests.get(url, timeout=timeout, headers={"User-Agent":"Mozilla/5.0"})
+            resp = http_client.get(url, timeout=timeout, headers={"User-Agent":"Mozilla/5.0"}, cache="portsvaevents")
             resp.raise_for_status()
             return BeautifulSoup(resp.text, "html.parser")
         except Exception as e:
-            wait = i + 1
-            print(f"[Error] Failed to fetch {url} - {e}\ntry again after {wait} sec...")
-            time.sleep(wait)
-    print(f"[Skip] Giving up on {url} after {retries} retries.")
+            print(f"[Error] Failed to fetch {url} - {e}")
+            if not http_client.should_retry(e):
+                break
+            if i + 1 < retries:
+                print(f"try again in {i + 1}s...")
+                time.sleep(i + 1)
+    print(f"[Skip] Giving up on {url} after {attempts} attempt(s).")
     return None
 
 def _first_text(root, selectors, *, replace_at=True, default="") -> str:
@@ -145,7 +152,6 @@ def get_events(soup, date, page_no, seen_event_links):
         seen_event_links.add(link)
         
         event_soup = fetch_event_page(link)  # your retrying helper
-        time.sleep(0.1)
         if event_soup is None:
             event['Status'] = 'Unavailable'
             event['Event Description'] = ''
@@ -274,22 +280,23 @@ def get_events(soup, date, page_no, seen_event_links):
     return events, has_more
 
 def get_soup_from_url(url, retrys=5):
-    if retrys == 0:
-        return None
-    
     headers = {
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
     }
 
-    try:
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        return BeautifulSoup(response.text, 'html.parser')
-    except requests.RequestException as e:
-        print(f"[Error] Failed to fetch {url} - {e}")
-        print(f"try again after {6-retrys} sec...")
-        time.sleep(6-retrys)
-        return get_soup_from_url(url, retrys -1)
+    for attempt in range(retrys):
+        try:
+            response = http_client.get(url, headers=headers, timeout=10)
+            response.raise_for_status()
+            return BeautifulSoup(response.text, 'html.parser')
+        except requests.RequestException as e:
+            print(f"[Error] Failed to fetch {url} - {e}")
+            if not http_client.should_retry(e):
+                break
+            if attempt + 1 < retrys:
+                print(f"try again in {attempt + 1}s...")
+                time.sleep(attempt + 1)
+    return None
 
 def scrap_portsvaevents(mode="all", cutoff_date=None, **kwargs):
     """
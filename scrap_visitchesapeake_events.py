@@ -1,8 +1,6 @@
-import requests
+from simpleview_client import SimpleviewClient
 from concurrent.futures import ThreadPoolExecutor
-import urllib.parse
 from helpers import wJson, rJson, infer_age_categories_from_description
-import json
 from datetime import datetime, timedelta, timezone
 import pytz
 import re
@@ -160,64 +158,42 @@ def format_data(jsondata):
                 pass
     return docs
 
-def get_token():
-    """Fetch the token from the site."""
-    url = f"{BASE_URL}/plugins/core/get_simple_token/"
-    response = requests.get(url, headers=HEADERS)
-    response.raise_for_status()
-    return response.text.strip()
+EVENT_FILTER = {
+    "solrOptions": {},
+    "categories.catId": {
+        "$in": [
+            "1019","1026","1027","1016","1034","1017","1022","1030","1021",
+            "1023","1038","1020","1025","1018","1024","1032"
+        ]
+    },
+}
 
-def scrap_day(date_obj, all_fields):
-    """Scrap events for a single day (helper for multithreading)."""
-    token = get_token()
-    start_date = get_right_date(date_obj.date())
-    end_date = get_right_date(date_obj.date())
+def _event_options(all_fields):
+    return {
+        "hooks": ["afterFind_listing", "afterFind_host"],
+        "sort": {"date": 1, "rank": 1, "title": 1},
+        "fields": all_fields,
+        "count": True
+    }
+
+def scrap_range(client, start_obj, end_obj, all_fields):
+    """Scrap every event between two days in one paginated sweep (token reused)."""
+    start_date = get_right_date(start_obj.date())
+    end_date = get_right_date(end_obj.date())
     print(start_date, " - ", end_date)
-    
-    skip, plus_val = 0, 3
-    day_data = []
-    while True:
-        payload = {
-            "filter": {
-                "solrOptions": {},
-                "categories.catId": {
-                    "$in": [
-                        "1019","1026","1027","1016","1034","1017","1022","1030","1021",
-                        "1023","1038","1020","1025","1018","1024","1032"
-                    ]
-                },
-                "date_range": {
-                    "start": {"$date": start_date},
-                    "end": {"$date": end_date}
-                }
-            },
-            "options": {
-                "skip": skip,
-                "limit": plus_val,
-                "hooks": ["afterFind_listing", "afterFind_host"],
-                "sort": {"date": 1, "rank": 1, "title": 1},
-                "fields": all_fields,
-                "count": True
-            }
-        }
-
-        # Properly encode as JSON then URL encode
-        json_payload = json.dumps(payload, separators=(",", ":"))
-        encoded_payload = urllib.parse.quote(json_payload)
-        events_url = f"{BASE_URL}/includes/rest_v2/plugins_events_events_by_date/find/?json={encoded_payload}&token={token}"
-        response = requests.get(events_url, headers=HEADERS)
-        response.raise_for_status()
-        responseJson = response.json()
-        data = format_data(responseJson)
-
-        if not data:
-            break
-        day_data.extend(data)
-        skip += plus_val
-    return day_data
-
-
-def scrap_visitchesapeake(mode = "all", max_workers=10):
+
+    range_data = []
+    for page in client.iter_event_pages(EVENT_FILTER, _event_options(all_fields), start_date, end_date):
+        range_data.extend(format_data(page))
+    return range_data
+
+def scrap_day(client, date_obj, all_fields):
+    """Scrap events for a single day (helper for multithreading)."""
+    return scrap_range(client, date_obj, date_obj, all_fields)
+
+
+def scrap_visitchesapeake(mode = "all", max_workers=10, sweep=True):
+    """sweep=True queries the whole window at once; False falls back to one query per day."""
     print("start scrapping from visitchesapeake.com ...")
     today = datetime.now(timezone.utc)
     if mode == "weekly":
@@ -231,19 +207,24 @@ def scrap_visitchesapeake(mode = "all", max_workers=10):
     all_fields = set(rJson('all_fields(visitnewportnews).json'))
     all_fields = {field: 1 for field in all_fields}
 
-    # Build list of days to scrape
-    dates = []
-    cur = today
-    while cur <= date_range_end:
-        dates.append(cur)
-        cur += timedelta(days=1)
-    
+    client = SimpleviewClient(BASE_URL, HEADERS)
+
     all_data = []
     all_data_unique = set()
 
-    # Threaded scrape while preserving order
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        results = list(executor.map(lambda d: scrap_day(d, all_fields), dates))
+    if sweep:
+        results = [scrap_range(client, today, date_range_end, all_fields)]
+    else:
+        # Build list of days to scrape
+        dates = []
+        cur = today
+        while cur <= date_range_end:
+            dates.append(cur)
+            cur += timedelta(days=1)
+
+        # Threaded scrape while preserving order
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(lambda d: scrap_day(client, d, all_fields), dates))
 
     # Merge results in the same order as dates
     for day_data in results:
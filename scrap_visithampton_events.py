@@ -1,4 +1,5 @@
 import requests
+import http_client
 from bs4 import BeautifulSoup
 from datetime import datetime, timedelta, timezone
 from helpers import wJson, rJson
@@ -214,7 +215,7 @@ def get_soup_from_url(url):
     }
 
     try:
-        response = requests.get(url, headers=headers, timeout=10)
+        response = http_client.get(url, headers=headers, timeout=10)
         response.raise_for_status()
         return BeautifulSoup(response.text, 'html.parser')
     except requests.RequestException as e:
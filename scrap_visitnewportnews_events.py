@@ -1,6 +1,6 @@
 from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-import requests, json
+from simpleview_client import SimpleviewClient
 # import urllib.parse
 from helpers import wJson, rJson, infer_age_categories_from_description, normalize_time_from_fields
 import pytz
@@ -290,21 +290,15 @@ def filter_data(data):
 
     return newData
 
-def get_token():
-    """Fetch the token from the site."""
-    url = f"{BASE_URL}/plugins/core/get_simple_token/"
-    headers = {
-        "sec-ch-ua-platform": '"Windows"',
-        "Referer": "https://www.visitnewportnews.com/events-and-festivals/?bounds=false&view=list&sort=date",
-        "X-Requested-With": "XMLHttpRequest",
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36",
-        "Accept": "*/*",
-        "sec-ch-ua": '"Not)A;Brand";v="8", "Chromium";v="138", "Google Chrome";v="138"',
-        "sec-ch-ua-mobile": "?0"
-    }
-    response = requests.get(url, headers=headers)
-    response.raise_for_status()
-    return response.text.strip()
+TOKEN_HEADERS = {
+    "sec-ch-ua-platform": '"Windows"',
+    "Referer": "https://www.visitnewportnews.com/events-and-festivals/?bounds=false&view=list&sort=date",
+    "X-Requested-With": "XMLHttpRequest",
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36",
+    "Accept": "*/*",
+    "sec-ch-ua": '"Not)A;Brand";v="8", "Chromium";v="138", "Google Chrome";v="138"',
+    "sec-ch-ua-mobile": "?0"
+}
 
 def get_right_date(date):
 
@@ -357,54 +351,42 @@ def format_data(jsondata):
 
 
 
-def scrap_day(date_obj, all_fields):
-    """Scrap events for a single day (helper for multithreading)."""
-    token = get_token()
-    start_date = get_right_date(date_obj.date())
-    end_date = get_right_date(date_obj.date())
+EVENT_FILTER = {
+    "active": True,
+    "$and": [
+        {"categories.catId": {
+            "$in": ["9","4","3","6","5","8","12","2","7","1","10"]
+        }}
+    ],
+}
+
+def _event_options(all_fields):
+    return {
+        "count": True,
+        "castDocs": False,
+        "fields": all_fields,
+        "hooks": [],
+        "sort": {"date": 1, "rank": 1, "title_sort": 1}
+    }
+
+def scrap_range(client, start_obj, end_obj, all_fields):
+    """Scrap every event between two days in one paginated sweep (token reused)."""
+    start_date = get_right_date(start_obj.date())
+    end_date = get_right_date(end_obj.date())
     print(start_date, " - ", end_date)
-    url = f"{BASE_URL}/includes/rest_v2/plugins_events_events_by_date/find/"
-    
-    skip, plus_val = 0, 3
-    day_data = []
-    while True:
-        payload = {
-            "filter": {
-                "active": True,
-                "$and": [
-                    {"categories.catId": {
-                        "$in": ["9","4","3","6","5","8","12","2","7","1","10"]
-                    }}
-                ],
-                "date_range": {
-                    "start": {"$date": start_date},
-                    "end": {"$date": end_date}
-                }
-            },
-            "options": {
-                "skip": skip,
-                "limit": plus_val,
-                "count": True,
-                "castDocs": False,
-                "fields": all_fields,
-                "hooks": [],
-                "sort": {"date": 1, "rank": 1, "title_sort": 1}
-            }
-        }
-        params = {"json": json.dumps(payload), "token": token}
-        response = requests.get(url, headers=HEADERS, cookies=COOKIES, params=params)
-        response.raise_for_status()
-        responseJson = response.json()
-
-        data = format_data(responseJson)
-        if not data:
-            break
-        day_data.extend(data)
-        skip += plus_val
-    return day_data
-
-
-def scrap_visitnewportnews(mode="all", max_workers=10):
+
+    range_data = []
+    for page in client.iter_event_pages(EVENT_FILTER, _event_options(all_fields), start_date, end_date):
+        range_data.extend(format_data(page))
+    return range_data
+
+def scrap_day(client, date_obj, all_fields):
+    """Scrap events for a single day (helper for multithreading)."""
+    return scrap_range(client, date_obj, date_obj, all_fields)
+
+
+def scrap_visitnewportnews(mode="all", max_workers=10, sweep=True):
+    """sweep=True queries the whole window at once; False falls back to one query per day."""
     print("start scrapping from visitnewportnews.com ...")
     today = datetime.now(timezone.utc)
     if mode == "weekly":
@@ -418,19 +400,24 @@ def scrap_visitnewportnews(mode="all", max_workers=10):
     all_fields = set(rJson('all_fields(visitnewportnews).json'))
     all_fields = {field: 1 for field in all_fields}
 
-    # Build list of days to scrape
-    dates = []
-    cur = today
-    while cur <= date_range_end:
-        dates.append(cur)
-        cur += timedelta(days=1)
+    client = SimpleviewClient(BASE_URL, HEADERS, cookies=COOKIES, token_headers=TOKEN_HEADERS)
 
     all_data = []
     all_data_unique = set()
 
-    # Threaded scrape while preserving order
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        results = list(executor.map(lambda d: scrap_day(d, all_fields), dates))
+    if sweep:
+        results = [scrap_range(client, today, date_range_end, all_fields)]
+    else:
+        # Build list of days to scrape
+        dates = []
+        cur = today
+        while cur <= date_range_end:
+            dates.append(cur)
+            cur += timedelta(days=1)
+
+        # Threaded scrape while preserving order
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(lambda d: scrap_day(client, d, all_fields), dates))
 
     # Merge results in the same order as dates
     for day_data in results:
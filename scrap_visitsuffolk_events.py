@@ -1,6 +1,7 @@
 from bs4 import BeautifulSoup
 from datetime import datetime, timedelta, timezone
-import re, json, requests
+import re, json
+import http_client
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from helpers import rJson, wJson, infer_age_categories_from_description
 from constants import TITLE_KEYWORD_TO_CATEGORY_RAW
@@ -128,7 +129,7 @@ def get_event_byurl(url):
         'user-agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36'
     }
 
-    response = requests.get(url, headers=headers, timeout=15)
+    response = http_client.get(url, headers=headers, timeout=15)
     soup2 = BeautifulSoup(response.text, "html.parser")
     event_meta = soup2.find("div", class_="mec-event-meta")
 
@@ -341,7 +342,7 @@ def scrap_visitsuffolk(mode = "all"):
         if extra_params:
             data.update(extra_params)
 
-        response = requests.post(url, headers=headers, data=data)
+        response = http_client.post(url, headers=headers, data=data)
 
         if response.status_code == 200:
             events_lst = get_events(response.text)
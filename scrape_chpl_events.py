@@ -1,8 +1,10 @@
-import requests
+import http_client
 from datetime import datetime, timedelta
 import json
 from bs4 import BeautifulSoup
-from constants import UNWANTED_TITLE_KEYWORDS, TITLE_KEYWORD_TO_CATEGORY, LIBRARY_CONSTANTS
+from constants import UNWANTED_TITLE_KEYWORDS
+from keyword_matcher import CATEGORY_KEYWORDS
+import library_rules
 from calendar import monthrange
 import re
 
@@ -26,7 +28,7 @@ def _fetch_full_description(url: str, timeout: int = 15) -> str:
     Open the event detail page and join all text from .amh-block.amh-text sections.
     """
     try:
-        r = requests.get(url, timeout=timeout)
+        r = http_client.get(url, timeout=timeout)
         r.raise_for_status()
         soup = BeautifulSoup(r.text, "html.parser")
 
@@ -68,7 +70,7 @@ def _get_full_desc_from_chpl_detail(url, headers):
     - No meta-description fallback (to avoid nav text)
     """
     try:
-        r = requests.get(url, headers=headers, timeout=12)
+        r = http_client.get(url, headers=headers, timeout=12, cache="chpl")
         r.raise_for_status()
         soup = BeautifulSoup(r.text, "html.parser")
 
@@ -158,7 +160,7 @@ def scrape_chpl_events(mode="all"):
         "X-Requested-With": "XMLHttpRequest"
     }
 
-    response = requests.get(
+    response = http_client.get(
         base_url,
         params={"event_type": 0, "req": json.dumps(payload)},
         headers=headers,
@@ -200,7 +202,7 @@ def scrape_chpl_events(mode="all"):
             # ✅ Check for cancellation
             if item.get("changed") == "1":
                 try:
-                    detail_resp = requests.get(event_url, headers=headers, timeout=10)
+                    detail_resp = http_client.get(event_url, headers=headers, timeout=10)
                     detail_soup = BeautifulSoup(detail_resp.text, "html.parser")
                     cancelled_msg = detail_soup.select_one(".eelist-changed-message")
                     if cancelled_msg and "cancelled" in cancelled_msg.get_text(strip=True).lower():
@@ -239,34 +241,30 @@ def scrape_chpl_events(mode="all"):
             desc_lower  = full_desc.lower()
             ages_str    = ages or ""
             
-            def _kw_hit(text: str, kw: str) -> bool:
-                # word-boundary hit to avoid 'steam' in 'upstream'
-                return re.search(rf'(?<!\w){re.escape((kw or "").lower())}(?!\w)', (text or "").lower()) is not None
-            
-            program_type_to_categories = LIBRARY_CONSTANTS["chpl"].get("program_type_to_categories", {})
-            age_to_categories         = LIBRARY_CONSTANTS["chpl"].get("age_to_categories", {})
-            always_on                 = LIBRARY_CONSTANTS["chpl"].get("always_on_categories", [])
+            chpl_rules                = library_rules.rules_for("chpl")
+            program_type_to_categories = chpl_rules.program_type_to_categories
+            age_to_categories         = chpl_rules.age_to_categories
+            always_on                 = list(chpl_rules.always_on_categories)
             
             # 1) Keyword tags (title OR description), expand multi-tag strings
+            # word-boundary hits (avoids 'steam' in 'upstream'), one pass per text
+            kw_hits = CATEGORY_KEYWORDS.hits(title_lower) | CATEGORY_KEYWORDS.hits(desc_lower)
             keyword_tags = []
-            for keyword, tag_str in TITLE_KEYWORD_TO_CATEGORY.items():
-                if _kw_hit(title_lower, keyword) or _kw_hit(desc_lower, keyword):
-                    keyword_tags.extend([t.strip() for t in tag_str.split(",") if t.strip()])
+            for keyword, tags in library_rules.TITLE_KEYWORD_TAGS:
+                if keyword in kw_hits:
+                    keyword_tags.extend(tags)
             
             # 2) Program type → categories (CHPL puts types in item['tags'])
             pt_raw = (item.get("tags", "") or "").strip()
             pt_tags = []
             if pt_raw:
-                mapped = program_type_to_categories.get(pt_raw) or ""
-                pt_tags.extend([t.strip() for t in mapped.split(",") if t.strip()])
+                pt_tags.extend(program_type_to_categories.get(pt_raw, ()))
             
             # 3) Ages → categories (from the Ages field)
             audience_keys = [a.strip() for a in ages_str.split(",") if a.strip()]
             age_tags = []
             for key in audience_keys:
-                tag_str = age_to_categories.get(key) or ""
-                if tag_str:
-                    age_tags.extend([t.strip() for t in tag_str.split(",") if t.strip()])
+                age_tags.extend(age_to_categories.get(key, ()))
             
             # 4) Always-on tags for CHPL
             base_tags = list(always_on) if always_on else []
@@ -1,19 +1,20 @@
 from datetime import datetime, timedelta, timezone
-import requests
-from ics import Calendar
+import withapps_client
+import ical_stream
 from bs4 import BeautifulSoup
 from constants import LIBRARY_CONSTANTS
 import re
 from constants import UNWANTED_TITLE_KEYWORDS
-from constants import TITLE_KEYWORD_TO_CATEGORY
+import library_rules
 from zoneinfo import ZoneInfo
 
-ICAL_URL = (
-    "https://api.withapps.io/api/v2/organizations/30/calendar/ical"
-    "?calendarId=68879053e01e77ea3beeeba1"
-    "&communityIds%5B0%5D=114"
-    "&pinnedFilters%5B0%5D=Libraries"
+# withapps organization 30 (shared with VisitHampton), Libraries calendar
+ICAL_PARAMS = (
+    ("calendarId", "68879053e01e77ea3beeeba1"),
+    ("communityIds[0]", "114"),
 )
+ICAL_PINNED = "Libraries"
+ICAL_URL = withapps_client.ical_url(withapps_client.HAMPTON_ORG, pinned=ICAL_PINNED, params=ICAL_PARAMS)
 
 def is_likely_adult_event(text):
     text = text.lower()
@@ -42,6 +43,16 @@ def is_likely_adult_event(text):
 
 eastern = ZoneInfo("America/New_York")
 
+def _fetch_hpl_feed(window_start, window_end):
+    """Feed text for the window only (filterBy params)."""
+    url = withapps_client.ical_url(withapps_client.HAMPTON_ORG, window_start, window_end,
+                                   pinned=ICAL_PINNED, params=ICAL_PARAMS)
+    print(f"🔎 HPL iCal URL: {url}")
+    text = withapps_client.fetch_ical(url)
+    if not text.strip():
+        raise RuntimeError("Empty HPL iCal feed for Hampton Public Library")
+    return text
+
 def scrape_hpl_events(mode="all"):
     print("📚 Scraping Hampton Public Library events from iCal feed...")
 
@@ -58,30 +69,27 @@ def scrape_hpl_events(mode="all"):
         date_range_end   = today_d + timedelta(days=90)
 
 
-    # New withapps ICS – we pull the full feed and filter dates ourselves
-    print(f"🔎 HPL iCal URL: {ICAL_URL}")
-    resp = requests.get(ICAL_URL, timeout=30)
-    text = resp.text
-
-    if not text.strip():
-        raise RuntimeError("Empty HPL iCal feed for Hampton Public Library")
-
-    calendar = Calendar(text)
-    print(f"📊 HPL raw events in feed: {len(calendar.events)}")
+    # withapps ICS – the server trims to the window, we still filter dates ourselves
+    # Stream the feed, dropping events well outside the window before parsing them
+    # (a day of slack either side for the UTC/Eastern quirk; exact check below)
+    window_start = datetime.combine(date_range_start - timedelta(days=1), datetime.min.time(), timezone.utc)
+    window_end = datetime.combine(date_range_end + timedelta(days=2), datetime.min.time(), timezone.utc)
+    feed_events = list(ical_stream.iter_vevents(_fetch_hpl_feed(window_start, window_end), since=window_start, until=window_end))
+    print(f"📊 HPL feed events near the window: {len(feed_events)}")
 
 
-    program_type_to_categories = LIBRARY_CONSTANTS["hpl"].get("program_type_to_categories", {})
+    program_type_to_categories = library_rules.rules_for("hpl").program_type_to_categories
     HPL_LOCATION_MAP = LIBRARY_CONSTANTS["hpl"].get("location_map", {})
 
     events = []
-    for event in calendar.events:
+    for event in feed_events:
 
         try:
             if event.begin is None:
                 continue
 
             # get start – HPL bug: feed appears to use UTC time but labels it America/New_York
-            start_raw = event.begin.datetime
+            start_raw = event.begin
             tz = start_raw.tzinfo
 
             if tz and "America/New_York" in str(tz):
@@ -98,8 +106,8 @@ def scrape_hpl_events(mode="all"):
 
             # get end – same logic as start
             end_dt_local = None
-            if event.end and event.end.datetime:
-                end_raw = event.end.datetime
+            if event.end:
+                end_raw = event.end
                 end_tz = end_raw.tzinfo
 
                 if end_tz and "America/New_York" in str(end_tz):
@@ -137,12 +145,12 @@ def scrape_hpl_events(mode="all"):
             for keyword, cat in program_type_to_categories.items():
                 if re.search(rf"\b{re.escape(keyword.lower())}\b", combined_text):
                     program_type = keyword.capitalize()
-                    program_categories.extend([c.strip() for c in cat.split(",")])
+                    program_categories.extend(cat)
             
             keyword_tags = []
-            for keyword, cat in TITLE_KEYWORD_TO_CATEGORY.items():
+            for keyword, cat in library_rules.TITLE_KEYWORD_TAGS:
                 if re.search(rf"\b{re.escape(keyword.lower())}\b", combined_text):
-                    keyword_tags.extend([c.strip() for c in cat.split(",")])
+                    keyword_tags.extend(cat)
             
             # Always append base tags
             base_tags = ["Audience > Audience - Free Event", "Event Location (Category) > Event Location - Hampton"]
@@ -1,11 +1,13 @@
 from datetime import datetime, timedelta, timezone
-import requests
-from ics import Calendar
+import http_client
+import ical_stream
 from bs4 import BeautifulSoup
 import re
 from zoneinfo import ZoneInfo
 eastern = ZoneInfo("America/New_York")
-from constants import LIBRARY_CONSTANTS, UNWANTED_TITLE_KEYWORDS, TITLE_KEYWORD_TO_CATEGORY
+from constants import UNWANTED_TITLE_KEYWORDS
+import library_rules
+from age_spans import AgeText, AGE_RANGE_RE, AGE_THROUGH_RE, UNDER_RE, GRADE_RANGE_RE
 
 
 ICAL_URL = "https://calendar.nnpl.org/api/feeds/ics/nnlibrary"
@@ -42,6 +44,7 @@ def extract_tags(text):
 
 def extract_ages(text):
     text = text.lower()
+    at = AgeText(text)
     matches = set()
 
     # === Keyword-Based Detection ===
@@ -57,7 +60,7 @@ def extract_ages(text):
         matches.add("Adults 18+")
         
     # === Specific phrasing detection ===
-    if re.search(r"ages?\s*\d+\s*(through|to)\s*\d+", text):
+    if at.search(AGE_THROUGH_RE, "age"):
         matches.add("Preschool")  # or logic to determine range if you want
     if "all ages" in text:
         matches.add("All Ages")
@@ -65,7 +68,7 @@ def extract_ages(text):
         matches.add("Children")
 
     # === Range Detection: "ages 6–11" or "ages 6 to 11" (add overlapping groups)
-    range_match = re.search(r"ages?\s*(\d{1,2})\s*(?:[-–to]+\s*)(\d{1,2})", text)
+    range_match = at.first(AGE_RANGE_RE, "age")
     if range_match:
         low = int(range_match.group(1))
         high = int(range_match.group(2))
@@ -94,7 +97,7 @@ def extract_ages(text):
 
 
     # === "under X" pattern: "children 5 and under" ===
-    under_match = re.search(r"(?:under|younger than|and under)\s*(\d{1,2})", text)
+    under_match = at.first(UNDER_RE, "under")
     if under_match:
         age = int(under_match.group(1))
         if age <= 3:
@@ -105,7 +108,7 @@ def extract_ages(text):
             matches.add("School Age")
 
     # === Grade Detection ===
-    grade_match = re.search(r"grades?\s*(\d{1,2})(?:\s*[-–to]+\s*(\d{1,2}))?", text)
+    grade_match = at.first(GRADE_RANGE_RE, "grade")
     if grade_match:
         start_grade = int(grade_match.group(1))
         end_grade = int(grade_match.group(2)) if grade_match.group(2) else start_grade
@@ -135,12 +138,14 @@ def scrape_nnpl_events(mode="all"):
         date_range_start = today
         date_range_end = today + timedelta(days=90)
 
-    resp = requests.get(ICAL_URL)
-    calendar = Calendar(resp.text)
-    program_type_to_categories = LIBRARY_CONSTANTS["nnpl"].get("program_type_to_categories", {})
+    # Conditional GET for the text, then stream only the events inside the window
+    feed_text = http_client.get_feed(ICAL_URL, timeout=30)
+    feed_events = ical_stream.iter_vevents(feed_text, since=date_range_start, until=date_range_end)
+    nnpl_rules = library_rules.rules_for("nnpl")
+    program_type_to_categories = nnpl_rules.program_type_to_categories
 
     events = []
-    for event in calendar.events:
+    for event in feed_events:
         try:
             print(f"🧪 Evaluating: {event.name}")
 
@@ -148,7 +153,7 @@ def scrape_nnpl_events(mode="all"):
                 print("⏭️ Skipping: No start time")
                 continue
             
-            event_date = event.begin.datetime.astimezone(timezone.utc)
+            event_date = event.begin.astimezone(timezone.utc)
 
             event_link = event.url.strip() if event.url else "https://library.nnva.gov/264/Events-Calendar"
 
@@ -184,13 +189,13 @@ def scrape_nnpl_events(mode="all"):
             program_categories = []
             for keyword, cat in program_type_to_categories.items():
                 if keyword.lower() in combined_text:
-                    program_categories.extend([c.strip() for c in cat.split(",")])
+                    program_categories.extend(cat)
             
             # Title keyword tagging
             keyword_tags = []
-            for keyword, cat in TITLE_KEYWORD_TO_CATEGORY.items():
+            for keyword, cat in library_rules.TITLE_KEYWORD_TAGS:
                 if re.search(rf"\b{re.escape(keyword)}\b", combined_text):
-                    keyword_tags.extend([c.strip() for c in cat.split(",")])
+                    keyword_tags.extend(cat)
             
             # Combine and dedupe
             all_categories = ", ".join(dict.fromkeys(program_categories + keyword_tags))
@@ -198,15 +203,15 @@ def scrape_nnpl_events(mode="all"):
 
             if not location_name:
                 continue
-            location = LIBRARY_CONSTANTS["nnpl"]["venue_names"].get(location_name)
+            location = nnpl_rules.venue_names.get(location_name)
             if not location:
                 print(f"\U0001F4CC Unmapped location: {repr(raw_location)}")
                 location = location_name
             
-            start_dt = event.begin.datetime.astimezone(eastern)
-            if event.end and event.end.datetime:
-                raw_end_dt = event.end.datetime
-                if raw_end_dt == event.begin.datetime:
+            start_dt = event.begin.astimezone(eastern)
+            if event.end:
+                raw_end_dt = event.end
+                if raw_end_dt == event.begin:
                     end_dt = start_dt + timedelta(hours=1)
                 else:
                     end_dt = raw_end_dt.astimezone(eastern)
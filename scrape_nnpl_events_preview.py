@@ -1,12 +1,11 @@
 # scrape_nnpl_events_preview.py
 
 import asyncio
-from playwright.async_api import async_playwright
+import browser_pool
 
-async def scrape_nnpl_preview():
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        page = await browser.new_page()
+async def _preview_on_pool(pool):
+    async with pool.context() as ctx:
+        page = await ctx.new_page()
         print("🌐 Navigating to NNPL calendar...")
         await page.goto("https://library.nnva.gov/264/Events-Calendar", timeout=60000)
         await page.wait_for_timeout(5000)  # Give extra time for the calendar to load
@@ -47,7 +46,8 @@ async def scrape_nnpl_preview():
         if not found_any:
             print("❌ No event containers found. The site may rely heavily on JS-based modals or AJAX.")
 
-        await browser.close()
+async def scrape_nnpl_preview():
+    await browser_pool.submit(_preview_on_pool)
 
 if __name__ == "__main__":
     asyncio.run(scrape_nnpl_preview())
@@ -1,16 +1,30 @@
-import requests
+import http_client
 from datetime import datetime, timedelta
-from time import sleep
 from bs4 import BeautifulSoup
+from library_rules import TITLE_KEYWORD_TAGS
 import re
 from constants import (
     UNWANTED_TITLE_KEYWORDS,
-    TITLE_KEYWORD_TO_CATEGORY,
-    COMBINED_KEYWORD_TO_CATEGORY,
 )
 
+PER_PAGE = 200
+
+def _ages_from_breadcrumb(detail_url):
+    """'Adults 18+' if the event page files it under Adult Programs, else ''. Repeat fetches hit the npl disk cache."""
+    detail_resp = http_client.get(detail_url, timeout=10, cache="npl")
+    detail_soup = BeautifulSoup(detail_resp.text, "html.parser")
+    breadcrumb_links = detail_soup.select("nav[aria-label='breadcrumb'] a")
+    for link in breadcrumb_links:
+        if "Adult Programs" in link.get_text():
+            return "Adults 18+"
+    tag_links = detail_soup.select("a[href*='/calendar?cid=']")
+    for tag in tag_links:
+        if "Adult Programs" in tag.get_text():
+            return "Adults 18+"
+    return ""
+
 def scrape_npl_events(mode="all"):
-    print("🌐 Scraping Norfolk Public Library events via weekly date chunks...")
+    print("🌐 Scraping Norfolk Public Library events via a single range crawl...")
 
     events = []
     today = datetime.today()
@@ -28,168 +42,173 @@ def scrape_npl_events(mode="all"):
         start_date = today.replace(day=1)
         end_date = start_date + timedelta(days=84)
 
-    current = start_date
-    while current <= end_date:
-        chunk_date = current.strftime("%Y-%m-%d")
-        print(f"📆 Fetching chunk for date={chunk_date}")
-
-        page = 1
-        MAX_PAGES = 20  # safety guard
-        while True:
-            url = (
-                "https://norfolk.libcal.com/ajax/calendar/list"
-                f"?c=-1&date={chunk_date}&perpage=200&page={page}&audience=&cats=&camps=&inc=0"
-            )
-            print(f"📄 Fetching page {page} for {chunk_date}")
-        
+    # LibCal's list endpoint returns everything from `date` onward, so one
+    # forward crawl from the window start covers the whole range.
+    chunk_date = start_date.strftime("%Y-%m-%d")
+    print(f"📆 Crawling from date={chunk_date} through {end_date.date()}")
+
+    seen_ids = set()
+    page = 1
+    MAX_PAGES = 60  # safety guard
+    done = False
+    while not done:
+        url = (
+            "https://norfolk.libcal.com/ajax/calendar/list"
+            f"?c=-1&date={chunk_date}&perpage={PER_PAGE}&page={page}&audience=&cats=&camps=&inc=0"
+        )
+        print(f"📄 Fetching page {page} from {chunk_date}")
+
+        try:
+            response = http_client.get(url, timeout=15)
+            response.raise_for_status()
+            data = response.json()
+            results = data.get("results", []) or []
+        except Exception as err:
+            print(f"❌ Failed to fetch page {page} from {chunk_date}: {err}")
+            break
+
+        if not results:
+            print(f"🛑 No more results from {chunk_date} (page {page}).")
+            break
+
+        new_on_page = 0
+        for result in results:
+            event_id = result.get("id") or f"{result.get('url', '')}|{result.get('startdt', '')}"
+            if event_id in seen_ids:
+                continue
+            seen_ids.add(event_id)
+            new_on_page += 1
+
             try:
-                response = requests.get(url, timeout=15)
-                response.raise_for_status()
-                data = response.json()
-                results = data.get("results", []) or []
-            except Exception as err:
-                print(f"❌ Failed to fetch page {page} for {chunk_date}: {err}")
-                break
-        
-            if not results:
-                print(f"🛑 No more results for {chunk_date} (page {page}).")
-                break
-        
-            for result in results:
-                try:
-                    title = result.get("title", "").strip()
-                    title_lc = re.sub(r"[^\w\s]", "", title.lower())
-                    if any(kw in title_lc for kw in UNWANTED_TITLE_KEYWORDS):
-                        print(f"⏭️ Skipping: Unwanted title match → {title}")
-                        continue
-        
-                    dt = datetime.strptime(result["startdt"], "%Y-%m-%d %H:%M:%S")
-                    end_dt = datetime.strptime(result["enddt"], "%Y-%m-%d %H:%M:%S")
-        
-                    audiences = result.get("audiences", [])
-                    if len(audiences) == 1 and audiences[0].get("name", "").strip() == "Adults (18+)":
-                        continue
-        
-                    ages = ", ".join([a.get("name", "") for a in audiences if "name" in a])
-
-                    # Fallback: infer Adults 18+ from breadcrumb
-                    if not ages.strip():
-                        try:
-                            detail_url = result.get("url", "")
-                            detail_resp = requests.get(detail_url, timeout=10)
-                            detail_soup = BeautifulSoup(detail_resp.text, "html.parser")
-                            breadcrumb_links = detail_soup.select("nav[aria-label='breadcrumb'] a")
-                            for link in breadcrumb_links:
-                                if "Adult Programs" in link.get_text():
-                                    ages = "Adults 18+"
-                                    break
-                            if not ages.strip():
-                                tag_links = detail_soup.select("a[href*='/calendar?cid=']")
-                                for tag in tag_links:
-                                    if "Adult Programs" in tag.get_text():
-                                        ages = "Adults 18+"
-                                        break
-                        except Exception as e:
-                            print(f"⚠️ Failed to fetch breadcrumb for {title}: {e}")
-
-                    start = result.get("start", "").strip()
-                    end = result.get("end", "").strip()
-                    if result.get("all_day", False):
-                        time_str = "All Day Event"
-                    elif start and end:
-                        time_str = f"{start} – {end}"
-                    elif start:
-                        time_str = start
-                    else:
-                        time_str = ""
-
-                    location = result.get("campus", "").strip() or result.get("location", "").strip()
-
-                    if not location:
-                        match = re.search(r"@ ([\w\- ]+)", title)
-                        if match:
-                            short_name = match.group(1).strip()
-                            name_map = {
-                                "Tucker": "Richard A. Tucker Memorial Library",
-                                "Pretlow": "Mary D. Pretlow Anchor Branch Library",
-                                "Barron F. Black": "Barron F. Black Branch Library",
-                                "Jordan-Newby": "Jordan-Newby Anchor Branch Library at Broad Creek",
-                                "Blyden": "Blyden Branch Library",
-                                "Lafayette": "Lafayette Branch Library",
-                                "Larchmont": "Larchmont Branch Library",
-                                "Van Wyck": "Van Wyck Branch Library",
-                                "Downtown": "Downtown Branch at Slover",
-                                "Park Place": "Park Place Branch Library",
-                                "Little Creek": "Little Creek Branch Library",
-                                "Janaf": "Janaf Branch Library"
-                            }
-                            for key, full_name in name_map.items():
-                                if key.lower() in short_name.lower():
-                                    location = full_name
-                                    break
-                    # === Category tagging logic ===
-
-                    text_to_match = f"{title} {result.get('description', '')}".lower()
-                    
-                    # 1. Match keyword categories
-                    keyword_tags = []
-                    for keyword, tag_string in TITLE_KEYWORD_TO_CATEGORY.items():
-                        if keyword.lower() in text_to_match:
-                            keyword_tags.extend([t.strip() for t in tag_string.split(",")])
-                    
-                    # 2. Add base location + free tag
-                    base_location_tag = "Event Location (Category) > Event Location - Norfolk"
-                    free_tag = "Audience > Audience - Free Event"  # You can always add this for NPL unless charging logic is found
-                    
-                    # 3. Age tags via map_age_to_categories
-                    min_age = 0
-                    max_age = 0
-                    ages_lc = ages.lower()
-                    if "teen" in ages_lc:
-                        min_age, max_age = 13, 17
-                    elif "school" in ages_lc or "grade" in ages_lc:
-                        min_age, max_age = 5, 12
-                    elif "preschool" in ages_lc:
-                        min_age, max_age = 3, 5
-                    elif "infant" in ages_lc or "baby" in ages_lc:
-                        max_age = 2
-                    
-                    age_tags = []
-                    if min_age or max_age:
-                        age_tags = [tag.strip() for tag in map_age_to_categories(min_age, max_age).split(",") if tag.strip()]
-                    
-                    # 4. Merge and deduplicate
-                    final_categories = sorted(set([base_location_tag, free_tag] + keyword_tags + age_tags))
-                    categories = ", ".join(final_categories)
-                    
-                    events.append({
-                        "Event Name": title,
-                        "Event Link": result.get("url", ""),
-                        "Event Status": "Available",
-                        "Time": time_str,
-                        "Categories": categories,
-                        "Ages": ages,
-                        "Location": location,
-                        "Month": dt.strftime("%b"),
-                        "Day": str(dt.day),
-                        "Year": str(dt.year),
-                        "Event Date": dt.strftime("%Y-%m-%d"),
-                        "Event End Date": end_dt.strftime("%Y-%m-%d"),
-                        "Event Description": result.get("description", "").strip(),
-                        "Series": "",
-                        "Program Type": "",
-                    })
-                except Exception as e:
-                    print(f"⚠️ Error parsing event: {e}")
-        
-            # —— pagination advance / last-page detection ——
-            if len(results) < 100 or page >= MAX_PAGES:
-                break
-            page += 1
-            sleep(0.5)
-        
-        current += timedelta(days=1)
-        sleep(0.5)
+                if datetime.strptime(result["startdt"], "%Y-%m-%d %H:%M:%S").date() > end_date.date():
+                    print(f"🛑 Reached window end ({end_date.date()}).")
+                    done = True
+                    break
+            except Exception:
+                pass
+
+            try:
+                title = result.get("title", "").strip()
+                title_lc = re.sub(r"[^\w\s]", "", title.lower())
+                if any(kw in title_lc for kw in UNWANTED_TITLE_KEYWORDS):
+                    print(f"⏭️ Skipping: Unwanted title match → {title}")
+                    continue
+    
+                dt = datetime.strptime(result["startdt"], "%Y-%m-%d %H:%M:%S")
+                end_dt = datetime.strptime(result["enddt"], "%Y-%m-%d %H:%M:%S")
+    
+                audiences = result.get("audiences", [])
+                if len(audiences) == 1 and audiences[0].get("name", "").strip() == "Adults (18+)":
+                    continue
+    
+                ages = ", ".join([a.get("name", "") for a in audiences if "name" in a])
+
+                # Fallback: infer Adults 18+ from breadcrumb
+                if not ages.strip():
+                    try:
+                        ages = _ages_from_breadcrumb(result.get("url", ""))
+                    except Exception as e:
+                        print(f"⚠️ Failed to fetch breadcrumb for {title}: {e}")
+
+                start = result.get("start", "").strip()
+                end = result.get("end", "").strip()
+                if result.get("all_day", False):
+                    time_str = "All Day Event"
+                elif start and end:
+                    time_str = f"{start} – {end}"
+                elif start:
+                    time_str = start
+                else:
+                    time_str = ""
+
+                location = result.get("campus", "").strip() or result.get("location", "").strip()
+
+                if not location:
+                    match = re.search(r"@ ([\w\- ]+)", title)
+                    if match:
+                        short_name = match.group(1).strip()
+                        name_map = {
+                            "Tucker": "Richard A. Tucker Memorial Library",
+                            "Pretlow": "Mary D. Pretlow Anchor Branch Library",
+                            "Barron F. Black": "Barron F. Black Branch Library",
+                            "Jordan-Newby": "Jordan-Newby Anchor Branch Library at Broad Creek",
+                            "Blyden": "Blyden Branch Library",
+                            "Lafayette": "Lafayette Branch Library",
+                            "Larchmont": "Larchmont Branch Library",
+                            "Van Wyck": "Van Wyck Branch Library",
+                            "Downtown": "Downtown Branch at Slover",
+                            "Park Place": "Park Place Branch Library",
+                            "Little Creek": "Little Creek Branch Library",
+                            "Janaf": "Janaf Branch Library"
+                        }
+                        for key, full_name in name_map.items():
+                            if key.lower() in short_name.lower():
+                                location = full_name
+                                break
+                # === Category tagging logic ===
+
+                text_to_match = f"{title} {result.get('description', '')}".lower()
+                
+                # 1. Match keyword categories
+                keyword_tags = []
+                for keyword, tags in TITLE_KEYWORD_TAGS:
+                    if keyword.lower() in text_to_match:
+                        keyword_tags.extend(tags)
+                
+                # 2. Add base location + free tag
+                base_location_tag = "Event Location (Category) > Event Location - Norfolk"
+                free_tag = "Audience > Audience - Free Event"  # You can always add this for NPL unless charging logic is found
+                
+                # 3. Age tags via map_age_to_categories
+                min_age = 0
+                max_age = 0
+                ages_lc = ages.lower()
+                if "teen" in ages_lc:
+                    min_age, max_age = 13, 17
+                elif "school" in ages_lc or "grade" in ages_lc:
+                    min_age, max_age = 5, 12
+                elif "preschool" in ages_lc:
+                    min_age, max_age = 3, 5
+                elif "infant" in ages_lc or "baby" in ages_lc:
+                    max_age = 2
+                
+                age_tags = []
+                if min_age or max_age:
+                    age_tags = [tag.strip() for tag in map_age_to_categories(min_age, max_age).split(",") if tag.strip()]
+                
+                # 4. Merge and deduplicate
+                final_categories = sorted(set([base_location_tag, free_tag] + keyword_tags + age_tags))
+                categories = ", ".join(final_categories)
+                
+                events.append({
+                    "Event Name": title,
+                    "Event Link": result.get("url", ""),
+                    "Event Status": "Available",
+                    "Time": time_str,
+                    "Categories": categories,
+                    "Ages": ages,
+                    "Location": location,
+                    "Month": dt.strftime("%b"),
+                    "Day": str(dt.day),
+                    "Year": str(dt.year),
+                    "Event Date": dt.strftime("%Y-%m-%d"),
+                    "Event End Date": end_dt.strftime("%Y-%m-%d"),
+                    "Event Description": result.get("description", "").strip(),
+                    "Series": "",
+                    "Program Type": "",
+                })
+            except Exception as e:
+                print(f"⚠️ Error parsing event: {e}")
+    
+        # —— pagination advance / last-page detection ——
+        # LibCal may cap pages below PER_PAGE, so a short page is not the end:
+        # stop on an empty page (above) or one that adds nothing new
+        if not new_on_page:
+            break
+        if page >= MAX_PAGES:
+            print(f"⚠️ Stopped at MAX_PAGES={MAX_PAGES}; later NPL events may be missing")
+            break
+        page += 1
 
     print(f"✅ Scraped {len(events)} events total.")
     return events
@@ -1,9 +1,10 @@
-import requests
+import http_client
 from bs4 import BeautifulSoup
 from datetime import datetime, timedelta
-import time
 import re
-from constants import LIBRARY_CONSTANTS, TITLE_KEYWORD_TO_CATEGORY, COMBINED_KEYWORD_TO_CATEGORY, UNWANTED_TITLE_KEYWORDS
+from constants import LIBRARY_CONSTANTS, UNWANTED_TITLE_KEYWORDS
+from keyword_matcher import CATEGORY_KEYWORDS
+import library_rules
 
 
 base_url = "https://poquoson.librarycalendar.com"
@@ -17,11 +18,6 @@ def _dedupe_keep_order(items):
             out.append(x); seen.add(x)
     return out
 
-def _kw_hit(text: str, kw: str) -> bool:
-    t = (text or "").lower()
-    k = (kw or "").lower()
-    return re.search(rf'(?<!\w){re.escape(k)}(?!\w)', t) is not None
-
 # Map LibraryCalendar “Age Group” text → audience tags
 def _age_groups_to_tags(ages_text: str, organizer="Poquoson"):
     t = (ages_text or "").lower()
@@ -69,19 +65,22 @@ def _program_type_to_tags(program_type: str, organizer="Poquoson"):
 def _keyword_tags(title: str, description: str):
     txt_title = (title or "").lower()
     txt_full  = f"{title} {description}".lower()
+    full_hits = CATEGORY_KEYWORDS.hits(txt_full)
+    title_hits = CATEGORY_KEYWORDS.hits(txt_title) | full_hits
     tags = []
-    for kw, cats in TITLE_KEYWORD_TO_CATEGORY.items():
-        if _kw_hit(txt_title, kw) or _kw_hit(txt_full, kw):
-            tags += [c.strip() for c in cats.split(",")]
-    for (kw1, kw2), cats in COMBINED_KEYWORD_TO_CATEGORY.items():
-        if _kw_hit(txt_full, kw1) and _kw_hit(txt_full, kw2):
-            tags += [c.strip() for c in cats.split(",")]
+    for kw, cats in library_rules.TITLE_KEYWORD_TAGS:
+        if kw in title_hits:
+            tags += cats
+    for (kw1, kw2), cats in library_rules.COMBINED_KEYWORD_TAGS:
+        if kw1 in full_hits and kw2 in full_hits:
+            tags += cats
     return _dedupe_keep_order(tags)
 
 def _build_categories(title, description, program_type, ages_text):
     organizer = "Poquoson"
-    always_on = (LIBRARY_CONSTANTS.get("poquosonpl", {}) or {}).get("always_on_categories", [])
-    age_map   = (LIBRARY_CONSTANTS.get("poquosonpl", {}) or {}).get("age_to_categories", {})
+    rules     = library_rules.rules_for("poquosonpl")
+    always_on = list(rules.always_on_categories)
+    age_map   = rules.age_to_categories
     tags = []
 
     # ... your existing tag building ...
@@ -90,7 +89,7 @@ def _build_categories(title, description, program_type, ages_text):
         for token in [a.strip() for a in ages_text.split(",") if a.strip()]:
             mapped = age_map.get(token)
             if mapped:
-                tags += [c.strip() for c in mapped.split(",")]
+                tags += mapped
     if ages_text:
         tags += _age_groups_to_tags(ages_text, organizer=organizer)
     tags += _keyword_tags(title, description)
@@ -176,7 +175,7 @@ def scrape_poquosonpl_events(cutoff_date=None, mode="all"):
     while page < MAX_PAGES:
         print(f"🌐 Fetching page {page}...")
         url = f"{base_url}/events/upcoming?page={page}"
-        response = requests.get(url, headers=HEADERS, timeout=30)
+        response = http_client.get(url, headers=HEADERS, timeout=30)
         response.raise_for_status()
 
         soup = BeautifulSoup(response.text, "html.parser")
@@ -242,8 +241,7 @@ def scrape_poquosonpl_events(cutoff_date=None, mode="all"):
 
                 # Extract description
                 # detail page
-                time.sleep(0.4)
-                d_resp = requests.get(link, headers=HEADERS, timeout=20)
+                d_resp = http_client.get(link, headers=HEADERS, timeout=20, cache="poquosonpl")
                 d_resp.raise_for_status()
                 d_soup = BeautifulSoup(d_resp.text, "html.parser")
                 
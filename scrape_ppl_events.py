@@ -1,14 +1,18 @@
 # scrape_ppl_events.py
 from datetime import datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor
+import os
 import re
-import requests
+import http_client
 from bs4 import BeautifulSoup
+import ical_stream
+import library_rules
+from age_spans import AgeText, AGE_RANGE_RE, UNDER_RE
+from helpers import rJson, wJson
 from zoneinfo import ZoneInfo
 from urllib.parse import urljoin, quote
 
 from constants import (
-    LIBRARY_CONSTANTS,
-    TITLE_KEYWORD_TO_CATEGORY,
     UNWANTED_TITLE_KEYWORDS,
 )
 
@@ -22,7 +26,17 @@ BASE = "https://www.portsmouthpubliclibrary.org"
 # Try combined first (both orders), then singles
 CID_VARIANTS = ["24,23", "23,24", "24", "23"]
 
-SESSION = requests.Session()
+SESSION = http_client.get_session(BASE)
+
+# CivicPlus iCalendar feeds for the same calendars (bulk metadata, one request each)
+ICAL_CIDS = ["24", "23"]
+ICAL_URL = BASE + "/common/modules/iCalendar/iCalendar.aspx?catID={cid}&feed=calendar"
+
+# Which month-page URL variants actually return events, remembered between runs
+VARIANT_STATE_PATH = os.environ.get("PPL_VARIANT_STATE", "ppl_calendar_variants.json")
+VARIANT_MAX_AGE_DAYS = 14
+
+DETAIL_WORKERS = int(os.environ.get("PPL_DETAIL_WORKERS", "6"))
 HEADERS = {
     "User-Agent": "Mozilla/5.0",
     "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
@@ -57,7 +71,7 @@ def _fetch_print_description(eid: str) -> str:
     try:
         headers = dict(HEADERS)
         headers["Referer"] = f"{BASE}/calendar.aspx"
-        resp = SESSION.get(print_url, headers=headers, timeout=30)
+        resp = http_client.get(print_url, headers=headers, timeout=30, cache="ppl")
         if resp.status_code >= 400:
             return ""
         soup = BeautifulSoup(resp.text, "html.parser")
@@ -79,10 +93,11 @@ def _fetch_print_description(eid: str) -> str:
 def extract_ages(text: str) -> str:
     """Lightweight age bucket extraction."""
     text = (text or "").lower()
+    at = AgeText(text)
     matches = set()
 
     # Range detection: ages 4–11, ages 5 – 12
-    range_match = re.search(r"ages?\s*(\d{1,2})\s*[-–to]+\s*(\d{1,2})", text)
+    range_match = at.first(AGE_RANGE_RE, "age")
     if range_match:
         low = int(range_match.group(1))
         high = int(range_match.group(2))
@@ -97,9 +112,9 @@ def extract_ages(text: str) -> str:
         else:
             matches.add("Adults 18+")
 
-    under_match = re.search(r"(under|younger than)\s*(\d{1,2})", text)
+    under_match = at.first(UNDER_RE, "under")
     if under_match:
-        age = int(under_match.group(2))
+        age = int(under_match.group(1))
         if age <= 3:
             matches.add("Infant")
         elif age <= 5:
@@ -148,27 +163,146 @@ def _candidate_month_urls(cid: str, year: int, month: int) -> list[str]:
         f"{BASE}/calendar.aspx?CID={cid_encoded}&startDate={m}%2F1%2F{y}",
     ]
 
-def _fetch_month_event_links(year: int, month: int) -> list[str]:
+def _month_page_links(url: str) -> set:
+    headers = dict(HEADERS)
+    headers["Referer"] = f"{BASE}/calendar.aspx"
+    resp = SESSION.get(url, headers=headers, timeout=30)
+    if resp.status_code >= 400:
+        return set()
+    soup = BeautifulSoup(resp.text, "html.parser")
+    links = set()
+    for a in soup.find_all("a", href=True):
+        href = a["href"]
+        if "calendar.aspx?eid=" in href.lower():
+            links.add(_strip_after_eid(urljoin(BASE, href)))
+    return links
+
+def _fetch_month_event_links(year: int, month: int, variants=None):
     """
     Union of ?EID= links across combined + individual CIDs.
+    `variants` ([cid, url_index] pairs) limits the fetch to known-good URLs;
+    None probes all of them. Returns (links, hits) with hits[(cid, idx)] = links.
     """
     links = set()
+    hits = {}
     for cid in CID_VARIANTS:
-        for url in _candidate_month_urls(cid, year, month):
+        for idx, url in enumerate(_candidate_month_urls(cid, year, month)):
+            if variants is not None and [cid, idx] not in variants:
+                continue
+            try:
+                found = _month_page_links(url)
+            except Exception:
+                continue
+            hits[(cid, idx)] = found
+            links |= found
+    return sorted(links), hits
+
+def _covering_variants(hits) -> list:
+    """Smallest set of variants (greedy) whose pages still cover every link found."""
+    remaining = set().union(*hits.values()) if hits else set()
+    chosen = []
+    while remaining:
+        best = max(hits, key=lambda k: len(hits[k] & remaining))
+        gained = hits[best] & remaining
+        if not gained:
+            break
+        chosen.append(list(best))
+        remaining -= gained
+    return chosen
+
+def _load_learned_variants():
+    try:
+        state = rJson(VARIANT_STATE_PATH)
+        learned_at = datetime.strptime(state["learned_at"], "%Y-%m-%d")
+        if datetime.now() - learned_at > timedelta(days=VARIANT_MAX_AGE_DAYS):
+            return None  # re-probe now and then in case the site changed
+        return state.get("variants") or None
+    except Exception:
+        return None
+
+def _save_learned_variants(variants):
+    try:
+        wJson({"learned_at": datetime.now().strftime("%Y-%m-%d"), "variants": variants}, VARIANT_STATE_PATH)
+    except Exception as e:
+        print(f"⚠️ Could not save PPL calendar variants: {e}")
+
+def _fetch_links_via_month_pages(months) -> list:
+    """Month calendar pages, using the remembered variants when we have them."""
+    learned = _load_learned_variants()
+    relearned = []
+    links_all = []
+    for (y, m) in months:
+        links, hits = _fetch_month_event_links(y, m, learned)
+        if learned is None or not links:
+            if learned is not None:
+                print(f"🔁 Remembered PPL variants returned nothing for {y}-{m:02d}; probing all")
+                links, hits = _fetch_month_event_links(y, m, None)
+            relearned.extend(v for v in _covering_variants(hits) if v not in relearned)
+        print(f"🗓 Found {len(links)} event links for {y}-{m:02d}")
+        links_all.extend(links)
+    if relearned:
+        _save_learned_variants(relearned if learned is None else learned + [v for v in relearned if v not in learned])
+    return links_all
+
+def _ical_link(ev) -> str:
+    for candidate in (getattr(ev, "url", None) or "", ev.description or ""):
+        # keep the site's own spelling of the link so sheet de-dupe still matches
+        m = re.search(r"https?://[^\s\"'<>]+?calendar\.aspx\?eid=\d+", candidate, re.IGNORECASE)
+        if m:
+            return _strip_after_eid(m.group(0))
+    uid = (ev.uid or "").strip()
+    if uid.isdigit():
+        return f"{BASE}/Calendar.aspx?EID={uid}"
+    return ""
+
+def _fetch_ical_metadata(start, end):
+    """
+    EID link → basic fields from the iCalendar.aspx feeds, for events whose
+    date falls in [start, end]. None when no feed could be read.
+    """
+    meta = {}
+    any_ok = False
+    for cid in ICAL_CIDS:
+        url = ICAL_URL.format(cid=cid)
+        try:
+            feed_text = http_client.get_feed(url, headers=HEADERS, timeout=30)
+        except Exception as e:
+            print(f"⚠️ PPL iCal feed unavailable ({url}): {e}")
+            continue
+        any_ok = True
+        # coarse UTC pre-filter (a day of slack); the exact Eastern date check follows
+        since = datetime.combine(start.date() - timedelta(days=1), datetime.min.time(), timezone.utc)
+        until = datetime.combine(end.date() + timedelta(days=2), datetime.min.time(), timezone.utc)
+        for ev in ical_stream.iter_vevents(feed_text, since=since, until=until):
             try:
-                headers = dict(HEADERS)
-                headers["Referer"] = f"{BASE}/calendar.aspx"
-                resp = SESSION.get(url, headers=headers, timeout=30)
-                if resp.status_code >= 400:
+                if not ev.begin:
+                    continue
+                all_day = bool(getattr(ev, "all_day", False))
+                if all_day:
+                    # VALUE=DATE comes back as UTC midnight; converting would land on the previous day
+                    begin = datetime.combine(ev.begin.date(), datetime.min.time(), eastern)
+                else:
+                    begin = ev.begin
+                    if begin.tzinfo is None:
+                        begin = begin.replace(tzinfo=eastern)
+                    begin = begin.astimezone(eastern)
+                if not (start.date() <= begin.date() <= end.date()):
                     continue
-                soup = BeautifulSoup(resp.text, "html.parser")
-                for a in soup.find_all("a", href=True):
-                    href = a["href"]
-                    if "calendar.aspx?eid=" in href.lower():
-                        links.add(_strip_after_eid(urljoin(BASE, href)))
+                link = _ical_link(ev)
+                if not link or link in meta:
+                    continue
+                end_dt = ev.end.astimezone(eastern) if ev.end else None
+                meta[link] = {
+                    "title": (ev.name or "").strip(),
+                    "description": re.sub(r"\s+", " ", ev.description or "").strip(),
+                    "location": (ev.location or "").strip(),
+                    "date_obj": begin.replace(hour=0, minute=0, second=0, microsecond=0),
+                    "start_time": "" if all_day else _fmt_time12(begin),
+                    "end_time": "" if (all_day or not end_dt) else _fmt_time12(end_dt),
+                }
             except Exception:
                 continue
-    return sorted(links)
+    return meta if any_ok else None
 
 def _parse_time12(t: str):
     t = (t or "").upper().replace(".", "").strip()
@@ -193,7 +327,7 @@ def _parse_event_detail(url: str) -> dict:
     headers["Referer"] = f"{BASE}/calendar.aspx"
 
     try:
-        resp = SESSION.get(url, headers=headers, timeout=30, allow_redirects=True)
+        resp = http_client.get(url, headers=headers, timeout=30, allow_redirects=True, cache="ppl")
         resp.raise_for_status()
         soup = BeautifulSoup(resp.text, "html.parser")
         # init for date/description so we can safely set them early
@@ -355,6 +489,13 @@ def _parse_event_detail(url: str) -> dict:
         "end_time": end_time,
     }
 
+def _safe_parse_event_detail(url: str) -> dict:
+    try:
+        return _parse_event_detail(url)
+    except Exception as e:
+        print(f"⚠️ Error parsing detail: {url} → {e}")
+        return {}
+
 def _dedupe_keep_order(items):
     seen, out = set(), []
     for x in items:
@@ -367,7 +508,7 @@ def _dedupe_keep_order(items):
 # -------------------------
 
 def scrape_ppl_events(mode="all"):
-    print("📚 Scraping Portsmouth Public Library (HTML month iterator, CIDs: 24 & 23)…")
+    print("📚 Scraping Portsmouth Public Library (iCal feed + detail pages, CIDs: 24 & 23)…")
 
     today = datetime.now(timezone.utc).astimezone(eastern).replace(hour=0, minute=0, second=0, microsecond=0)
     if mode == "weekly":
@@ -382,17 +523,26 @@ def scrape_ppl_events(mode="all"):
     next_dt = today + timedelta(days=32)
     next_year, next_month = next_dt.year, next_dt.month
 
-    month_links = []
-    for (y, m) in [(this_year, this_month), (next_year, next_month)]:
-        links = _fetch_month_event_links(y, m)
-        print(f"🗓 Found {len(links)} event links for {y}-{m:02d}")
-        month_links.extend(links)
+    # Bulk metadata from the iCal feeds, unioned with the month pages: some
+    # events are listed on the site without an EID link in the feed
+    ical_meta = _fetch_ical_metadata(today, end_cutoff) or {}
+    if ical_meta:
+        print(f"🗓 Found {len(ical_meta)} in-window event links in PPL iCal feeds")
+    month_links = _fetch_links_via_month_pages([(this_year, this_month), (next_year, next_month)])
+
+    # the feed keeps the site's spelling of a link; match month-page links case-insensitively
+    feed_keys = {link.lower() for link in ical_meta}
+    detail_links = _dedupe_keep_order(
+        list(ical_meta.keys()) + [link for link in month_links if link.lower() not in feed_keys]
+    )
 
-    detail_links = _dedupe_keep_order(month_links)
+    # Detail (+ print fallback) pages in parallel; results keep link order
+    with ThreadPoolExecutor(max_workers=max(1, DETAIL_WORKERS)) as executor:
+        details = list(executor.map(_safe_parse_event_detail, detail_links))
 
-    ppl_constants = LIBRARY_CONSTANTS.get("ppl", {})
-    venue_map = ppl_constants.get("venue_names", {}) or {}
-    age_to_categories = ppl_constants.get("age_to_categories", {}) or {}
+    ppl_rules = library_rules.rules_for("ppl")
+    venue_map = ppl_rules.venue_names
+    age_to_categories = ppl_rules.age_to_categories
 
     DEFAULT_CATEGORIES = (
         "Audience > Audience - Family Event, Audience > Audience - Free Event, "
@@ -400,9 +550,12 @@ def scrape_ppl_events(mode="all"):
     )
 
     events = []
-    for link in detail_links:
+    for link, data in zip(detail_links, details):
         try:
-            data = _parse_event_detail(link)
+            meta = ical_meta.get(link)
+            if meta:
+                # detail page wins; the feed fills whatever it couldn't find
+                data = {k: (data.get(k) or v) for k, v in meta.items()}
             if not data:
                 continue
 
@@ -441,16 +594,14 @@ def scrape_ppl_events(mode="all"):
             # Title keyword tags
             base_cats = []
             combined_text = (name + " " + description).lower()
-            for keyword, cat in TITLE_KEYWORD_TO_CATEGORY.items():
+            for keyword, cat in library_rules.TITLE_KEYWORD_TAGS:
                 if keyword in combined_text:
-                    base_cats.extend([c.strip() for c in cat.split(",")])
+                    base_cats.extend(cat)
 
             # Age mapping tags
             age_tags = []
             for a in [a.strip() for a in (ages or "").split(",") if a.strip()]:
-                cat = age_to_categories.get(a)
-                if cat:
-                    age_tags.extend([c.strip() for c in cat.split(",")])
+                age_tags.extend(age_to_categories.get(a, ()))
 
             # Always add these for PPL
             all_tags = [c.strip() for c in base_cats + age_tags if c.strip()]
@@ -478,5 +629,5 @@ def scrape_ppl_events(mode="all"):
         except Exception as e:
             print(f"⚠️ Error parsing detail: {link} → {e}")
 
-    print(f"✅ Scraped {len(events)} events from PPL (HTML, multi-CID).")
+    print(f"✅ Scraped {len(events)} events from PPL (iCal + HTML, multi-CID).")
     return events
@@ -1,10 +1,22 @@
+import http_client
+import browser_pool
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
 from bs4 import BeautifulSoup
+import os
 import re
-from playwright.sync_api import sync_playwright
-from constants import LIBRARY_CONSTANTS, TITLE_KEYWORD_TO_CATEGORY, UNWANTED_TITLE_KEYWORDS
+from constants import UNWANTED_TITLE_KEYWORDS
+import library_rules
 
 BASE_URL = "https://suffolkpubliclibrary.libcal.com/calendar"
+# LibCal's JSON list endpoint (same one scrape_npl_events reads for Norfolk)
+LIST_URL = "https://suffolkpubliclibrary.libcal.com/ajax/calendar/list"
+PER_PAGE = 200
+MAX_PAGES = 60  # safety guard
+DETAIL_WORKERS = int(os.environ.get("SPL_DETAIL_WORKERS", "6"))
+# Set SPL_USE_BROWSER=1 to skip the HTTP mode and render the calendar in Chromium
+USE_BROWSER = os.environ.get("SPL_USE_BROWSER", "").lower() in ("1", "true", "yes")
+DESC_SELECTOR = "#s-lc-event-desc, .s-lc-event-desc, .s-lc-event-description, .s-lc-event-content"
 UNWANTED_PROGRAM_TYPES = {
     "Adult",
     "Adult (Older Adult)",
@@ -12,19 +24,10 @@ UNWANTED_PROGRAM_TYPES = {
     "Child Care Providers"
 }
 
-def _get_full_desc_from_spl_detail(context, url):
-    """Return the long, real description from the SPL (LibCal) event page."""
-    page2 = context.new_page()
-    try:
-        page2.goto(url, timeout=30000)
-        # LibCal uses one of these containers for the full description
-        page2.wait_for_selector("#s-lc-event-desc, .s-lc-event-desc, .s-lc-event-description, .s-lc-event-content", timeout=7000)
-        html2 = page2.content()
-    finally:
-        page2.close()
-
-    soup2 = BeautifulSoup(html2, "html.parser")
-    container = soup2.select_one("#s-lc-event-desc, .s-lc-event-desc, .s-lc-event-description, .s-lc-event-content")
+def _desc_from_detail_html(html):
+    """Long description from a LibCal event page's HTML ('' if the container is missing)."""
+    soup2 = BeautifulSoup(html, "html.parser")
+    container = soup2.select_one(DESC_SELECTOR)
     if not container:
         return ""
 
@@ -41,6 +44,23 @@ def _get_full_desc_from_spl_detail(context, url):
     desc = re.sub(r"[ \t]+", " ", desc).strip()
     return desc
 
+async def _get_full_desc_from_spl_detail(page2, url):
+    """Return the long, real description from the SPL (LibCal) event page (tab from browser_pool)."""
+    await page2.goto(url, timeout=30000)
+    # LibCal uses one of these containers for the full description
+    await page2.wait_for_selector(DESC_SELECTOR, timeout=7000)
+    return _desc_from_detail_html(await page2.content())
+
+def _fetch_full_desc(url):
+    """Same as _get_full_desc_from_spl_detail, but over plain HTTP (LibCal renders server-side)."""
+    try:
+        resp = http_client.get(url, timeout=20, cache="spl")
+        resp.raise_for_status()
+        return _desc_from_detail_html(resp.text)
+    except Exception as e:
+        print(f"⚠️ SPL detail fetch failed, using teaser: {e}")
+        return ""
+
 def is_likely_adult_event(text):
     text = text.lower()
     keywords = [
@@ -69,45 +89,251 @@ def extract_ages(text):
         matches.add("All Ages")
     return ", ".join(sorted(matches))
 
-def scrape_spl_events(mode="all"):
-    print("🧭 Launching Playwright for SPL scrape...")
+def _names(value):
+    """LibCal list fields come as [{"name": ...}], ["..."] or "a, b" → list of names."""
+    if not value:
+        return []
+    if isinstance(value, str):
+        return [v.strip() for v in value.split(",") if v.strip()]
+    names = []
+    for item in value:
+        name = item.get("name", "") if isinstance(item, dict) else str(item)
+        if name.strip():
+            names.append(name.strip())
+    return names
 
-    today = datetime.now()
-    if mode == "weekly":
-        start_date = today
-        end_date = today + timedelta(days=7)
-    elif mode == "monthly":
-        start_date = today
-        end_date = today + timedelta(days=30)
+def _keep_listing(title, program_type, audience_tags):
+    """Cheap card-level filters, applied before any detail page is fetched."""
+    # ❌ Skip events where any audience tag is clearly adult
+    if any("adult" in tag.lower() for tag in audience_tags):
+        print(f"⏭️ Skipping due to adult audience tag: {audience_tags}")
+        return False
+
+    # Filter out unwanted categories
+    if program_type in UNWANTED_PROGRAM_TYPES:
+        print(f"⏭️ Skipping: Unwanted category → {program_type}")
+        return False
+
+    # ✅ Skip "Closed for..." events
+    if any(bad_word in title.lower() for bad_word in UNWANTED_TITLE_KEYWORDS):
+        print(f"⏭️ Skipping: Unwanted title match → {title}")
+        return False
+
+    return True
+
+def _build_spl_event(title, url, program_type, audience_tags, desc, dt, time_str, raw_location):
+    """One sheet row from the parsed listing fields (None if it looks like an adult event)."""
+    if is_likely_adult_event(title) or is_likely_adult_event(desc):
+        return None
+
+    raw_location = (raw_location or "").strip()
+    venue_map = library_rules.rules_for("spl").venue_names
+
+    # Normalize for known venue mappings unless it's a mobile/SPL2GO event
+    if "spl2go" in title.lower():
+        location = raw_location  # Keep full location for mobile events
     else:
-        start_date = today
-        end_date = today + timedelta(days=90)
+        location = None
+        for key in venue_map:
+            if key.lower() in raw_location.lower():
+                location = venue_map[key]
+                break
+        if not location:
+            location = raw_location  # Fallback if not matched
+
+    venue = location  # Final value passed to the sheet
+
+    if audience_tags:
+        ages = ", ".join(sorted(set(audience_tags)))
+    else:
+        ages = extract_ages(title + " " + desc)
+
+    # Normalize title formatting for SPL — only add location if it's not already there
+    if location.lower() not in title.lower():
+        full_title = f"{title} at {location}"
+    else:
+        full_title = title
+
+    # === Build categories: base city + free + program type + keywords ===
+    base_location_tag = "Event Location (Category) > Event Location - Suffolk"
+    free_tag = "Audience > Audience - Free Event"   # keep unless you have a fee detector
+
+    title_lower = (title or "").lower()
+
+    # 1) Keyword → categories (supports comma-separated values)
+    keyword_tags: list[str] = []
+    for keyword, tags in library_rules.TITLE_KEYWORD_TAGS:
+        if keyword.lower() in title_lower:
+            keyword_tags.extend(tags)
+
+    # 2) Program type → categories (also supports comma-separated values)
+    program_type_categories_list: list[str] = []
+    if program_type:
+        pt_map = library_rules.rules_for("spl").program_type_to_categories
+        program_type_categories_list = list(pt_map.get(program_type, ()))
+
+    # 3) Merge & de-dupe (include base city + free)
+    merged_tags = {
+        base_location_tag,
+        free_tag,
+        *keyword_tags,
+        *program_type_categories_list,
+        # *age_tags,  # <- include here if you compute age_tags elsewhere
+    }
+    # drop empties and join
+    final_categories = sorted(t for t in merged_tags if t)
+    all_categories = ", ".join(final_categories)
+
+    return {
+        "Event Name": f"{full_title} ({location})",
+        "Event Link": url,
+        "Event Status": "Available",
+        "Time": time_str,
+        "Ages": ages,
+        "Location": venue,
+        "Month": dt.strftime("%b"),
+        "Day": str(dt.day),
+        "Year": str(dt.year),
+        "Event Date": dt.strftime("%Y-%m-%d"),
+        "Event End Date": dt.strftime("%Y-%m-%d"),
+        "Event Description": desc,
+        "Series": "",
+        "Program Type": program_type,
+        "Categories": all_categories
+    }
+
+def _fetch_spl_results(start_date, end_date):
+    """Every LibCal list result from start_date through end_date (one forward crawl, like NPL)."""
+    results_in_window = []
+    seen_ids = set()
+    chunk_date = start_date.strftime("%Y-%m-%d")
+    page = 1
+    done = False
+    while not done:
+        print(f"📄 Fetching SPL list page {page} from {chunk_date}...")
+        response = http_client.get(
+            LIST_URL,
+            params={"c": -1, "date": chunk_date, "perpage": PER_PAGE, "page": page,
+                    "audience": "", "cats": "", "camps": "", "inc": 0},
+            headers={"Accept": "application/json, text/javascript, */*; q=0.01",
+                     "X-Requested-With": "XMLHttpRequest"},
+            timeout=15,
+        )
+        response.raise_for_status()
+        results = response.json().get("results", []) or []
+        if not results:
+            break
+
+        new_on_page = 0
+        for result in results:
+            event_id = result.get("id") or f"{result.get('url', '')}|{result.get('startdt', '')}"
+            if event_id in seen_ids:
+                continue
+            seen_ids.add(event_id)
+            new_on_page += 1
+            try:
+                dt = datetime.strptime(result["startdt"], "%Y-%m-%d %H:%M:%S")
+            except Exception:
+                continue
+            if dt.date() > end_date.date():
+                print(f"🛑 Reached window end ({end_date.date()}).")
+                done = True
+                break
+            if dt < start_date:
+                continue   # already started earlier today
+            results_in_window.append((dt, result))
+
+        # LibCal may cap pages below PER_PAGE, so a short page is not the end:
+        # stop on an empty page (above) or one that adds nothing new
+        if not new_on_page:
+            break
+        if page >= MAX_PAGES:
+            print(f"⚠️ Stopped at MAX_PAGES={MAX_PAGES}; later SPL events may be missing")
+            break
+        page += 1
+    return results_in_window
+
+def _scrape_spl_via_http(start_date, end_date):
+    results = _fetch_spl_results(start_date, end_date)
+    if not results:
+        # an empty window almost always means the endpoint changed shape
+        raise RuntimeError("LibCal list returned no listings")
+    print(f"🧾 {len(results)} SPL listings in window")
+
+    pending = []
+    for dt, result in results:
+        try:
+            raw_title = (result.get("title") or "Untitled Event").strip()
+            title = re.sub(r"\s*\[.*?\]", "", raw_title).strip()
+            audience_tags = _names(result.get("audiences"))
+            categories = _names(result.get("categories_arr") or result.get("categories"))
+            program_type = categories[0] if categories else ""
+            if not _keep_listing(title, program_type, audience_tags):
+                continue
+
+            if result.get("all_day"):
+                time_str = "All Day"
+            elif result.get("start") and result.get("end"):
+                time_str = f"{result['start']} - {result['end']}"
+            else:
+                time_str = result.get("start", "") or ""
+
+            campus = (result.get("campus") or "").strip()
+            room = (result.get("location") or "").strip()
+            raw_location = f"{campus} - {room}" if campus and room and room != campus else (campus or room)
 
+            teaser = BeautifulSoup(result.get("description") or "", "html.parser").get_text(" ", strip=True)
+            pending.append({
+                "title": title, "url": result.get("url", ""), "program_type": program_type,
+                "audience_tags": audience_tags, "desc": teaser, "dt": dt,
+                "time_str": time_str, "raw_location": raw_location,
+            })
+        except Exception as e:
+            print(f"⚠️ Error parsing event: {e}")
+
+    # Full descriptions: detail pages in parallel (paced per host by http_client)
+    with ThreadPoolExecutor(max_workers=max(1, DETAIL_WORKERS)) as executor:
+        full_descs = executor.map(lambda item: _fetch_full_desc(item["url"]) if item["url"] else "", pending)
+        for item, full_desc in zip(pending, full_descs):
+            if full_desc:
+                item["desc"] = full_desc
+
+    events = []
+    for item in pending:
+        try:
+            event = _build_spl_event(**item)
+            if event:
+                events.append(event)
+        except Exception as e:
+            print(f"⚠️ Error parsing event: {e}")
+    return events
+
+async def _scrape_spl_with_browser(pool, start_date, end_date):
+    print("🧭 Rendering SPL calendar in the shared browser...")
     events = []
 
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        context = browser.new_context()
-        page = context.new_page()
+    async with pool.context() as context:
+        page = await context.new_page()
 
         page_number = 1
         while True:
             print(f"📄 Fetching page {page_number}...")
-            page.goto(f"{BASE_URL}?cid=-1&t=d&d=0000-00-00&cal=-1&page={page_number}&inc=0", timeout=30000)
+            await page.goto(f"{BASE_URL}?cid=-1&t=d&d=0000-00-00&cal=-1&page={page_number}&inc=0", timeout=30000)
             try:
-                page.wait_for_selector(".s-lc-c-evt", timeout=5000)
+                await page.wait_for_selector(".s-lc-c-evt", timeout=5000)
             except:
                 print("🛑 No more events found or timed out.")
                 break
             
-            html = page.content()
+            html = await page.content()
             soup = BeautifulSoup(html, "html.parser")
             event_listings = soup.find_all("div", class_="media s-lc-c-evt")
 
             if not event_listings:
                 print("🛑 No more events found.")
                 break
-        
+
+            pending = []
             for listing in event_listings:
                 try:
                     # Extract category (Program Type)
@@ -115,35 +341,15 @@ def scrape_spl_events(mode="all"):
                     program_type = category_tag.get_text(strip=True) if category_tag else ""
                     # Extract audience tags from category list
                     audience_tags = [tag.get_text(strip=True) for tag in listing.select("span.s-lc-event-audience-link a")]
-                    # ❌ Skip events where any audience tag is clearly adult
-                    if any("adult" in tag.lower() for tag in audience_tags):
-                        print(f"⏭️ Skipping due to adult audience tag: {audience_tags}")
-                        continue
-
 
-                    # Filter out unwanted categories
-                    if program_type in UNWANTED_PROGRAM_TYPES:
-                        print(f"⏭️ Skipping: Unwanted category → {program_type}")
-                        continue
-    
                     title_tag = listing.find("h3", class_="media-heading")
                     raw_title = title_tag.get_text(strip=True) if title_tag else "Untitled Event"
                     title = re.sub(r"\s*\[.*?\]", "", raw_title).strip()
                     url_tag = title_tag.find("a") if title_tag else None
                     url = url_tag["href"] if url_tag and url_tag.has_attr("href") else ""
-                    
-                    # Try full description from detail page; fall back to card teaser if needed
-                    desc_tag = listing.find("div", class_="s-lc-c-evt-des")
-                    card_teaser = desc_tag.get_text(" ", strip=True) if desc_tag else ""
-                    
-                    desc = card_teaser
-                    if url:
-                        try:
-                            full_desc = _get_full_desc_from_spl_detail(context, url)
-                            if full_desc:
-                                desc = full_desc
-                        except Exception as e:
-                            print(f"⚠️ SPL detail fetch failed, using teaser: {e}")
+
+                    if not _keep_listing(title, program_type, audience_tags):
+                        continue
 
                     dl = listing.find("dl", class_="dl-horizontal")
                     info = {}
@@ -162,99 +368,62 @@ def scrape_spl_events(mode="all"):
     
                     if dt < start_date or dt > end_date:
                         continue
-                    
-                    # ✅ Skip "Closed for..." events
-                    if any(bad_word in title.lower() for bad_word in UNWANTED_TITLE_KEYWORDS):
-                        print(f"⏭️ Skipping: Unwanted title match → {title}")
-                        continue
-                    
-                    if is_likely_adult_event(title) or is_likely_adult_event(desc):
-                        continue
-    
-                    time_str = info.get("time", "")
-                    raw_location = info.get("location", "").strip()
-                    venue_map = LIBRARY_CONSTANTS["spl"].get("venue_names", {})
-                    
-                    # Normalize for known venue mappings unless it's a mobile/SPL2GO event
-                    if "spl2go" in title.lower():
-                        location = raw_location  # Keep full location for mobile events
-                    else:
-                        location = None
-                        for key in venue_map:
-                            if key.lower() in raw_location.lower():
-                                location = venue_map[key]
-                                break
-                        if not location:
-                            location = raw_location  # Fallback if not matched
-                    
-                    venue = location  # Final value passed to the sheet
-
-                    if audience_tags:
-                        ages = ", ".join(sorted(set(audience_tags)))
-                    else:
-                        ages = extract_ages(title + " " + desc)
-
-                    # Normalize title formatting for SPL — only add location if it's not already there
-                    if location.lower() not in title.lower():
-                        full_title = f"{title} at {location}"
-                    else:
-                        full_title = title
-                    
-                    event_name = f"{full_title} ({location})"
-                    
-                    # === Build categories: base city + free + program type + keywords ===
-                    base_location_tag = "Event Location (Category) > Event Location - Suffolk"
-                    free_tag = "Audience > Audience - Free Event"   # keep unless you have a fee detector
-                    
-                    title_lower = (title or "").lower()
-                    
-                    # 1) Keyword → categories (supports comma-separated values)
-                    keyword_tags: list[str] = []
-                    for keyword, tag_string in TITLE_KEYWORD_TO_CATEGORY.items():
-                        if keyword.lower() in title_lower:
-                            keyword_tags.extend([t.strip() for t in str(tag_string).split(",") if t.strip()])
-                    
-                    # 2) Program type → categories (also supports comma-separated values)
-                    program_type_categories_list: list[str] = []
-                    if program_type:
-                        pt_map = LIBRARY_CONSTANTS.get("spl", {}).get("program_type_to_categories", {})
-                        pt_val = pt_map.get(program_type, "")
-                        program_type_categories_list = [t.strip() for t in str(pt_val).split(",") if t.strip()]
-                    
-                    # 3) Merge & de-dupe (include base city + free)
-                    merged_tags = {
-                        base_location_tag,
-                        free_tag,
-                        *keyword_tags,
-                        *program_type_categories_list,
-                        # *age_tags,  # <- include here if you compute age_tags elsewhere
-                    }
-                    # drop empties and join
-                    final_categories = sorted(t for t in merged_tags if t)
-                    all_categories = ", ".join(final_categories)
-
-                    
-                    events.append({
-                        "Event Name": f"{full_title} ({location})",
-                        "Event Link": url,
-                        "Event Status": "Available",
-                        "Time": time_str,
-                        "Ages": ages,
-                        "Location": venue,
-                        "Month": dt.strftime("%b"),
-                        "Day": str(dt.day),
-                        "Year": str(dt.year),
-                        "Event Date": dt.strftime("%Y-%m-%d"),
-                        "Event End Date": dt.strftime("%Y-%m-%d"),
-                        "Event Description": desc,
-                        "Series": "",
-                        "Program Type": program_type,
-                        "Categories": all_categories
+
+                    # Card teaser is the fallback when the detail page has no description
+                    desc_tag = listing.find("div", class_="s-lc-c-evt-des")
+                    card_teaser = desc_tag.get_text(" ", strip=True) if desc_tag else ""
+
+                    pending.append({
+                        "title": title, "url": url, "program_type": program_type,
+                        "audience_tags": audience_tags, "desc": card_teaser, "dt": dt,
+                        "time_str": info.get("time", ""), "raw_location": info.get("location", ""),
                     })
                 except Exception as e:
                     print(f"⚠️ Error parsing event: {e}")
+
+            # Detail pages for this listing page, several tabs at once
+            with_url = [item for item in pending if item["url"]]
+            full_descs = await pool.map_pages(
+                context, with_url, lambda tab, item: _get_full_desc_from_spl_detail(tab, item["url"])
+            )
+            for item, full_desc in zip(with_url, full_descs):
+                if full_desc:
+                    item["desc"] = full_desc
+
+            for item in pending:
+                try:
+                    event = _build_spl_event(**item)
+                    if event:
+                        events.append(event)
+                except Exception as e:
+                    print(f"⚠️ Error parsing event: {e}")
             page_number += 1
-        browser.close()
+
+    return events
+
+def scrape_spl_events(mode="all", use_browser=USE_BROWSER):
+    today = datetime.now()
+    if mode == "weekly":
+        start_date = today
+        end_date = today + timedelta(days=7)
+    elif mode == "monthly":
+        start_date = today
+        end_date = today + timedelta(days=30)
+    else:
+        start_date = today
+        end_date = today + timedelta(days=90)
+
+    events = None
+    if not use_browser:
+        print("🌐 Scraping SPL via LibCal list API...")
+        try:
+            events = _scrape_spl_via_http(start_date, end_date)
+        except Exception as e:
+            print(f"⚠️ SPL LibCal API failed ({e}); falling back to Playwright.")
+            events = None
+
+    if events is None:
+        events = browser_pool.run(_scrape_spl_with_browser, start_date, end_date)
 
     print(f"✅ Scraped {len(events)} events from SPL.")
     return events
@@ -1,16 +1,33 @@
 import asyncio
-from playwright.async_api import async_playwright, TimeoutError
+from playwright.async_api import TimeoutError
 import re
+import browser_pool
 
 def remove_emojis(text):
     return re.sub(r"[^\w\s.,;:!?&@()'\"/-]", "", text)
 
-async def scrape():
+async def _read_detail(detail_page, link):
+    await detail_page.goto(link, timeout=10000)
+
+    try:
+        description = await detail_page.locator(".field--name-body .field-item").inner_text(timeout=5000)
+    except:
+        description = ""
+
+    try:
+        month = await detail_page.locator(".lc-date-icon__item--month").inner_text(timeout=3000)
+        day = await detail_page.locator(".lc-date-icon__item--day").inner_text(timeout=3000)
+        year = await detail_page.locator(".lc-date-icon__item--year").inner_text(timeout=3000)
+    except:
+        month, day, year = "", "", ""
+
+    return description, month, day, year
+
+async def _scrape_on_pool(pool):
     results = []
 
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True, args=["--disable-dev-shm-usage"])
-        page = await browser.new_page()
+    async with pool.context() as ctx:
+        page = await ctx.new_page()
 
         print("🚀 Starting scrape...")
         await page.goto("https://vbpl.librarymarket.com/events/month")
@@ -25,8 +42,7 @@ async def scrape():
         cards = await page.locator("article.event-card").all()
         print(f"🔍 Found {len(cards)} event cards.")
 
-        detail_page = await browser.new_page()
-
+        parsed = []
         for i, card in enumerate(cards[:50]):  # 🔒 Limit to 50 cards max for stability
             try:
                 name = await card.locator("a.lc-event__link").inner_text(timeout=5000)
@@ -42,24 +58,16 @@ async def scrape():
             except Exception as e:
                 print(f"⚠️ Error parsing card {i}: {e}")
                 continue
+            parsed.append((name, link, status, time_slot, ages, location))
 
-            try:
-                await detail_page.goto(link, timeout=10000)
-
-                try:
-                    description = await detail_page.locator(".field--name-body .field-item").inner_text(timeout=5000)
-                except:
-                    description = ""
-
-                try:
-                    month = await detail_page.locator(".lc-date-icon__item--month").inner_text(timeout=3000)
-                    day = await detail_page.locator(".lc-date-icon__item--day").inner_text(timeout=3000)
-                    year = await detail_page.locator(".lc-date-icon__item--year").inner_text(timeout=3000)
-                except:
-                    month, day, year = "", "", ""
-            except Exception as e:
-                print(f"⚠️ Detail page failed for card {i}: {e}")
+        # Detail pages in parallel tabs (images/fonts/analytics blocked by the pool)
+        details = await pool.map_pages(ctx, [card[1] for card in parsed], _read_detail)
+
+        for (name, link, status, time_slot, ages, location), detail in zip(parsed, details):
+            if detail is None:
+                print(f"⚠️ Detail page failed for {link}")
                 continue
+            description, month, day, year = detail
 
             results.append({
                 "Event Name": remove_emojis(name.strip()),
@@ -74,12 +82,11 @@ async def scrape():
                 "Event Description": remove_emojis(description.strip())
             })
 
-            await page.wait_for_timeout(500)  # ⏳ Prevent browser from crashing
+    print(f"📦 {len(results)} events scraped.")
+    return results
 
-        await detail_page.close()
-        await browser.close()
-        print(f"📦 {len(results)} events scraped.")
-        return results
+async def scrape():
+    return await browser_pool.submit(_scrape_on_pool)
 
 if __name__ == "__main__":
     asyncio.run(scrape())
@@ -1,7 +1,7 @@
-import requests
+import http_client
 from datetime import datetime, timedelta
 from bs4 import BeautifulSoup
-from constants import TITLE_KEYWORD_TO_CATEGORY
+import library_rules
 from config import map_age_to_categories
 from constants import UNWANTED_TITLE_KEYWORDS
 import re
@@ -94,7 +94,7 @@ def scrape_vbpr_events(mode="all"):
         }
 
         try:
-            res = requests.post(url, headers=headers, json=payload, timeout=30)
+            res = http_client.post(url, headers=headers, json=payload, timeout=30)
             res.raise_for_status()
             data = res.json()
         except Exception as e:
@@ -229,12 +229,10 @@ def scrape_vbpr_events(mode="all"):
                 text_to_match = (name + " " + desc).lower()
                 
                 keyword_tags = []
-                for keyword, tag_string in TITLE_KEYWORD_TO_CATEGORY.items():
+                for keyword, tags in library_rules.TITLE_KEYWORD_TAGS:
                 
                     pattern = r"\b" + re.escape(keyword.lower()) + r"\b"
                     if re.search(pattern, text_to_match):
-
-                        tags = [t.strip() for t in tag_string.split(",")]
                         keyword_tags.extend(tags)
                 
                 if keyword_tags:
@@ -6,11 +6,11 @@ import html
 import os
 import re
 import sys
-import time
-import urllib.parse
 from typing import Dict, List, Tuple, Optional
 import json
-import requests
+import http_client
+import ical_stream
+import withapps_client
 from zoneinfo import ZoneInfo
 EASTERN = ZoneInfo("America/New_York")
 
@@ -74,7 +74,7 @@ def _ics_to_local(dtstr: str, params: str = ""):
 
 
 
-BASE_ICS = "https://api.withapps.io/api/v2/organizations/30/calendar/ical"
+BASE_ICS = withapps_client.BASE_URL.format(org=withapps_client.HAMPTON_ORG)
 AUDIENCE_FILTERS = ["Kids", "Family", "Youth"]
 LIBRARY_KEY = "visithampton"
 
@@ -163,7 +163,7 @@ def _fetch_event_page(url: str, timeout: int = 12) -> str:
     if not url:
         return ""
     try:
-        r = requests.get(url, timeout=timeout, headers={"User-Agent":"Mozilla/5.0"})
+        r = http_client.get(url, timeout=timeout, headers={"User-Agent":"Mozilla/5.0"})
         if r.status_code == 200 and "text/html" in r.headers.get("Content-Type",""):
             return r.text
     except Exception:
@@ -246,41 +246,11 @@ def _time_window(weeks: int) -> Tuple[int, int]:
 
 # ---------- ICS parsing (keep params for X-APPLE-STRUCTURED-LOCATION) ----------
 def _unfold_ics_lines(text: str) -> List[str]:
-    raw_lines = text.splitlines()
-    out = []
-    for line in raw_lines:
-        if not out:
-            out.append(line.rstrip("\r\n"))
-            continue
-        if line.startswith((" ", "\t")):
-            out[-1] += line[1:]
-        else:
-            out.append(line.rstrip("\r\n"))
-    return out
+    return list(ical_stream.iter_unfolded_lines(text))
 
 def _parse_vevent_blocks(ics_text: str) -> List[Dict[str, str]]:
-    lines = _unfold_ics_lines(ics_text)
-    events = []
-    cur = None
-    for line in lines:
-        if line.startswith("BEGIN:VEVENT"):
-            cur = {}
-        elif line.startswith("END:VEVENT"):
-            if cur:
-                events.append(cur)
-                cur = None
-        elif cur is not None and ":" in line:
-            prop, value = line.split(":", 1)
-            prop_name = prop.split(";", 1)[0].upper()
-            cur.setdefault(prop_name, "")
-            if cur[prop_name]:
-                cur[prop_name] += "," + value
-            else:
-                cur[prop_name] = value
-            # keep params for certain props
-            if ";" in prop:
-                cur[f"__{prop_name}_params"] = prop.split(";", 1)[1]
-    return events
+    # streaming reader shared with the other iCal scrapers (skips VALARM blocks)
+    return list(ical_stream.iter_vevent_blocks(ics_text))
 
 # ---------- Field helpers ----------
 _MONTHS = ["Jan","Feb","Mar","Apr","May","Jun","Jul","Aug","Sep","Oct","Nov","Dec"]
@@ -375,25 +345,19 @@ def detect_ages(name: str, description: str, categories: List[str]) -> List[str]
 
 # ---------- Fetch & merge ----------
 def build_ics_url(audience: str, start_unix: int, end_unix: int) -> str:
-    params = [
-        ("filterBy[startsAt]", str(start_unix)),
-        ("filterBy[endsAt]", str(end_unix)),
-        ("pinnedFilters[0]", audience),
-    ]
-    return BASE_ICS + "?" + urllib.parse.urlencode(params)
+    return withapps_client.ical_url(withapps_client.HAMPTON_ORG, start_unix, end_unix, pinned=audience)
 
 def fetch_ics(url: str, retries: int = 2, timeout: int = 30) -> str:
-    last_err = None
-    for _ in range(retries + 1):
-        try:
-            r = requests.get(url, timeout=timeout)
-            if r.status_code == 200 and "BEGIN:VCALENDAR" in r.text:
-                return r.text
-            last_err = f"HTTP {r.status_code}"
-        except Exception as e:
-            last_err = str(e)
-        time.sleep(1.0)
-    raise RuntimeError(f"Failed to fetch ICS: {last_err}")
+    return withapps_client.fetch_ical(url, retries=retries, timeout=timeout)
+
+def _parse_ics_vevents(ics_text: str) -> List[Dict[str, str]]:
+    if "BEGIN:VCALENDAR" not in ics_text:
+        raise ValueError("response is not an iCalendar body")
+    return _parse_vevent_blocks(ics_text)
+
+def fetch_vevents(url: str, retries: int = 2, timeout: int = 30) -> List[Dict[str, str]]:
+    """fetch_ics + _parse_vevent_blocks."""
+    return _parse_ics_vevents(fetch_ics(url, retries=retries, timeout=timeout))
 
 def merge_events_by_uid(event_lists: List[List[Dict]]) -> List[Dict]:
     merged: Dict[str, Dict] = {}
@@ -541,11 +505,15 @@ def scrape_visithampton_hmva_ical(mode: str = "full") -> List[Dict]:
     weeks = 12 if mode == "full" else 4
     start_unix, end_unix = _time_window(weeks)
 
+    # every audience variant in one concurrent batch
+    urls = [build_ics_url(audience, start_unix, end_unix) for audience in AUDIENCE_FILTERS]
+    texts = withapps_client.fetch_many(urls)
+
     all_lists: List[List[Dict]] = []
-    for audience in AUDIENCE_FILTERS:
-        url = build_ics_url(audience, start_unix, end_unix)
-        ics_text = fetch_ics(url)
-        vevents = _parse_vevent_blocks(ics_text)
+    for audience, text in zip(AUDIENCE_FILTERS, texts):
+        if isinstance(text, Exception):
+            raise text
+        vevents = _parse_ics_vevents(text)
         events_for_audience = []
         for v in vevents:
             ed = _event_dict_from_vevent(v, audience_hint=audience)
@@ -1,5 +1,5 @@
 # scrape_ypl_events.py
-import requests
+import http_client
 from datetime import datetime, timedelta
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin
@@ -70,7 +70,7 @@ def scrape_YPL_events(mode="all"):
 
         headers = dict(HEADERS)  # copy base headers
         headers["Referer"] = f"{BASE}/events/month/{week_sunday.year}/{week_sunday.month:02d}"
-        r = requests.get(FEED, params=params, headers=headers, timeout=30)
+        r = http_client.get(FEED, params=params, headers=headers, timeout=30)
 
         if r.status_code == 400:
             print(f"⚠️ 400 for week {current_week}; skipping this week.")
@@ -132,7 +132,7 @@ def scrape_YPL_events(mode="all"):
                     try:
                         detail_headers = dict(HEADERS)
                         detail_headers["Referer"] = f"{BASE}/events"
-                        dr = requests.get(link, headers=detail_headers, timeout=30)
+                        dr = http_client.get(link, headers=detail_headers, timeout=30, cache="ypl")
                         if dr.ok:
                             dsoup = BeautifulSoup(dr.text, "html.parser")
                             body_el = (
@@ -202,7 +202,7 @@ def _append_ypl_messages_from_soup(base_desc: str, dsoup: BeautifulSoup) -> str:
 def _append_ypl_messages(base_desc: str, link: str) -> str:
     """Fetch the event detail page and append .lc-messages__message to base_desc."""
     try:
-        dr = requests.get(link, headers=HEADERS, timeout=30)
+        dr = http_client.get(link, headers=HEADERS, timeout=30, cache="ypl")
         if not dr.ok:
             return base_desc
         dsoup = BeautifulSoup(dr.text, "html.parser")
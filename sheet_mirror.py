@@ -0,0 +1,419 @@
+# sheet_mirror.py
+"""
+Local SQLite mirror of the Master Events worksheet.
+
+Upload and export read the Master grid from here instead of Google Sheets.
+A sync only re-reads the sheet when it changed since our last look (Drive
+lastUpdateTime, stored per worksheet), and then only rows whose content
+changed are rewritten locally. Our own writes (appends, A:P updates, status
+flips) are applied to the mirror as they go to Sheets, so the next run
+starts from a mirror that is already current:
+
+    mirror = sheet_mirror.get_mirror()
+    mirror.sync(sheet)                      # 0 grid reads when nothing changed
+    snapshot = mirror.snapshot(_clean_link) # link → row index + rows for the diff
+    rows = mirror.query(library="npl", sync_status="new", date_from="2026-10-01")
+    ...
+    clean = mirror.is_current(sheet)        # right before our first write
+    resp = sheet.append_rows(new_rows, value_input_option="USER_ENTERED")
+    mirror.apply_append(resp, new_rows)
+    mirror.settle(sheet, clean)             # after the run's LAST write (log tab too)
+
+lastUpdateTime covers the whole spreadsheet, so settle() must come after
+every write of the run, including the upload log tab. If someone else
+edited the sheet between sync() and our first write, settle() invalidates
+instead of adopting the new version, and the next sync() re-reads.
+
+Rows are indexed on event link, library (inferred from the link), event date
+and Site Sync Status. Each row keeps its sheet row number, so update ranges
+computed locally are valid on the sheet.
+
+Set MASTER_MIRROR_DISABLED=1 to always read the live sheet.
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import date
+
+from gspread.utils import a1_to_rowcol, numericise_all
+
+MIRROR_PATH = os.environ.get("MASTER_MIRROR_PATH", ".master_mirror.sqlite3")
+MIRROR_DISABLED = os.environ.get("MASTER_MIRROR_DISABLED", "").lower() in ("1", "true", "yes")
+
+# Master column positions (A:P)
+COL_LINK, COL_STATUS, COL_TIME = 1, 2, 3
+COL_MONTH, COL_DAY, COL_YEAR = 6, 7, 8
+COL_ROW_STATUS, COL_SITE_SYNC = 14, 15
+ROW_WIDTH = 16
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rows (
+    row_num          INTEGER PRIMARY KEY,
+    link             TEXT,
+    library          TEXT,
+    event_date       TEXT,
+    time             TEXT,
+    event_status     TEXT,
+    status           TEXT,
+    site_sync_status TEXT,
+    row_hash         TEXT,
+    cells            TEXT
+);
+CREATE INDEX IF NOT EXISTS rows_link ON rows (link);
+CREATE INDEX IF NOT EXISTS rows_library ON rows (library, event_date);
+CREATE INDEX IF NOT EXISTS rows_event_date ON rows (event_date);
+CREATE INDEX IF NOT EXISTS rows_site_sync ON rows (site_sync_status);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+_MONTHS = {m: i for i, m in enumerate(
+    ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"], start=1)}
+
+
+def library_for_link(u: str):
+    u = (u or "").lower()
+    # Library-specific URL fingerprints
+    if "vbpl.librarymarket.com" in u: return "vbpl"
+    if "chesapeakelibrary.libnet.info" in u or "chesapeake.librarycalendar.com" in u: return "chpl"
+    if "norfolk.libcal.com" in u: return "npl"
+    if "suffolkpubliclibrary" in u: return "spl"
+    if "portsmouthpubliclibrary" in u: return "ppl"
+    if "calendar.hampton.gov" in u: return "hpl"
+    if "calendar.nnpl.org" in u: return "nnpl"
+    if "poquoson.librarycalendar.com" in u: return "poquosonpl"
+    if "yorkcountyva.librarycalendar.com" in u: return "ypl"
+    if "portsvaevents" in u: return "portsvaevents"
+    if "visithampton" in u: return "visithampton"
+    if "apm.activecommunities.com/vbparksrec" in u: return "vbpr"
+    if "visitchesapeake.com" in u: return "visitchesapeake"
+    if "visitnewportnews.com" in u: return "visitnewportnews"
+    if "visitsuffolkva.com" in u: return "visitsuffolk"
+    if "norfolk.gov" in u: return "visitnorfolk"
+    if "visityorktown.org" in u: return "visityorktown"
+    if "langleylibrary.org" in u: return "langleylibrary"
+
+    return None
+
+
+def _event_date(month, day, year) -> str:
+    """Sheet Month/Day/Year ("Oct", "October", "10") → 'YYYY-MM-DD', '' if unparseable."""
+    m = str(month or "").strip().lower()
+    mi = _MONTHS.get(m[:3]) if m[:1].isalpha() else (int(m) if m.isdigit() else None)
+    try:
+        return date(int(str(year).strip()), mi, int(str(day).strip())).isoformat()
+    except (TypeError, ValueError):
+        return ""
+
+
+def _pad(row):
+    row = list(row)
+    if len(row) < ROW_WIDTH:
+        row += [""] * (ROW_WIDTH - len(row))
+    return row
+
+
+def _row_hash(cells) -> str:
+    return hashlib.sha1(json.dumps(cells, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def _worksheet_key(sheet) -> str:
+    spreadsheet = getattr(sheet, "spreadsheet", None)
+    return f"{getattr(spreadsheet, 'id', '')}/{getattr(sheet, 'id', '')}"
+
+
+def _remote_version(sheet):
+    """Drive lastUpdateTime of the spreadsheet, or None when it can't be read."""
+    spreadsheet = getattr(sheet, "spreadsheet", None)
+    if spreadsheet is None:
+        return None
+    try:
+        getter = getattr(spreadsheet, "get_lastUpdateTime", None)
+        value = getter() if callable(getter) else getattr(spreadsheet, "lastUpdateTime", None)
+        return str(value) if value else None
+    except Exception as e:
+        print(f"⚠️ Could not read Master lastUpdateTime: {e}")
+        return None
+
+
+_RANGE_RE = re.compile(r"(?:.*!)?([A-Z]+\d+)(?::([A-Z]+\d+))?$")
+
+
+def _parse_range(a1):
+    """'A12:P12' / "'Master Events'!A5:P9" / 'P7' → (row, col, end_row, end_col), 1-based."""
+    m = _RANGE_RE.match((a1 or "").replace("$", ""))
+    if not m:
+        raise ValueError(f"unsupported range: {a1!r}")
+    r1, c1 = a1_to_rowcol(m.group(1))
+    r2, c2 = a1_to_rowcol(m.group(2)) if m.group(2) else (r1, c1)
+    return r1, c1, r2, c2
+
+
+def records_from_values(grid):
+    """get_all_values() grid → get_all_records()-shaped dicts, so one read serves both."""
+    headers = grid[0] if grid else []
+    out = []
+    for row in grid[1:]:
+        row = list(row[:len(headers)]) + [""] * (len(headers) - len(row))
+        out.append(dict(zip(headers, numericise_all(row, default_blank=""))))
+    return out
+
+
+class MasterMirror:
+    def __init__(self, path=MIRROR_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _db(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+        return self._conn
+
+    def _meta(self, key, default=None):
+        row = self._db().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def _set_meta(self, db, **values):
+        db.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                       [(k, v) for k, v in values.items()])
+
+    def headers(self):
+        return json.loads(self._meta("headers", "[]"))
+
+    # ── sync ──────────────────────────────────────────────────────────
+    def is_current(self, sheet, version=None) -> bool:
+        version = version if version is not None else _remote_version(sheet)
+        with self._lock:
+            return (
+                version is not None
+                and self._meta("worksheet") == _worksheet_key(sheet)
+                and self._meta("version") == version
+                and self._meta("dirty", "0") == "0"
+            )
+
+    def sync(self, sheet, force=False):
+        """
+        Bring the mirror up to date with `sheet`. Returns "current" (nothing
+        read) or "refreshed" (one get_all_values, changed rows rewritten).
+        """
+        version = _remote_version(sheet)
+        if not force and self.is_current(sheet, version):
+            print("🪞 Master mirror is current (no sheet read)")
+            return "current"
+        values = sheet.get_all_values()
+        changed = self.load_grid(values, sheet=sheet, version=version)
+        print(f"🪞 Master mirror refreshed: {changed} changed rows of {max(len(values) - 1, 0)}")
+        return "refreshed"
+
+    def load_grid(self, values, sheet=None, version=None) -> int:
+        """Replace the mirror with a get_all_values() grid; only changed rows are rewritten."""
+        headers = list(values[0]) if values else []
+        rows = values[1:] if values else []
+        with self._lock:
+            db = self._db()
+            known = dict(db.execute("SELECT row_num, row_hash FROM rows"))
+            upserts = []
+            for i, row in enumerate(rows, start=2):
+                cells = _pad(row)
+                h = _row_hash(cells)
+                if known.get(i) != h:
+                    upserts.append(self._record(i, cells, h))
+            db.execute("BEGIN")
+            try:
+                self._write_rows(db, upserts)
+                db.execute("DELETE FROM rows WHERE row_num > ?", (len(rows) + 1,))
+                self._set_meta(
+                    db,
+                    headers=json.dumps(headers),
+                    worksheet=_worksheet_key(sheet) if sheet is not None else "",
+                    version=version or "",
+                    dirty="0" if version else "1",
+                    synced_at=str(time.time()),
+                )
+                db.execute("COMMIT")
+            except Exception:
+                db.execute("ROLLBACK")
+                raise
+        return len(upserts)
+
+    def mark_synced(self, sheet):
+        """
+        After our own writes: remember the sheet's new version as already
+        mirrored. An invalidate() during the run (e.g. a failed read-back) sticks.
+        """
+        version = _remote_version(sheet)
+        with self._lock:
+            db = self._db()
+            if version:
+                self._set_meta(db, version=version)
+            else:
+                self._set_meta(db, version="", dirty="1")
+
+    def settle(self, sheet, clean):
+        """
+        After the last write of a run. `clean` is is_current() taken right
+        before the first write: only then is the new version all ours.
+        """
+        if clean:
+            self.mark_synced(sheet)
+        else:
+            print("🪞 Master changed since the mirror sync; it will be re-read next run")
+            self.invalidate()
+
+    def invalidate(self):
+        """Force the next sync() to re-read the sheet."""
+        with self._lock:
+            self._set_meta(self._db(), dirty="1")
+
+    # ── local writes (mirroring what was just sent to Sheets) ─────────
+    def _record(self, row_num, cells, row_hash=None):
+        link = (cells[COL_LINK] or "").strip()
+        return (
+            row_num,
+            link,
+            library_for_link(link) or "",
+            _event_date(cells[COL_MONTH], cells[COL_DAY], cells[COL_YEAR]),
+            cells[COL_TIME],
+            cells[COL_STATUS],
+            cells[COL_ROW_STATUS],
+            cells[COL_SITE_SYNC],
+            row_hash or _row_hash(cells),
+            json.dumps(cells, ensure_ascii=False),
+        )
+
+    def _write_rows(self, db, records):
+        db.executemany(
+            "INSERT OR REPLACE INTO rows (row_num, link, library, event_date, time, event_status, "
+            "status, site_sync_status, row_hash, cells) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            records,
+        )
+
+    def apply_values(self, updates):
+        """Mirror batch_update payloads: [{"range": "A12:P12" | "P7", "values": [[...], ...]}]."""
+        if not updates:
+            return
+        with self._lock:
+            db = self._db()
+            touched = {}
+            for update in updates:
+                r1, c1, _, _ = _parse_range(update["range"])
+                for dr, values in enumerate(update["values"]):
+                    row_num = r1 + dr
+                    if row_num < 2:
+                        continue
+                    cells = touched.get(row_num)
+                    if cells is None:
+                        hit = db.execute("SELECT cells FROM rows WHERE row_num = ?", (row_num,)).fetchone()
+                        cells = _pad(json.loads(hit[0]) if hit else [])
+                    for dc, value in enumerate(values):
+                        col = c1 - 1 + dc
+                        if col >= len(cells):
+                            cells += [""] * (col + 1 - len(cells))
+                        cells[col] = "" if value is None else str(value)
+                    touched[row_num] = cells
+            self._write_rows(db, [self._record(r, c) for r, c in touched.items()])
+
+    def apply_append(self, response, rows, sheet=None):
+        """
+        Mirror append_rows(rows) using the updatedRange Sheets reported. With
+        `sheet`, the range is read back first: USER_ENTERED appends are parsed
+        by Sheets (numbers, dates, formulas), so the strings we sent aren't
+        necessarily what the sheet now holds. Read errors propagate.
+        """
+        if not rows:
+            return
+        try:
+            a1 = response["updates"]["updatedRange"]
+            r1, _, _, _ = _parse_range(a1)
+        except Exception:
+            print("⚠️ append_rows gave no updatedRange; Master mirror will re-read next run")
+            self.invalidate()
+            return
+        if sheet is not None:
+            block = sheet.batch_get([a1])[0]
+            stored = [list(block[i]) if i < len(block) else [] for i in range(len(rows))]
+            rows = [row + [""] * (len(sent) - len(row)) for row, sent in zip(stored, rows)]
+        self.apply_values([{"range": f"A{r1}", "values": rows}])
+
+    # ── reads ─────────────────────────────────────────────────────────
+    def _rows(self, sql="SELECT row_num, cells FROM rows ORDER BY row_num", params=()):
+        with self._lock:
+            return [(n, json.loads(c)) for n, c in self._db().execute(sql, params)]
+
+    def values(self):
+        """get_all_values()-shaped grid (header row first, gaps kept as empty rows)."""
+        grid = [self.headers()]
+        for row_num, cells in self._rows():
+            while len(grid) < row_num - 1:
+                grid.append([""] * ROW_WIDTH)
+            grid.append(cells)
+        return grid
+
+    def records(self):
+        """get_all_records()-shaped dicts (numeric strings numericised like gspread)."""
+        return records_from_values(self.values())
+
+    def snapshot(self, clean_link):
+        """The dict upload_to_sheets._diff_events_against_snapshot expects (full rows)."""
+        link_to_row_index = {}
+        existing_data = {}
+        for row_num, cells in self._rows():
+            if not cells[COL_LINK]:
+                continue
+            link = clean_link(cells[COL_LINK].strip())
+            link_to_row_index[link] = row_num
+            existing_data[link] = cells
+        return {
+            "headers": self.headers(),
+            "link_to_row_index": link_to_row_index,
+            "existing_data": existing_data,
+            "partial": False,
+        }
+
+    def query(self, library=None, sync_status=None, date_from=None, date_to=None, link=None):
+        """Rows matching every given filter → [(row_num, cells)]; dates are 'YYYY-MM-DD'."""
+        where, params = [], []
+        if library is not None:
+            where.append("library = ?"); params.append(library)
+        if sync_status is not None:
+            where.append("lower(site_sync_status) = lower(?)"); params.append(sync_status)
+        if date_from is not None:
+            where.append("event_date >= ?"); params.append(date_from)
+        if date_to is not None:
+            where.append("event_date != '' AND event_date <= ?"); params.append(date_to)
+        if link is not None:
+            where.append("link = ?"); params.append(link)
+        sql = "SELECT row_num, cells FROM rows"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        return self._rows(sql + " ORDER BY row_num", params)
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_mirror = None
+_mirror_lock = threading.Lock()
+
+
+def get_mirror():
+    """Process-wide mirror (None when MASTER_MIRROR_DISABLED is set)."""
+    global _mirror
+    if MIRROR_DISABLED:
+        return None
+    with _mirror_lock:
+        if _mirror is None:
+            _mirror = MasterMirror()
+        return _mirror
@@ -0,0 +1,127 @@
+# sheets_client.py
+"""
+Process-wide gspread client and worksheet handles.
+
+The service-account credentials are read and authorized once per process;
+spreadsheets are opened once (open-by-name costs a Drive search) and
+worksheets resolved once, then reused by every upload/export in the run:
+
+    sheet = sheets_client.worksheet("Master Events", key=MASTER_SPREADSHEET_ID,
+                                    name=MASTER_SPREADSHEET_NAME)
+
+The access token is refreshed before handing out the client when it has
+expired (gspread's session also refreshes on its own during long runs).
+clear() drops every handle, e.g. after a worksheet was renamed.
+
+set_backend(fake_sheets.FakeBackend(...)) swaps Google for an offline
+stand-in (benchmarks, dry runs); set_backend(None) goes back to Google.
+"""
+import json
+import os
+import threading
+
+import gspread
+from google.auth.transport.requests import Request
+from google.oauth2 import service_account
+
+import sheets_io
+
+SCOPES = (
+    "https://www.googleapis.com/auth/spreadsheets",
+    "https://www.googleapis.com/auth/drive",
+)
+SECRET_PATH = "/etc/secrets/GOOGLE_APPLICATION_CREDENTIALS_JSON"
+
+_lock = threading.RLock()
+_creds = None
+_client = None
+_spreadsheets = {}   # ("key", id) / ("name", title) → Spreadsheet
+_worksheets = {}     # (spreadsheet cache key, worksheet title) → Worksheet
+_backend = None      # set_backend(): object with client() and worksheet(name, key=, name=)
+
+
+def _credentials_info():
+    creds_json = os.environ.get("GOOGLE_APPLICATION_CREDENTIALS_JSON")
+    if not creds_json:
+        if os.path.exists(SECRET_PATH):
+            with open(SECRET_PATH, "r") as f:
+                creds_json = f.read()
+    if not creds_json:
+        raise RuntimeError("GOOGLE_APPLICATION_CREDENTIALS_JSON env var not set")
+    return json.loads(creds_json)
+
+
+def _refresh_if_needed(creds):
+    if not creds.valid:
+        creds.refresh(Request())
+
+
+def set_backend(backend):
+    """Serve worksheets from `backend` instead of Google (None = Google again)."""
+    global _backend
+    clear()
+    with _lock:
+        _backend = backend
+
+
+def get_client():
+    """Authorized gspread client (authenticates on first use only)."""
+    global _creds, _client
+    with _lock:
+        if _backend is not None:
+            return _backend.client()
+        if _client is None:
+            _creds = service_account.Credentials.from_service_account_info(
+                _credentials_info(), scopes=list(SCOPES)
+            )
+            _client = gspread.authorize(_creds)
+            print("🔑 Authorized Google Sheets client")
+        try:
+            _refresh_if_needed(_creds)
+        except Exception as e:
+            print(f"⚠️ Token refresh failed ({e}); gspread will retry on the next request")
+        return _client
+
+
+def credentials():
+    """The service-account credentials behind get_client() (e.g. for Drive uploads)."""
+    get_client()
+    return _creds
+
+
+def spreadsheet(key=None, name=None):
+    """Spreadsheet by key (preferred) or by title; opened once per process."""
+    cache_key = ("key", key) if key else ("name", name)
+    with _lock:
+        book = _spreadsheets.get(cache_key)
+        if book is None:
+            client = get_client()
+            if key:
+                book = sheets_io.read(client.open_by_key, key)
+            else:
+                book = sheets_io.read(client.open, name)
+            _spreadsheets[cache_key] = book
+        return book
+
+
+def worksheet(worksheet_name, key=None, name=None):
+    """Worksheet handle in spreadsheet key/name; resolved once per process."""
+    cache_key = (("key", key) if key else ("name", name), worksheet_name)
+    with _lock:
+        if _backend is not None:
+            return _backend.worksheet(worksheet_name, key=key, name=name)
+        ws = _worksheets.get(cache_key)
+        if ws is None:
+            ws = sheets_io.read(spreadsheet(key=key, name=name).worksheet, worksheet_name)
+            _worksheets[cache_key] = ws
+        return ws
+
+
+def clear():
+    """Forget the client and every handle (next call re-authenticates)."""
+    global _creds, _client
+    with _lock:
+        _creds = None
+        _client = None
+        _spreadsheets.clear()
+        _worksheets.clear()
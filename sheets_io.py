@@ -0,0 +1,167 @@
+# sheets_io.py
+"""
+One process-wide scheduler for Google Sheets calls.
+
+Every read/write goes through read()/write(), which
+  - keep each kind under its per-minute quota (sliding 60 s window shared by
+    all threads, so back-to-back or concurrent library uploads queue up
+    instead of tripping 429s),
+  - retry 429 / 5xx with jittered exponential backoff (Retry-After honored),
+    and pause every caller of that kind while Sheets is throttling us.
+
+    values = sheets_io.read(sheet.get_all_values)
+    sheets_io.write(sheet.batch_update, requests)
+
+WriteBatch queues updates/appends for one worksheet and flushes them as few
+requests as possible: duplicate ranges collapse (last write wins), updates
+go out in chunks of WRITE_MAX_RANGES ranges, queued appends become one
+append_rows per value_input_option.
+
+Appends aren't idempotent, so they are only retried on 429 (Sheets rejected
+the request); a 5xx on an append is raised instead of risking duplicate rows.
+"""
+import os
+import random
+import threading
+import time
+from collections import deque
+
+from rate_limiter import parse_retry_after
+
+READS_PER_MIN = int(os.environ.get("SHEETS_READS_PER_MIN", "55"))     # quota is 60/user/min
+WRITES_PER_MIN = int(os.environ.get("SHEETS_WRITES_PER_MIN", "55"))
+MAX_RETRIES = int(os.environ.get("SHEETS_MAX_RETRIES", "6"))
+BASE_BACKOFF = float(os.environ.get("SHEETS_BASE_BACKOFF", "2"))
+MAX_BACKOFF = 64.0
+WINDOW = 60.0
+WRITE_MAX_RANGES = int(os.environ.get("SHEETS_WRITE_MAX_RANGES", "500"))
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class _MinuteWindow:
+    """At most `limit` calls in any WINDOW seconds; pause() holds everyone back."""
+
+    def __init__(self, limit):
+        self.limit = max(1, limit)
+        self._calls = deque()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self._calls and now - self._calls[0] >= WINDOW:
+                    self._calls.popleft()
+                wait = self._paused_until - now
+                if wait <= 0 and len(self._calls) < self.limit:
+                    self._calls.append(now)
+                    return
+                if wait <= 0:
+                    wait = WINDOW - (now - self._calls[0])
+            time.sleep(min(max(wait, 0.05), WINDOW))
+
+    def pause(self, seconds):
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+_windows = {
+    "read": _MinuteWindow(READS_PER_MIN),
+    "write": _MinuteWindow(WRITES_PER_MIN),
+}
+
+
+def _status_of(exc):
+    """HTTP status of a gspread APIError (or anything carrying .response); None otherwise."""
+    response = getattr(exc, "response", None)
+    code = getattr(response, "status_code", None)
+    if code is None:
+        code = getattr(exc, "code", None)
+    try:
+        return int(code) if code is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _retry_after(exc):
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    try:
+        return parse_retry_after(headers.get("Retry-After"))
+    except Exception:
+        return None
+
+
+def call(fn, *args, kind="read", idempotent=True, **kwargs):
+    """Run fn(*args, **kwargs) inside the `kind` quota, retrying throttling/server errors."""
+    window = _windows[kind]
+    for attempt in range(MAX_RETRIES + 1):
+        window.acquire()
+        try:
+            return fn(*args, **kwargs)
+        except Exception as e:
+            status = _status_of(e)
+            retryable = status == 429 or (idempotent and status in RETRY_STATUSES)
+            if not retryable or attempt == MAX_RETRIES:
+                raise
+            delay = _retry_after(e)
+            if delay is None:
+                delay = min(MAX_BACKOFF, BASE_BACKOFF * (2 ** attempt)) * random.uniform(0.5, 1.5)
+            if status == 429:
+                window.pause(delay)
+            name = getattr(fn, "__name__", "call")
+            print(f"⏳ Sheets {status} on {name}; retry {attempt + 1}/{MAX_RETRIES} in {delay:.1f}s")
+            time.sleep(delay)
+
+
+def read(fn, *args, **kwargs):
+    return call(fn, *args, kind="read", **kwargs)
+
+
+def write(fn, *args, idempotent=True, **kwargs):
+    return call(fn, *args, kind="write", idempotent=idempotent, **kwargs)
+
+
+class WriteBatch:
+    """Queued writes for one worksheet, sent as few requests as possible by flush()."""
+
+    def __init__(self, sheet):
+        self.sheet = sheet
+        self._updates = {}    # range → values (insertion order kept, last write wins)
+        self._appends = {}    # value_input_option → rows
+
+    def update(self, requests):
+        for request in requests or ():
+            rng = request["range"]
+            self._updates.pop(rng, None)
+            self._updates[rng] = request["values"]
+        return self
+
+    def append(self, rows, value_input_option="USER_ENTERED"):
+        if rows:
+            self._appends.setdefault(value_input_option, []).extend(rows)
+        return self
+
+    def __len__(self):
+        return len(self._updates) + sum(len(rows) for rows in self._appends.values())
+
+    def flush(self, on_update=None, on_append=None):
+        """
+        Send queued writes. on_update(chunk) runs after each batch_update,
+        on_append(response, rows) after each append_rows (e.g. to mirror them).
+        """
+        updates = [{"range": rng, "values": values} for rng, values in self._updates.items()]
+        self._updates = {}
+        for i in range(0, len(updates), WRITE_MAX_RANGES):
+            chunk = updates[i:i + WRITE_MAX_RANGES]
+            write(self.sheet.batch_update, chunk)
+            if on_update is not None:
+                on_update(chunk)
+
+        appends, self._appends = self._appends, {}
+        for value_input_option, rows in appends.items():
+            response = write(self.sheet.append_rows, rows,
+                             value_input_option=value_input_option, idempotent=False)
+            if on_append is not None:
+                on_append(response, rows)
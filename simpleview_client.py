@@ -0,0 +1,79 @@
+# simpleview_client.py
+"""
+Shared client for Simpleview CMS event APIs (visitchesapeake, visitnewportnews).
+
+The site token is fetched once and reused for the client's lifetime (refreshed
+only if the API rejects it), and plugins_events_events_by_date is paged with
+large `limit`s so a whole date range comes back in a handful of requests:
+
+    client = SimpleviewClient(BASE_URL, HEADERS)
+    for page in client.iter_event_pages(filter_, options, start_iso, end_iso):
+        docs.extend(format_data(page))
+"""
+import json
+import os
+import threading
+
+import http_client
+
+PAGE_SIZE = int(os.environ.get("SIMPLEVIEW_PAGE_SIZE", "200"))
+MAX_PAGES = 200  # safety guard per query
+
+
+class SimpleviewClient:
+    def __init__(self, base_url, headers, cookies=None, token_headers=None):
+        self.base_url = base_url.rstrip("/")
+        self.headers = headers
+        self.cookies = cookies
+        self.token_headers = token_headers or headers
+        self._token = None
+        self._lock = threading.Lock()
+
+    def token(self, refresh=False):
+        """Site token from /plugins/core/get_simple_token/, cached after the first call."""
+        with self._lock:
+            if self._token is None or refresh:
+                url = f"{self.base_url}/plugins/core/get_simple_token/"
+                response = http_client.get(url, headers=self.token_headers)
+                response.raise_for_status()
+                self._token = response.text.strip()
+            return self._token
+
+    def _find(self, payload):
+        url = f"{self.base_url}/includes/rest_v2/plugins_events_events_by_date/find/"
+        for attempt in range(2):
+            params = {"json": json.dumps(payload, separators=(",", ":")), "token": self.token(refresh=attempt > 0)}
+            response = http_client.get(url, headers=self.headers, cookies=self.cookies, params=params)
+            # stale token → fetch a new one and retry once
+            if response.status_code in (401, 403) and attempt == 0:
+                continue
+            response.raise_for_status()
+            return response.json()
+
+    def iter_event_pages(self, filter_, options, start_iso, end_iso, page_size=PAGE_SIZE):
+        """
+        Yield raw JSON responses for every page of events in [start_iso, end_iso].
+        `filter_`/`options` are the site-specific payload parts; date_range,
+        skip and limit are filled in here. Pages until an empty page or, when the
+        response carries docs.count (options count=True), until skip reaches it;
+        a short page is not the end, since the server may cap `limit`.
+        """
+        skip = 0
+        for _ in range(MAX_PAGES):
+            payload = {
+                "filter": dict(filter_, date_range={
+                    "start": {"$date": start_iso},
+                    "end": {"$date": end_iso},
+                }),
+                "options": dict(options, skip=skip, limit=page_size),
+            }
+            page = self._find(payload)
+            body = (page or {}).get("docs") or {}
+            docs = body.get("docs") or []
+            if not docs:
+                return
+            yield page
+            skip += len(docs)
+            total = body.get("count")
+            if isinstance(total, int) and skip >= total:
+                return
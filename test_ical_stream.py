@@ -0,0 +1,42 @@
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import ical_stream
+
+EASTERN = ZoneInfo("America/New_York")
+
+
+def _feed(*lines):
+    return "\r\n".join(["BEGIN:VCALENDAR", "BEGIN:VEVENT", *lines, "END:VEVENT", "END:VCALENDAR"]) + "\r\n"
+
+
+def test_quoted_tzid_with_colon():
+    text = _feed(
+        "UID:1",
+        'DTSTART;TZID="(UTC-05:00) Eastern Time (US & Canada)":20261020T180000',
+        "SUMMARY:Evening program",
+    )
+    (ev,) = ical_stream.iter_vevents(text)
+    assert ev.begin == datetime(2026, 10, 20, 18, 0, tzinfo=EASTERN)
+    assert ev.tzid == "(UTC-05:00) Eastern Time (US & Canada)"
+
+
+def test_quoted_altrep_keeps_value():
+    text = _feed(
+        "UID:2",
+        "DTSTART:20261020T180000Z",
+        'DESCRIPTION;ALTREP="http://x.com/a":Hello',
+    )
+    (ev,) = ical_stream.iter_vevents(text)
+    assert ev.description == "Hello"
+
+
+def test_unknown_tzid_falls_back_to_eastern():
+    text = _feed("UID:3", "DTSTART;TZID=Custom Zone 42:20261020T180000")
+    (ev,) = ical_stream.iter_vevents(text)
+    assert ev.begin.astimezone(EASTERN).hour == 18
+
+
+def test_split_content_line():
+    assert ical_stream.split_content_line('X;A="a:b":c:d') == ('X;A="a:b"', "c:d")
+    assert ical_stream.split_content_line("SUMMARY:Hi: there") == ("SUMMARY", "Hi: there")
@@ -1,13 +1,17 @@
 from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor
 import os
-import gspread
-from google.oauth2 import service_account
 import traceback
 from config import get_library_config
-import json
 import re
-from constants import LIBRARY_CONSTANTS, TITLE_KEYWORD_TO_CATEGORY, UNWANTED_TITLE_KEYWORDS
-from constants import COMBINED_KEYWORD_TO_CATEGORY
+from constants import TITLE_KEYWORD_TO_CATEGORY, UNWANTED_TITLE_KEYWORDS
+from keyword_matcher import CATEGORY_KEYWORDS
+import library_rules
+import age_spans
+import sheet_mirror
+import sheets_io
+import sheets_client
+from library_rules import split_categories, TITLE_KEYWORD_TAGS, COMBINED_KEYWORD_TAGS
 
 import pandas as pd
 
@@ -18,10 +22,20 @@ MASTER_SPREADSHEET_NAME = os.environ.get("MASTER_SPREADSHEET_NAME", "Master Even
 MASTER_WORKSHEET_NAME = os.environ.get("MASTER_WORKSHEET_NAME", "Master Events")
 MASTER_LOG_WORKSHEET_NAME = os.environ.get("MASTER_LOG_WORKSHEET_NAME", "Master Events Log")  # optional
 
+# How the Master snapshot is read: "mirror" = local SQLite mirror (sheet_mirror),
+# re-read only when the sheet changed; "index" = only the columns the diff needs
+# (link, status, time, date, row status, site sync), full rows fetched on demand;
+# "full" = one get_all_values() of the whole grid.
+MASTER_SNAPSHOT_READ = os.environ.get("MASTER_SNAPSHOT_READ", "mirror").lower()
+
+# === Enrichment stage (enrich_events) ===
+ENRICH_WORKERS = int(os.environ.get("ENRICH_WORKERS", str(os.cpu_count() or 1)))  # 1 = always in-process
+ENRICH_POOL_MIN = int(os.environ.get("ENRICH_POOL_MIN", "1000"))      # smaller batches aren't worth the fork
+ENRICH_CHUNK_SIZE = int(os.environ.get("ENRICH_CHUNK_SIZE", "250"))
+
 
 # --- protect a single label that contains commas so we don't split it ---
-SPECIAL_MULTIWORD = "List - All Seasons > List - Cosplay Anime Comics"
-PLACEHOLDER = "LIST_COSPLAY_ANIME_COMICS"  # something that will never appear naturally
+from library_rules import SPECIAL_MULTIWORD, PLACEHOLDER
 
 SYNTHESIZE_SINGLE_FOR = {"visitchesapeake", "visitnewportnews", "visitnorfolk", "visityorktown"}
 PLACEHOLDER_1159_FOR = {"visitnorfolk", "visityorktown"}
@@ -358,61 +372,17 @@ def _clean_link(url: str) -> str:
     return cleaned.replace("://", ":::").replace("//", "/").replace(":::", "://")
 
 
-import os, json
-from google.oauth2 import service_account
-
 def connect_to_sheet(spreadsheet_name, worksheet_name):
-    creds_json = os.environ.get("GOOGLE_APPLICATION_CREDENTIALS_JSON")
-    if not creds_json:
-        secret_path = "/etc/secrets/GOOGLE_APPLICATION_CREDENTIALS_JSON"
-        if os.path.exists(secret_path):
-            with open(secret_path, "r") as f:
-                creds_json = f.read()
-    if not creds_json:
-        raise RuntimeError("GOOGLE_APPLICATION_CREDENTIALS_JSON env var not set")
-
-    creds_dict = json.loads(creds_json)
-    creds = service_account.Credentials.from_service_account_info(
-        creds_dict,
-        scopes=[
-            "https://www.googleapis.com/auth/spreadsheets",
-            "https://www.googleapis.com/auth/drive",
-        ],
-    )
-    client = gspread.authorize(creds)
-
+    """Worksheet handle from the process-wide cache (authenticates/opens once per run)."""
     # 👇 Master override
     if USE_MASTER_SHEET:
-        if MASTER_SPREADSHEET_ID:
-            return client.open_by_key(MASTER_SPREADSHEET_ID).worksheet(MASTER_WORKSHEET_NAME)
-        return client.open(MASTER_SPREADSHEET_NAME).worksheet(MASTER_WORKSHEET_NAME)
+        return sheets_client.worksheet(MASTER_WORKSHEET_NAME, key=MASTER_SPREADSHEET_ID, name=MASTER_SPREADSHEET_NAME)
 
     # per-library fallback
-    return client.open(spreadsheet_name).worksheet(worksheet_name)
+    return sheets_client.worksheet(worksheet_name, name=spreadsheet_name)
 
 def connect_to_master_sheet(worksheet_name):
-    creds_json = os.environ.get("GOOGLE_APPLICATION_CREDENTIALS_JSON")
-    if not creds_json:
-        secret_path = "/etc/secrets/GOOGLE_APPLICATION_CREDENTIALS_JSON"
-        if os.path.exists(secret_path):
-            with open(secret_path, "r") as f:
-                creds_json = f.read()
-    if not creds_json:
-        raise RuntimeError("GOOGLE_APPLICATION_CREDENTIALS_JSON env var not set")
-
-    creds_dict = json.loads(creds_json)
-    creds = service_account.Credentials.from_service_account_info(
-        creds_dict,
-        scopes=[
-            "https://www.googleapis.com/auth/spreadsheets",
-            "https://www.googleapis.com/auth/drive",
-        ],
-    )
-    client = gspread.authorize(creds)
-
-    if MASTER_SPREADSHEET_ID:
-        return client.open_by_key(MASTER_SPREADSHEET_ID).worksheet(worksheet_name)
-    return client.open(MASTER_SPREADSHEET_NAME).worksheet(worksheet_name)
+    return sheets_client.worksheet(worksheet_name, key=MASTER_SPREADSHEET_ID, name=MASTER_SPREADSHEET_NAME)
 
 
 def normalize(row):
@@ -424,90 +394,11 @@ def _kw_hit(text: str, kw: str) -> bool:
     # match kw as a whole word/phrase (no letter/number touching it)
     return re.search(rf'(?<!\w){re.escape(k)}(?!\w)', t) is not None
 
-# --- Units-aware age & grade parsing helpers ---
-
-MONTH_WORDS = r"(?:months?|mos?|mths?|mo|m)"
-YEAR_WORDS  = r"(?:years?|yrs?|y)"
-
-def _grade_to_year_range(g: int):
-    # crude but reliable mapping: K≈5-5.99 (we’ll treat 'K' separately), Grade N ≈ (N+5) to (N+5.99)
-    start = g + 5
-    return (start, start + 0.99)
+# --- Units-aware age & grade parsing (shared single-scan extractor) ---
 
 def _extract_year_spans(text: str):
-    """
-    Returns a list of (min_years, max_years) tuples derived from months/years/grades in text.
-    Months are converted to years. Also recognizes Pre-K/K/Grades and school level phrases.
-    """
-    t = (text or "").lower()
-    spans = []
-
-    # --- MONTHS FIRST (ranges, then singles) ---
-    for m in re.finditer(rf"(\d{{1,2}})\s*(?:[-–]|to)\s*(\d{{1,2}})\s*{MONTH_WORDS}\b", t, flags=re.I):
-        a, b = int(m.group(1))/12.0, int(m.group(2))/12.0
-        spans.append((a, b))
-
-    for m in re.finditer(rf"(\d{{1,2}})\s*{MONTH_WORDS}\b", t, flags=re.I):
-        v = int(m.group(1))/12.0
-        spans.append((v, v))
-
-    # --- EXPLICIT YEARS ---
-    # (1) year range like "3–5 years"
-    for m in re.finditer(rf"(\d{{1,2}})\s*[-–]\s*(\d{{1,2}})\s*{YEAR_WORDS}\b", t, flags=re.I):
-        a, b = int(m.group(1)), int(m.group(2))
-        spans.append((a, b))
-
-    # generic "ages: X[-–|to]Y" (or "ages X[-–|to]Y") WITHOUT months
-    for m in re.finditer(
-        rf"""
-        ages?\s*[: ]*                           # allow optional colon after 'age/ages'
-        (?!\d+\s*(?:[-–]|to)\s*\d+\s*{MONTH_WORDS}\b)   # not "ages 12–24 months" OR "ages 12 to 24 months"
-        (?!\d+\s*{MONTH_WORDS}\b)                      # not "ages 12 months"
-        (?!\d+\s*to\s*\d+\s*{MONTH_WORDS}\b)           # extra guard: not "ages 6 to 24 months"
-        (\d{{1,2}})(?:\s*(?:[-–]|to)\s*(\d{{1,2}}))?
-        \b
-        """,
-        t, flags=re.I | re.X
-    ):
-        a = int(m.group(1)); b = int(m.group(2) or a)
-        spans.append((a, b))
-
-
-    # (3) "X+ years" — also guard against "X+ months"
-    for m in re.finditer(rf"(\d{{1,2}})\s*\+\s*(?:{YEAR_WORDS})?(?!\s*{MONTH_WORDS})\b", t, flags=re.I):
-        a = int(m.group(1)); spans.append((a, 99))
-
-    # (3b) "X and above / X and up / X and over / X or older" (treat like 'X+'), BUT not months
-    for m in re.finditer(
-        rf"""
-        (?:age|ages|target\s*age)?\s*[: ]*
-        (\d{{1,2}})
-        (?!\s*{MONTH_WORDS}\b)                 # don't match "12 months and older"
-        \s*(?:and\s+(?:above|over|up)|or\s+older)\b
-        """,
-        t, flags=re.I | re.X
-    ):
-        a = int(m.group(1))
-        # Keep this clamp if you DON'T want 'Adults 18+' added for phrases like "16 and up".
-        # If you do want Adults in those cases, change 17.99 to 99.
-        hi = 17.99 if 12 <= a <= 17 else 99
-        spans.append((a, hi))
-
-
-    # --- GRADES & SCHOOL LEVELS ---
-    if re.search(r"\b(pre[-\s]?k|prek|prekinder(?:garten)?)\b", t): spans.append((3.0, 4.99))
-    if re.search(r"\bkindergarten\b|\bK\b", t, re.I): spans.append((5.0, 5.99))
-    for m in re.finditer(r"grades?\s*(\d{1,2})(?:\s*[-–]\s*(\d{1,2}))?\b", t, flags=re.I):
-        g1 = int(m.group(1)); g2 = int(m.group(2) or g1)
-        a1, b1 = _grade_to_year_range(g1); a2, b2 = _grade_to_year_range(g2)
-        spans.append((min(a1, a2), max(b1, b2)))
-    if re.search(r"\belementary\b", t):      spans.append((5.0, 10.99))
-    if re.search(r"\bmiddle\s+school\b", t): spans.append((11.0, 13.99))
-    if re.search(r"\bhigh\s+school\b", t):   spans.append((14.0, 17.99))
-    if re.search(r"\btween[s]?\b", t):       spans.append((9.0, 12.99))
-    if re.search(r"\bteen[s]?\b", t):        spans.append((12.0, 17.99))
-
-    return spans
+    """(min_years, max_years) spans from months/years/grades/school levels — see age_spans."""
+    return age_spans.extract_year_spans(text)
 
 def _spans_to_audience_tags(spans):
     """Map aggregated year spans into audience tags using our policy cutoffs."""
@@ -538,6 +429,675 @@ def _spans_to_audience_tags(spans):
     return list(dict.fromkeys(tags))
 
 
+# Columns the diff reads without the full row (0-based A:P positions → A1 letters)
+_INDEX_COLUMN_RANGES = (
+    ((1, 2, 3), "B2:D"),      # Event Link, Event Status, Time
+    ((6, 7, 8), "G2:I"),      # Month, Day, Year
+    ((14, 15), "O2:P"),       # Status, Site Sync Status
+)
+
+
+def _read_master_snapshot(sheet, read_mode=None):
+    """
+    Master grid → headers + link lookups.
+    Keys are _clean_link(Event Link); row indexes are 1-based sheet rows.
+    read_mode "full" = one get_all_values(); "index" = see _read_master_index;
+    "mirror" (MASTER_SNAPSHOT_READ default) = sheet_mirror, falling back to "index".
+    """
+    read_mode = (read_mode or MASTER_SNAPSHOT_READ).lower()
+    if read_mode == "mirror":
+        mirror = sheet_mirror.get_mirror()
+        if mirror is not None:
+            try:
+                sheets_io.read(mirror.sync, sheet)
+                snapshot = mirror.snapshot(_clean_link)
+                snapshot["mirror"] = mirror
+                return snapshot
+            except Exception as e:
+                print(f"⚠️ Master mirror unavailable ({e}); reading the sheet")
+        read_mode = "index"
+    if read_mode == "index":
+        try:
+            return _read_master_index(sheet)
+        except Exception as e:
+            print(f"⚠️ Column-restricted snapshot read failed ({e}); reading the full grid")
+
+    rows = sheets_io.read(sheet.get_all_values)
+    headers = rows[0] if rows else []
+    existing_rows = rows[1:]
+
+    for i, row in enumerate(existing_rows):
+        if len(row) < 16:
+            print(f"[WARN] Row {i + 2} too short: {len(row)} cols → {row}")
+            row += [""] * (16 - len(row))
+
+    link_to_row_index = {}
+    existing_data = {}
+
+    for idx, row in enumerate(existing_rows):
+        if len(row) <= 1:
+            continue
+        clean_link = _clean_link(row[1].strip())
+        link_to_row_index[clean_link] = idx + 2
+        existing_data[clean_link] = row
+
+    return {
+        "headers": headers,
+        "link_to_row_index": link_to_row_index,
+        "existing_data": existing_data,
+        "partial": False,
+    }
+
+
+def _read_master_index(sheet):
+    """
+    One batch_get of the header plus the B:D, G:I and O:P columns — no
+    descriptions or categories. existing_data rows are 16 wide with only those
+    cells filled. That is enough for the diff: links already on the sheet are
+    skipped as duplicates, so no existing row is ever compared in full.
+    """
+    ranges = ["A1:P1"] + [a1 for _, a1 in _INDEX_COLUMN_RANGES]
+    header_block, *column_blocks = sheets_io.read(sheet.batch_get, ranges)
+    headers = list(header_block[0]) if header_block else []
+
+    n_rows = max((len(block) for block in column_blocks), default=0)
+    existing_rows = [[""] * 16 for _ in range(n_rows)]
+    for (positions, _), block in zip(_INDEX_COLUMN_RANGES, column_blocks):
+        for r, values in enumerate(block):
+            row = existing_rows[r]
+            for pos, value in zip(positions, values):
+                row[pos] = value
+
+    link_to_row_index = {}
+    existing_data = {}
+    for idx, row in enumerate(existing_rows):
+        if not row[1]:
+            continue
+        clean_link = _clean_link(row[1].strip())
+        link_to_row_index[clean_link] = idx + 2
+        existing_data[clean_link] = row
+
+    print(f"📇 Master index: {len(existing_data)} links from {n_rows} rows (columns B:D, G:I, O:P)")
+    return {
+        "headers": headers,
+        "link_to_row_index": link_to_row_index,
+        "existing_data": existing_data,
+        "partial": True,
+    }
+
+
+def _enrichment_context(library, age_to_categories=None, name_suffix_map=None):
+    """Per-library lookups enrich_events needs (compiled tables from library_rules)."""
+    rules = library_rules.rules_for(library)
+    return {
+        "config": get_library_config(library),
+        "program_type_to_categories": rules.program_type_to_categories,
+        "venue_names_map_lc": rules.venue_names_lc,
+        "age_to_categories": library_rules.compile_category_map(age_to_categories) if age_to_categories else rules.age_to_categories,
+        "name_suffix_map": name_suffix_map or rules.name_suffix_map,
+        "always_on": rules.always_on_categories,
+    }
+
+
+def _enrich_event(event, library, ctx):
+    """
+    One scraped event → finished row data (no sheet access). Returns a dict:
+    link, skip (reason to drop it, or None), row_core (A:M), needs_attention and
+    the raw status/date/time values the diff compares against the sheet.
+    """
+    raw_link = (event.get("Event Link", "") or "").strip()
+    if not raw_link:
+        return {"link": "", "skip": f"⚠️  Skipping malformed event (missing link): {event.get('Event Name','')}"}
+
+    link = _clean_link(raw_link)
+
+    title_for_filter = (event.get("Event Name", "") or "").strip()
+    if _has_unwanted_title(title_for_filter):
+        return {"link": link, "skip": f"⏭️ Skipping (unwanted title): {title_for_filter}"}
+
+    # === Exclude unwanted events for specific scrapers ===
+    if library in ["visitsuffolk", "portsvaevents", "visitnewportnews", "visithampton", "visitchesapeake"]:
+        exclude_keywords = ["live", "patio"]
+        name_text = (event.get("Event Name", "") or "").lower()
+        desc_text = (event.get("Event Description", "") or "").lower()
+        if any(kw in name_text for kw in exclude_keywords) or any(kw in desc_text for kw in exclude_keywords):
+            return {"link": link, "skip": f"⏭️ Skipping (excluded keyword): {event.get('Event Name')}"}
+
+    config = ctx["config"]
+    program_type_to_categories = ctx["program_type_to_categories"]
+    venue_names_map_lc = ctx["venue_names_map_lc"]
+    age_to_categories = ctx["age_to_categories"]
+    name_suffix_map = ctx["name_suffix_map"]
+    always_on = ctx["always_on"]
+
+    # 0) Start from what the scraper provided
+    scraper_cats = list(split_categories(event.get("Categories", "")))
+
+    # 1) Program-type based categories
+    program_type = event.get("Program Type", "")
+    title_for_filter = (event.get("Event Name") or "").strip()
+
+    if library == "ppl":
+        programtype_cats = list(scraper_cats)
+        if not programtype_cats:
+            programtype_cats = list(split_categories("Audience > Audience - Family Event, Audience > Audience - Free Event, Audience > Audience - Preschool Age, Audience > Audience - School Age, Event Location (Category) > Event Location - Portsmouth"))
+    elif library == "hpl":
+        program_types = [pt.strip().lower() for pt in program_type.split(",") if pt.strip()]
+        matched_tags = []
+        for pt in program_types:
+            cat = program_type_to_categories.get(pt)
+            if cat:
+                matched_tags.extend(cat)
+        programtype_cats = list(dict.fromkeys(matched_tags))
+    else:
+        programtype_cats = list(program_type_to_categories.get(program_type, ()))
+
+    # 2) Age-based categories (mapped + fuzzy)
+    ages_raw = event.get("Ages", "") or ""
+    audience_keys = [a.strip() for a in ages_raw.split(",") if a.strip()]
+
+    mapped_age_tags = []
+    if age_to_categories:
+        for tag in audience_keys:
+            tags = age_to_categories.get(tag)
+            if tags:
+                mapped_age_tags.extend(tags)
+
+    desc_value = (
+        event.get("Event Description")
+        or event.get("Description")
+        or event.get("Desc")
+        or event.get("Event Details")
+        or ""
+    )
+    title_text = (event.get("Event Name", "") or "")
+    age_haystack = f"{title_text} {desc_value} {ages_raw}"
+    # normalize fancy dashes/hyphens so K–5/K—5/K-5 all behave like K-5
+    age_haystack = (
+        age_haystack
+        .replace("\u2011", "-")  # non-breaking hyphen
+        .replace("\u2012", "-")
+        .replace("\u2013", "-")  # en dash
+        .replace("\u2014", "-")  # em dash
+    )
+    is_school_age_phrase  = re.search(r"\bschool age\b", age_haystack, re.I)
+    mentions_elementary   = re.search(r"\belementary\b", age_haystack, re.I)
+    
+    # Elementary → School Age (accept K/kindergarten and 1–5, with "-" or "to")
+    mentions_grades_elm = re.search(
+        r"\bgrades?\s*(k|kindergarten|[1-5])(st|nd|rd|th)?(?:\s*(?:-|to)\s*(k|kindergarten|[1-5])(st|nd|rd|th)?)?\b",
+        age_haystack,
+        re.I
+    )
+
+    mentions_high_school   = re.search(r"\bhigh\s+school\b", age_haystack, re.I)
+    mentions_middle_school = re.search(r"\bmiddle\s+school\b", age_haystack, re.I)
+    age_tags = _spans_to_audience_tags(_extract_year_spans(age_haystack))
+
+    def _has_audience_tag(tags):
+        return any((t or "").startswith("Audience -") for t in tags)
+
+    age_combined = list(mapped_age_tags)
+    if age_tags and not _has_audience_tag(mapped_age_tags):
+        age_combined.extend(age_tags)
+
+    # 3) Keyword tags (single + paired)
+    full_text = f"{event.get('Event Name', '')} {desc_value}".lower()
+    title_text_l = (event.get("Event Name", "") or "").lower()
+
+    # one automaton pass per text instead of one regex per keyword (same _kw_hit rules)
+    full_hits = CATEGORY_KEYWORDS.hits(full_text)
+    title_hits = CATEGORY_KEYWORDS.hits(title_text_l) | full_hits
+    title_based_tags = []
+    for keyword, tags in TITLE_KEYWORD_TAGS:
+        if keyword in title_hits:
+            title_based_tags.extend(tags)
+
+    for (kw1, kw2), tags in COMBINED_KEYWORD_TAGS:
+        if kw1 in full_hits and kw2 in full_hits:
+            title_based_tags.extend(tags)
+
+    # 4) Always-on tags for this library
+    tag_list = []
+    tag_list.extend(scraper_cats)
+    tag_list.extend(programtype_cats)
+    tag_list.extend(age_combined)
+    tag_list.extend(title_based_tags)
+    if always_on:
+        tag_list.extend(always_on)
+
+    # ✅ add the School Age tag based on grades K–5 detection
+    if (is_school_age_phrase or mentions_elementary or mentions_grades_elm) and not (mentions_high_school or mentions_middle_school):
+        _ensure(tag_list, "Audience > Audience - School Age")
+
+    # --- YPL: always add base tags ---
+    if library == "ypl":
+        _ensure(tag_list, "Audience > Audience - Free Event")
+        _ensure(tag_list, "Event Location (Category) > Event Location - Yorktown / York County")
+
+    # 5) Fallback if nothing at all
+    if not tag_list:
+        raw_location = (event.get("Location", "") or "").strip()
+        fallback_city = ""
+        for city in ("Norfolk", "Virginia Beach", "Chesapeake", "Portsmouth", "Hampton", "Newport News", "Suffolk"):
+            if city.lower() in raw_location.lower():
+                fallback_city = city
+                break
+        tag_list.append(
+            f"Event Location (Category) > Event Location - {fallback_city}, Audience > Audience - Free Event"
+            if fallback_city else "Audience > Audience - Free Event"
+        )
+
+    # VBPL debug (optional)
+    if library == "vbpl":
+        title_l = (event.get("Event Name","") or "").lower()
+        hay_l   = f"{title_l} {(desc_value or '').lower()} {(ages_raw or '').lower()}"
+        if "baby" in title_l or "months" in hay_l:
+            print("DBG VBPL:", event.get("Event Name"),
+                  "| spans:", _extract_year_spans(hay_l),
+                  "| age_tags:", age_tags,
+                  "| program_type:", program_type,
+                  "| title_kw_hits:", [k for k in TITLE_KEYWORD_TO_CATEGORY if k in (CATEGORY_KEYWORDS.hits(title_l) | CATEGORY_KEYWORDS.hits(hay_l))])
+            
+    # Remove preschool tag for "Just 2s / Just 2's" titles
+    tag_list = _strip_preschool_for_just2s(event.get("Event Name", ""), tag_list)
+
+    # Remove infant/toddler + parent & me tags for Preschool Storytime titles
+    tag_list = _strip_infant_parentme_for_preschool_storytime(event.get("Event Name", ""), tag_list)
+
+    # Remove Family tag for "Babies in Bloom"
+    tag_list = _strip_family_for_babies_in_bloom(event.get("Event Name", ""), tag_list)
+
+    # Remove incorrect Storytimes when VBPL titles say "Open Play"
+    if library == "vbpl":
+        tag_list = _strip_storytime_for_open_play(event.get("Event Name", ""), tag_list)
+
+    # Remove Halloween tags from November/December events
+    month_val = event.get("Month", "")
+    tag_list = _strip_halloween_from_late_events(month_val, tag_list)
+
+    # Remove school-age tag for "3s Please" titles
+    tag_list = _strip_schoolage_for_3splease(event.get("Event Name", ""), tag_list)
+
+    # Final clean & dedupe
+    categories = ", ".join(dict.fromkeys([t.replace("\u00A0", " ").replace("Â", "").strip() for t in tag_list if t.strip()]))
+
+    # --- Hampton (VisitHampton) custom rule: mark library events as free ---
+    if library == "visithampton":
+        venue = (event.get("Venue", "") or "").lower()
+        location = (event.get("Location", "") or "").lower()
+        if "library" in venue or "library" in location:
+            if "Audience > Audience - Free Event" not in categories:
+                categories += ", Audience > Audience - Free Event"
+                print(f"🏷️ Added Free Event tag (library venue) → {event.get('Event Name')}")
+
+    # === Normalize title and (maybe) suffix ===
+    name_original = event.get("Event Name", "")
+    name_without_at = re.sub(r"\s*@\s*[^@,;:\\/]+", "", name_original, flags=re.IGNORECASE).strip()
+    if library == "visithampton":
+        name_cleaned = name_without_at
+    else:
+        name_cleaned = re.sub(r"\s+at\s+.*", "", name_without_at, flags=re.IGNORECASE).strip()
+
+    if library == "visithampton":
+        pref_loc = (event.get("Venue", "") or "").strip() or (event.get("Location", "") or "").strip()
+    else:
+        pref_loc = (event.get("Location", "") or "").strip()
+
+    suffix = config.get("event_name_suffix", "")
+    loc_clean = re.sub(r"^Library Branch:", "", pref_loc).strip()
+    display_loc = name_suffix_map.get(loc_clean, loc_clean)
+
+    base_name = name_cleaned.lower()
+    loc_lower = display_loc.lower()
+    suffix_lower = (suffix or "").lower()
+
+    if base_name.endswith(loc_lower) or suffix_lower in base_name:
+        event_name = f"{name_cleaned}"
+    else:
+        event_name = f"{name_cleaned} at {display_loc}"
+    if suffix and suffix not in event_name:
+        event_name += suffix
+
+    if not categories:
+        categories = event.get("Categories", "") or f"Event Location (Category) > Event Location - {config['organizer_name']}, Audience > Audience - Free Event, Audience > Audience - Family Event"
+
+    # Decide sheet location (Column F)
+    organizer = (event.get("Organizer", "") or "").strip().lower()
+    if library == "visithampton" and organizer == "fort monroe national monument":
+        raw_location = "Fort Monroe Visitor & Education Center"
+    elif library == "visithampton":
+        raw_location = (event.get("Venue", "") or "").strip()
+    else:
+        raw_location = (event.get("Location", "") or "").strip()
+
+    if library == "visitchesapeake":
+        raw_location = _strip_room_suffix(raw_location)
+
+    loc_key = re.sub(r"^Library Branch:", "", raw_location).strip()
+    venue_map_present = bool(venue_names_map_lc)
+    venue_in_map      = venue_map_present and (loc_key.lower() in venue_names_map_lc)
+    sheet_location    = venue_names_map_lc.get(loc_key.lower(), loc_key)
+
+    time_str = _normalize_time_for_upload(
+        event.get("Time", ""),
+        library,
+        event.get("Year"), event.get("Month"), event.get("Day")
+    )
+
+    row_core = [
+        event_name,
+        link,
+        event.get("Event Status", ""),
+        time_str,
+        event.get("Ages", ""),
+        sheet_location,
+        event.get("Month", ""),
+        event.get("Day", ""),
+        event.get("Year", ""),
+        desc_value,
+        event.get("Series", ""),
+        program_type,
+        categories
+    ]
+    # --- Needs-Attention logic ---
+    t = (time_str or "").strip().lower()
+    title = (event.get("Event Name") or "")
+
+    enforce_venue_map     = (library in ENFORCE_VENUE_MAP_FOR)
+    missing_mapped_venue  = enforce_venue_map and venue_map_present and (not venue_in_map)
+
+    is_all_day     = ("all day" in t) or ("ongoing" in t)
+    start_present  = bool(re.search(r"\b\d{1,2}(:\d{2})?\s*[ap]m\b", t, re.I))
+    has_end        = bool(re.search(r"\b\d{1,2}(:\d{2})?\s*[ap]m\b\s*[-–—]\s*\d{1,2}(:\d{2})?\s*[ap]m\b", t, re.I))
+    missing_end_time = (not is_all_day) and start_present and (not has_end)
+
+    missing_desc  = not (desc_value or "").strip()
+    missing_loc   = not (sheet_location or "").strip()
+    invalid_time  = not _has_valid_time_str(time_str)
+    is_exhibit    = "exhibit" in title.lower()
+
+    needs_attention = any([
+        missing_desc,
+        missing_loc,
+        invalid_time,
+        is_exhibit,
+        missing_mapped_venue,
+        missing_end_time
+    ])
+
+    return {
+        "link": link,
+        "skip": None,
+        "row_core": row_core,
+        "needs_attention": needs_attention,
+        "event_status": event.get("Event Status", ""),
+        "month": event.get("Month", ""),
+        "day": event.get("Day", ""),
+        "year": event.get("Year", ""),
+        "time": event.get("Time", ""),
+    }
+
+
+def _enrich_safely(event, library, ctx):
+    try:
+        return _enrich_event(event, library, ctx)
+    except Exception as e:
+        return {
+            "link": _clean_link((event.get("Event Link", "") or "").strip()),
+            "skip": None,
+            "error": f"💥 Error processing event '{event.get('Event Name','')}' ({event.get('Event Link','')}): {e}",
+        }
+
+
+def _enrich_chunk(args):
+    """Process-pool worker: (library, events, age_to_categories, name_suffix_map) → enriched list."""
+    library, events, age_to_categories, name_suffix_map = args
+    ctx = _enrichment_context(library, age_to_categories, name_suffix_map)
+    return [_enrich_safely(event, library, ctx) for event in events]
+
+
+def _chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def enrich_libraries(events_by_library, workers=None, age_to_categories=None, name_suffix_map=None):
+    """
+    {library: events} → {library: enriched list} (same order as the events).
+    With workers > 1 and at least ENRICH_POOL_MIN events in total, chunks of
+    every library are spread over one process pool; otherwise runs in-process.
+    Caller-supplied age/suffix maps apply to every library passed in.
+    """
+    workers = ENRICH_WORKERS if workers is None else workers
+    jobs = []
+    for library, events in events_by_library.items():
+        events = list(events or [])
+        for chunk in _chunks(events, ENRICH_CHUNK_SIZE):
+            jobs.append((library, chunk, age_to_categories, name_suffix_map))
+
+    total = sum(len(job[1]) for job in jobs)
+    results = None
+    if workers > 1 and total >= ENRICH_POOL_MIN and len(jobs) > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as executor:
+                results = list(executor.map(_enrich_chunk, jobs))
+            print(f"⚙️ Enriched {total} events in {len(jobs)} chunks on {min(workers, len(jobs))} processes")
+        except Exception as e:
+            print(f"⚠️ Process-pool enrichment failed ({e}); enriching in-process")
+            results = None
+    if results is None:
+        results = [_enrich_chunk(job) for job in jobs]
+
+    enriched = {library: [] for library in events_by_library}
+    for (library, _, _, _), chunk_result in zip(jobs, results):
+        enriched[library].extend(chunk_result)
+    return enriched
+
+
+def enrich_events(events, library, workers=None, age_to_categories=None, name_suffix_map=None):
+    """
+    Pure enrichment stage: categories, audience tags, title suffix, venue and time
+    normalization for one library's events, with no sheet access. Each item has
+    "link", "skip" (message, or None), and for kept events "row_core" (A:M) and
+    "needs_attention"; failures carry "error". See enrich_libraries for workers.
+    """
+    library = (library or "").lower()
+    return enrich_libraries(
+        {library: events}, workers=workers,
+        age_to_categories=age_to_categories, name_suffix_map=name_suffix_map,
+    )[library]
+
+
+def _begin_master_writes(sheet, snapshot):
+    """
+    Before the run's first write (Master or log tab): note whether the sheet
+    is still at the version the mirror synced, so _settle_mirror knows if
+    the version after our writes is all ours.
+    """
+    mirror = snapshot.get("mirror")
+    if mirror is not None and "mirror_clean" not in snapshot:
+        snapshot["mirror_clean"] = sheets_io.read(mirror.is_current, sheet)
+
+
+def _settle_mirror(sheet, snapshot):
+    """After the run's last write: adopt the new version, or re-read next run."""
+    mirror = snapshot.get("mirror")
+    if mirror is not None and "mirror_clean" in snapshot:
+        sheets_io.read(mirror.settle, sheet, snapshot["mirror_clean"])
+
+
+def _write_master_changes(sheet, snapshot, update_requests, new_rows):
+    """
+    batch_update + append_rows on the Master sheet through the quota-aware
+    scheduler (sheets_io), mirrored locally when the snapshot came from the mirror.
+    """
+    mirror = snapshot.get("mirror")
+    batch = sheets_io.WriteBatch(sheet).update(update_requests).append(new_rows, value_input_option="USER_ENTERED")
+    if not len(batch):
+        return
+    _begin_master_writes(sheet, snapshot)
+    batch.flush(
+        on_update=mirror.apply_values if mirror is not None else None,
+        on_append=_mirror_append(mirror, sheet) if mirror is not None else None,
+    )
+
+
+def _mirror_append(mirror, sheet):
+    """on_append for WriteBatch: mirror the rows as Sheets stored them (USER_ENTERED parses them)."""
+    def on_append(response, rows):
+        try:
+            sheets_io.read(mirror.apply_append, response, rows, sheet)
+        except Exception as e:
+            print(f"⚠️ Could not read back appended rows ({e}); Master mirror will re-read next run")
+            mirror.invalidate()
+    return on_append
+
+
+def _diff_events_against_snapshot(events, library, snapshot, seen_links, age_to_categories={}, name_suffix_map={}, enriched=None):
+    """
+    Diff one library's enriched events against a Master snapshot.
+    Returns new rows to append + A:P update requests; nothing is written here.
+    `seen_links` is shared (and mutated) so callers can de-dupe across libraries.
+    `enriched` is enrich_events() output for `events`; computed here if omitted.
+    """
+    if enriched is None:
+        enriched = enrich_events(events, library, workers=1,
+                                 age_to_categories=age_to_categories, name_suffix_map=name_suffix_map)
+
+    link_to_row_index = snapshot["link_to_row_index"]
+    existing_data = snapshot["existing_data"]
+
+    added = 0
+    updated = 0
+    skipped = 0
+    error_count = 0
+
+    new_rows = []
+    update_requests = []
+
+    for item in enriched:
+        try:
+            link = item["link"]
+            if not link:
+                print(item["skip"])
+                skipped += 1
+                continue
+
+            # NEW: prevent duplicates within the same upload run (same Event Link)
+            if link in seen_links:
+                print(f"⏭️ Skipping duplicate-in-run: {link}")
+                skipped += 1
+                continue
+
+            if item.get("skip"):
+                print(item["skip"])
+                skipped += 1
+                continue
+
+            if item.get("error"):
+                print(item["error"])
+                error_count += 1
+                continue
+
+            now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+            row_core = item["row_core"]
+            needs_attention = item["needs_attention"]
+            print("🧾 Raw row_core before normalize:", row_core)
+            new_core = normalize(row_core)
+
+            existing_row  = existing_data.get(link, [""] * 16)
+            existing_core = normalize(existing_row)
+
+            # --- Row status/state machine ---
+            if needs_attention:
+                site_sync_status = "NEEDS ATTENTION"
+                status = "review needed"
+            else:
+                status = "new"
+                site_sync_status = existing_row[15] if link in existing_data else "new"
+    
+            if link in existing_data:
+                existing_vals = {
+                    "status": existing_row[2],
+                    "month": existing_row[6],
+                    "day":   existing_row[7],
+                    "year":  existing_row[8],
+                    "time":  existing_row[3],
+                }
+                current_vals = {
+                    "status": item["event_status"],
+                    "month":  item["month"],
+                    "day":    item["day"],
+                    "year":   item["year"],
+                    "time":   item["time"]
+                }
+                changed_to_cancelled = (
+                    existing_vals["status"].lower() != current_vals["status"].lower()
+                    and current_vals["status"].lower() == "cancelled"
+                )
+                date_changed = (
+                    existing_vals["month"] != current_vals["month"]
+                    or existing_vals["day"] != current_vals["day"]
+                    or existing_vals["year"] != current_vals["year"]
+                )
+                time_changed = existing_vals["time"] != current_vals["time"]
+                if changed_to_cancelled or date_changed or time_changed:
+                    status = "updates needed"
+                    if site_sync_status == "on site":
+                        site_sync_status = "updates needed"
+                else:
+                    status = existing_row[14]
+                    site_sync_status = site_sync_status or ""
+    
+            full_row = new_core + [now, status, site_sync_status]
+    
+            if link not in existing_data:
+                print("🔍 New row to append:", full_row)
+                new_rows.append(full_row)
+                seen_links.add(link)   
+                added += 1
+            elif new_core != existing_core:
+                print(f"🔄 Updated row {link_to_row_index[link]}:", full_row)
+                row_index = link_to_row_index[link]
+                update_requests.append({
+                    "range": f"A{row_index}:P{row_index}",
+                    "values": [full_row]
+                })
+                updated += 1
+    
+        except Exception as e:
+            print(f"💥 Error processing event '{item.get('link', '')}': {e}")
+            # traceback.print_exc()  # uncomment if you want full stack
+            error_count += 1
+            continue
+
+    return {
+        "new_rows": new_rows,
+        "update_requests": update_requests,
+        "added": added,
+        "updated": updated,
+        "skipped": skipped,
+        "errors": error_count,
+    }
+
+
+def _log_upload_summaries(log_rows, spreadsheet_name, log_worksheet_name):
+    """Append summary rows ([time, mode, added, updated, skipped]) in one call."""
+    try:
+        if USE_MASTER_SHEET:
+            log_sheet = connect_to_master_sheet(log_worksheet_name)
+        else:
+            log_sheet = connect_to_sheet(spreadsheet_name, log_worksheet_name)
+
+        sheets_io.write(log_sheet.append_rows, log_rows, value_input_option="USER_ENTERED", idempotent=False)
+        for log_row in log_rows:
+            print(f"🪵 Logged summary to {log_worksheet_name}: {log_row}")
+    except Exception as e:
+        print(f"⚠️ Failed to log to {log_worksheet_name} tab: {e}")
+
+
 def upload_events_to_sheet(events, sheet=None, mode="full", library="vbpl", age_to_categories={}, name_suffix_map={}):
     library = (library or "").lower()
     config = get_library_config(library)
@@ -553,410 +1113,30 @@ def upload_events_to_sheet(events, sheet=None, mode="full", library="vbpl", age_
         WORKSHEET_NAME = MASTER_WORKSHEET_NAME
         LOG_WORKSHEET_NAME = MASTER_LOG_WORKSHEET_NAME
 
-    library_constants = LIBRARY_CONSTANTS.get(library, {})
-    program_type_to_categories = library_constants.get("program_type_to_categories", {})
-    venue_names_map_lc = {k.lower(): v for k, v in library_constants.get("venue_names", {}).items()}
-    age_to_categories = age_to_categories or library_constants.get("age_to_categories", {})
-    name_suffix_map = name_suffix_map or library_constants.get("name_suffix_map", {})
-    always_on = library_constants.get("always_on_categories", [])
-    
     try:
         if sheet is None:
             sheet = connect_to_sheet(SPREADSHEET_NAME, WORKSHEET_NAME)
 
-        rows = sheet.get_all_values()
-        headers = rows[0]
-        existing_rows = rows[1:]
-
-        for i, row in enumerate(existing_rows):
-            if len(row) < 16:
-                print(f"[WARN] Row {i + 2} too short: {len(row)} cols → {row}")
-                row += [""] * (16 - len(row))
-
-        link_to_row_index = {}
-        existing_data = {}
+        # enrich first (may use the process pool), then read the sheet right before diffing
+        enriched = enrich_events(
+            events, library,
+            age_to_categories=age_to_categories,
+            name_suffix_map=name_suffix_map,
+        )
 
-        for idx, row in enumerate(existing_rows):
-            if len(row) <= 1:
-                continue
-            clean_link = _clean_link(row[1].strip())
-            link_to_row_index[clean_link] = idx + 2
-            existing_data[clean_link] = row
+        snapshot = _read_master_snapshot(sheet)
+        headers = snapshot["headers"]
 
         # NEW: de-dupe guard for this run (sheet links + anything we queue below)
-        seen_links = set(existing_data.keys())
-
-        added = 0
-        updated = 0
-        skipped = 0
-
-        new_rows = []
-        update_requests = []
-
-        
-        for event in events:
-            try:
-                raw_link = (event.get("Event Link", "") or "").strip()
-                if not raw_link:
-                    print(f"⚠️  Skipping malformed event (missing link): {event.get('Event Name','')}")
-                    skipped += 1
-                    continue
-        
-                link = _clean_link(raw_link)
-
-                # NEW: prevent duplicates within the same upload run (same Event Link)
-                if link in seen_links:
-                    print(f"⏭️ Skipping duplicate-in-run: {link}")
-                    skipped += 1
-                    continue
-        
-                title_for_filter = (event.get("Event Name", "") or "").strip()
-                if _has_unwanted_title(title_for_filter):
-                    print(f"⏭️ Skipping (unwanted title): {title_for_filter}")
-                    skipped += 1
-                    continue
-        
-                # === Exclude unwanted events for specific scrapers ===
-                if library in ["visitsuffolk", "portsvaevents", "visitnewportnews", "visithampton", "visitchesapeake"]:
-                    exclude_keywords = ["live", "patio"]
-                    name_text = (event.get("Event Name", "") or "").lower()
-                    desc_text = (event.get("Event Description", "") or "").lower()
-                    if any(kw in name_text for kw in exclude_keywords) or any(kw in desc_text for kw in exclude_keywords):
-                        print(f"⏭️ Skipping (excluded keyword): {event.get('Event Name')}")
-                        skipped += 1
-                        continue
-        
-                now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        
-                # 0) Start from what the scraper provided
-                scraper_cats = [c.strip() for c in (event.get("Categories", "") or "").split(",") if c.strip()]
-        
-                # 1) Program-type based categories
-                program_type = event.get("Program Type", "")
-                title_for_filter = (event.get("Event Name") or "").strip()
-        
-                if library == "ppl":
-                    programtype_cats = [c.strip() for c in (event.get("Categories", "") or "").split(",") if c.strip()]
-                    if not programtype_cats:
-                        programtype_cats = [c.strip() for c in "Audience > Audience - Family Event, Audience > Audience - Free Event, Audience > Audience - Preschool Age, Audience > Audience - School Age, Event Location (Category) > Event Location - Portsmouth".split(",")]
-                elif library == "hpl":
-                    program_types = [pt.strip().lower() for pt in program_type.split(",") if pt.strip()]
-                    matched_tags = []
-                    for pt in program_types:
-                        cat = program_type_to_categories.get(pt)
-                        if cat:
-                            safe_cat = _protect_special_labels(cat)
-                            matched_tags.extend([_restore_special_labels(c.strip()) for c in safe_cat.split(",")])
-                    programtype_cats = list(dict.fromkeys(matched_tags))
-                else:
-                    base_pt = program_type_to_categories.get(program_type, "")
-                    programtype_cats = [c.strip() for c in base_pt.split(",") if c.strip()]
-        
-                # 2) Age-based categories (mapped + fuzzy)
-                ages_raw = event.get("Ages", "") or ""
-                audience_keys = [a.strip() for a in ages_raw.split(",") if a.strip()]
-        
-                mapped_age_tags = []
-                if age_to_categories:
-                    for tag in audience_keys:
-                        tags = age_to_categories.get(tag)
-                        if tags:
-                            mapped_age_tags.extend([t.strip() for t in tags.split(",")])
-        
-                desc_value = (
-                    event.get("Event Description")
-                    or event.get("Description")
-                    or event.get("Desc")
-                    or event.get("Event Details")
-                    or ""
-                )
-                title_text = (event.get("Event Name", "") or "")
-                age_haystack = f"{title_text} {desc_value} {ages_raw}"
-                # normalize fancy dashes/hyphens so K–5/K—5/K-5 all behave like K-5
-                age_haystack = (
-                    age_haystack
-                    .replace("\u2011", "-")  # non-breaking hyphen
-                    .replace("\u2012", "-")
-                    .replace("\u2013", "-")  # en dash
-                    .replace("\u2014", "-")  # em dash
-                )
-                is_school_age_phrase  = re.search(r"\bschool age\b", age_haystack, re.I)
-                mentions_elementary   = re.search(r"\belementary\b", age_haystack, re.I)
-                
-                # Elementary → School Age (accept K/kindergarten and 1–5, with "-" or "to")
-                mentions_grades_elm = re.search(
-                    r"\bgrades?\s*(k|kindergarten|[1-5])(st|nd|rd|th)?(?:\s*(?:-|to)\s*(k|kindergarten|[1-5])(st|nd|rd|th)?)?\b",
-                    age_haystack,
-                    re.I
-                )
-            
-                mentions_high_school   = re.search(r"\bhigh\s+school\b", age_haystack, re.I)
-                mentions_middle_school = re.search(r"\bmiddle\s+school\b", age_haystack, re.I)
-                age_tags = _spans_to_audience_tags(_extract_year_spans(age_haystack))
-        
-                def _has_audience_tag(tags):
-                    return any((t or "").startswith("Audience -") for t in tags)
-        
-                age_combined = list(mapped_age_tags)
-                if age_tags and not _has_audience_tag(mapped_age_tags):
-                    age_combined.extend(age_tags)
-        
-                # 3) Keyword tags (single + paired)
-                full_text = f"{event.get('Event Name', '')} {desc_value}".lower()
-                title_text_l = (event.get("Event Name", "") or "").lower()
-        
-                title_based_tags = []
-                for keyword, cat in TITLE_KEYWORD_TO_CATEGORY.items():
-                    if _kw_hit(title_text_l, keyword) or _kw_hit(full_text, keyword):
-                        safe_cat = _protect_special_labels(cat)
-                        title_based_tags.extend([_restore_special_labels(c.strip()) for c in safe_cat.split(",")])
-        
-                for (kw1, kw2), cat in COMBINED_KEYWORD_TO_CATEGORY.items():
-                    if _kw_hit(full_text, kw1) and _kw_hit(full_text, kw2):
-                        safe_cat = _protect_special_labels(cat)
-                        title_based_tags.extend([_restore_special_labels(c.strip()) for c in safe_cat.split(",")])
-        
-                # 4) Always-on tags for this library
-                tag_list = []
-                tag_list.extend(scraper_cats)
-                tag_list.extend(programtype_cats)
-                tag_list.extend(age_combined)
-                tag_list.extend(title_based_tags)
-                if always_on:
-                    tag_list.extend(always_on)
-
-                # ✅ add the School Age tag based on grades K–5 detection
-                if (is_school_age_phrase or mentions_elementary or mentions_grades_elm) and not (mentions_high_school or mentions_middle_school):
-                    _ensure(tag_list, "Audience > Audience - School Age")
-    
-                # --- YPL: always add base tags ---
-                if library == "ypl":
-                    _ensure(tag_list, "Audience > Audience - Free Event")
-                    _ensure(tag_list, "Event Location (Category) > Event Location - Yorktown / York County")
-
-                # 5) Fallback if nothing at all
-                if not tag_list:
-                    raw_location = (event.get("Location", "") or "").strip()
-                    fallback_city = ""
-                    for city in ("Norfolk", "Virginia Beach", "Chesapeake", "Portsmouth", "Hampton", "Newport News", "Suffolk"):
-                        if city.lower() in raw_location.lower():
-                            fallback_city = city
-                            break
-                    tag_list.append(
-                        f"Event Location (Category) > Event Location - {fallback_city}, Audience > Audience - Free Event"
-                        if fallback_city else "Audience > Audience - Free Event"
-                    )
-        
-                # VBPL debug (optional)
-                if library == "vbpl":
-                    title_l = (event.get("Event Name","") or "").lower()
-                    hay_l   = f"{title_l} {(desc_value or '').lower()} {(ages_raw or '').lower()}"
-                    if "baby" in title_l or "months" in hay_l:
-                        print("DBG VBPL:", event.get("Event Name"),
-                              "| spans:", _extract_year_spans(hay_l),
-                              "| age_tags:", age_tags,
-                              "| program_type:", program_type,
-                              "| title_kw_hits:", [k for k in TITLE_KEYWORD_TO_CATEGORY if _kw_hit(title_l, k) or _kw_hit(hay_l, k)])
-                        
-                # Remove preschool tag for "Just 2s / Just 2's" titles
-                tag_list = _strip_preschool_for_just2s(event.get("Event Name", ""), tag_list)
-
-                # Remove infant/toddler + parent & me tags for Preschool Storytime titles
-                tag_list = _strip_infant_parentme_for_preschool_storytime(event.get("Event Name", ""), tag_list)
-
-                # Remove Family tag for "Babies in Bloom"
-                tag_list = _strip_family_for_babies_in_bloom(event.get("Event Name", ""), tag_list)
-
-                # Remove incorrect Storytimes when VBPL titles say "Open Play"
-                if library == "vbpl":
-                    tag_list = _strip_storytime_for_open_play(event.get("Event Name", ""), tag_list)
-
-                # Remove Halloween tags from November/December events
-                month_val = event.get("Month", "")
-                tag_list = _strip_halloween_from_late_events(month_val, tag_list)
-
-                # Remove school-age tag for "3s Please" titles
-                tag_list = _strip_schoolage_for_3splease(event.get("Event Name", ""), tag_list)
-
-                # Final clean & dedupe
-                categories = ", ".join(dict.fromkeys([t.replace("\u00A0", " ").replace("Â", "").strip() for t in tag_list if t.strip()]))
-
-                # --- Hampton (VisitHampton) custom rule: mark library events as free ---
-                if library == "visithampton":
-                    venue = (event.get("Venue", "") or "").lower()
-                    location = (event.get("Location", "") or "").lower()
-                    if "library" in venue or "library" in location:
-                        if "Audience > Audience - Free Event" not in categories:
-                            categories += ", Audience > Audience - Free Event"
-                            print(f"🏷️ Added Free Event tag (library venue) → {event.get('Event Name')}")
-
-                # === Normalize title and (maybe) suffix ===
-                name_original = event.get("Event Name", "")
-                name_without_at = re.sub(r"\s*@\s*[^@,;:\\/]+", "", name_original, flags=re.IGNORECASE).strip()
-                if library == "visithampton":
-                    name_cleaned = name_without_at
-                else:
-                    name_cleaned = re.sub(r"\s+at\s+.*", "", name_without_at, flags=re.IGNORECASE).strip()
-        
-                if library == "visithampton":
-                    pref_loc = (event.get("Venue", "") or "").strip() or (event.get("Location", "") or "").strip()
-                else:
-                    pref_loc = (event.get("Location", "") or "").strip()
-        
-                suffix = config.get("event_name_suffix", "")
-                loc_clean = re.sub(r"^Library Branch:", "", pref_loc).strip()
-                display_loc = name_suffix_map.get(loc_clean, loc_clean)
-        
-                base_name = name_cleaned.lower()
-                loc_lower = display_loc.lower()
-                suffix_lower = (suffix or "").lower()
-        
-                if base_name.endswith(loc_lower) or suffix_lower in base_name:
-                    event_name = f"{name_cleaned}"
-                else:
-                    event_name = f"{name_cleaned} at {display_loc}"
-                if suffix and suffix not in event_name:
-                    event_name += suffix
-        
-                if not categories:
-                    categories = event.get("Categories", "") or f"Event Location (Category) > Event Location - {config['organizer_name']}, Audience > Audience - Free Event, Audience > Audience - Family Event"
-        
-                # Decide sheet location (Column F)
-                organizer = (event.get("Organizer", "") or "").strip().lower()
-                if library == "visithampton" and organizer == "fort monroe national monument":
-                    raw_location = "Fort Monroe Visitor & Education Center"
-                elif library == "visithampton":
-                    raw_location = (event.get("Venue", "") or "").strip()
-                else:
-                    raw_location = (event.get("Location", "") or "").strip()
-        
-                if library == "visitchesapeake":
-                    raw_location = _strip_room_suffix(raw_location)
-        
-                loc_key = re.sub(r"^Library Branch:", "", raw_location).strip()
-                venue_map_present = bool(venue_names_map_lc)
-                venue_in_map      = venue_map_present and (loc_key.lower() in venue_names_map_lc)
-                sheet_location    = venue_names_map_lc.get(loc_key.lower(), loc_key)
-        
-                time_str = _normalize_time_for_upload(
-                    event.get("Time", ""),
-                    library,
-                    event.get("Year"), event.get("Month"), event.get("Day")
-                )
-        
-                row_core = [
-                    event_name,
-                    link,
-                    event.get("Event Status", ""),
-                    time_str,
-                    event.get("Ages", ""),
-                    sheet_location,
-                    event.get("Month", ""),
-                    event.get("Day", ""),
-                    event.get("Year", ""),
-                    desc_value,
-                    event.get("Series", ""),
-                    program_type,
-                    categories
-                ]
-                print("🧾 Raw row_core before normalize:", row_core)
-                new_core = normalize(row_core)
-        
-                existing_row  = existing_data.get(link, [""] * 16)
-                existing_core = normalize(existing_row)
-        
-                # --- Needs-Attention logic ---
-                t = (time_str or "").strip().lower()
-                title = (event.get("Event Name") or "")
-        
-                enforce_venue_map     = (library in ENFORCE_VENUE_MAP_FOR)
-                missing_mapped_venue  = enforce_venue_map and venue_map_present and (not venue_in_map)
-        
-                is_all_day     = ("all day" in t) or ("ongoing" in t)
-                start_present  = bool(re.search(r"\b\d{1,2}(:\d{2})?\s*[ap]m\b", t, re.I))
-                has_end        = bool(re.search(r"\b\d{1,2}(:\d{2})?\s*[ap]m\b\s*[-–—]\s*\d{1,2}(:\d{2})?\s*[ap]m\b", t, re.I))
-                missing_end_time = (not is_all_day) and start_present and (not has_end)
-        
-                missing_desc  = not (desc_value or "").strip()
-                missing_loc   = not (sheet_location or "").strip()
-                invalid_time  = not _has_valid_time_str(time_str)
-                is_exhibit    = "exhibit" in title.lower()
-        
-                needs_attention = any([
-                    missing_desc,
-                    missing_loc,
-                    invalid_time,
-                    is_exhibit,
-                    missing_mapped_venue,
-                    missing_end_time
-                ])
-        
-                # --- Row status/state machine ---
-                if needs_attention:
-                    site_sync_status = "NEEDS ATTENTION"
-                    status = "review needed"
-                else:
-                    status = "new"
-                    site_sync_status = existing_row[15] if link in existing_data else "new"
-        
-                if link in existing_data:
-                    existing_vals = {
-                        "status": existing_row[2],
-                        "month": existing_row[6],
-                        "day":   existing_row[7],
-                        "year":  existing_row[8],
-                        "time":  existing_row[3],
-                    }
-                    current_vals = {
-                        "status": event.get("Event Status", ""),
-                        "month":  event.get("Month", ""),
-                        "day":    event.get("Day", ""),
-                        "year":   event.get("Year", ""),
-                        "time":   event.get("Time", "")
-                    }
-                    changed_to_cancelled = (
-                        existing_vals["status"].lower() != current_vals["status"].lower()
-                        and current_vals["status"].lower() == "cancelled"
-                    )
-                    date_changed = (
-                        existing_vals["month"] != current_vals["month"]
-                        or existing_vals["day"] != current_vals["day"]
-                        or existing_vals["year"] != current_vals["year"]
-                    )
-                    time_changed = existing_vals["time"] != current_vals["time"]
-                    if changed_to_cancelled or date_changed or time_changed:
-                        status = "updates needed"
-                        if site_sync_status == "on site":
-                            site_sync_status = "updates needed"
-                    else:
-                        status = existing_row[14]
-                        site_sync_status = site_sync_status or ""
-        
-                full_row = new_core + [now, status, site_sync_status]
-        
-                if link not in existing_data:
-                    print("🔍 New row to append:", full_row)
-                    new_rows.append(full_row)
-                    seen_links.add(link)   
-                    added += 1
-                elif new_core != existing_core:
-                    print(f"🔄 Updated row {link_to_row_index[link]}:", full_row)
-                    row_index = link_to_row_index[link]
-                    update_requests.append({
-                        "range": f"A{row_index}:P{row_index}",
-                        "values": [full_row]
-                    })
-                    updated += 1
-        
-            except Exception as e:
-                print(f"💥 Error processing event '{event.get('Event Name','')}' ({event.get('Event Link','')}): {e}")
-                # traceback.print_exc()  # uncomment if you want full stack
-                error_count += 1
-                continue
+        seen_links = set(snapshot["existing_data"].keys())
 
+        diff = _diff_events_against_snapshot(events, library, snapshot, seen_links, enriched=enriched)
+        new_rows = diff["new_rows"]
+        update_requests = diff["update_requests"]
+        added, updated, skipped = diff["added"], diff["updated"], diff["skipped"]
 
         if update_requests:
-            sheet.batch_update(update_requests)
+            _write_master_changes(sheet, snapshot, update_requests, [])
 
         # Export REVIEW NEEDED rows to CSV
         review_rows = [r for r in new_rows if "REVIEW NEEDED" in r[-1]]
@@ -975,21 +1155,14 @@ def upload_events_to_sheet(events, sheet=None, mode="full", library="vbpl", age_
         if new_rows:
             # Optional: comment this out if it's too chatty
             # print("🔍 Full row to upload:", full_row)
-            sheet.append_rows(new_rows, value_input_option="USER_ENTERED")
-        
-        try:
-            log_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            log_row = [log_time, mode, added, updated, (skipped + error_count)]
+            _write_master_changes(sheet, snapshot, [], new_rows)
         
-            if USE_MASTER_SHEET:
-                log_sheet = connect_to_master_sheet(LOG_WORKSHEET_NAME)
-            else:
-                log_sheet = connect_to_sheet(SPREADSHEET_NAME, LOG_WORKSHEET_NAME)
-        
-            log_sheet.append_row(log_row, value_input_option="USER_ENTERED")
-            print(f"🪵 Logged summary to {LOG_WORKSHEET_NAME}: {log_row}")
-        except Exception as e:
-            print(f"⚠️ Failed to log to {LOG_WORKSHEET_NAME} tab: {e}")
+        log_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        log_row = [log_time, mode, added, updated, (skipped + diff["errors"])]
+        # the log tab shares the spreadsheet's lastUpdateTime with Master
+        _begin_master_writes(sheet, snapshot)
+        _log_upload_summaries([log_row], SPREADSHEET_NAME, LOG_WORKSHEET_NAME)
+        _settle_mirror(sheet, snapshot)
 
         
         print(f"📦 {added} new events added.")
@@ -1004,6 +1177,71 @@ def upload_events_to_sheet(events, sheet=None, mode="full", library="vbpl", age_
         # raise
 
 
+def upload_libraries_to_sheet(events_by_library, sheet=None, mode="full"):
+    """
+    Multi-library upload for run_all_scrapers: enrich every library up front
+    (one process pool across all of them), read the Master snapshot ONCE, diff
+    every library against it, then write one batch_update + one append_rows.
+    `events_by_library` is {library: events}; dict order is processing order.
+    Per-library age/suffix maps come from LIBRARY_CONSTANTS.
+    """
+    if not USE_MASTER_SHEET:
+        # per-library sheets can't share a snapshot
+        for library, events in events_by_library.items():
+            upload_events_to_sheet(events, mode=mode, library=library)
+        return {}
+
+    summary = {}
+    try:
+        if sheet is None:
+            sheet = connect_to_sheet(MASTER_SPREADSHEET_NAME, MASTER_WORKSHEET_NAME)
+
+        events_by_library = {(library or "").lower(): events for library, events in events_by_library.items()}
+        enriched_by_library = enrich_libraries(events_by_library)
+
+        snapshot = _read_master_snapshot(sheet)
+        # Shared across libraries, so the result matches uploading them one after another
+        seen_links = set(snapshot["existing_data"].keys())
+
+        all_new_rows = []
+        all_update_requests = []
+        log_rows = []
+
+        for library, events in events_by_library.items():
+            try:
+                diff = _diff_events_against_snapshot(events, library, snapshot, seen_links,
+                                                     enriched=enriched_by_library[library])
+            except Exception as e:
+                print(f"❌ Diff failed for library='{library}': {e}")
+                traceback.print_exc()
+                continue
+
+            all_new_rows.extend(diff["new_rows"])
+            all_update_requests.extend(diff["update_requests"])
+            summary[library] = diff
+
+            log_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            log_rows.append([log_time, mode, diff["added"], diff["updated"], (diff["skipped"] + diff["errors"])])
+            print(f"🧮 {library.upper()}: {diff['added']} new, {diff['updated']} updated, {diff['skipped']} skipped")
+
+        _write_master_changes(sheet, snapshot, all_update_requests, all_new_rows)
+
+        if log_rows:
+            # the log tab shares the spreadsheet's lastUpdateTime with Master
+            _begin_master_writes(sheet, snapshot)
+            _log_upload_summaries(log_rows, MASTER_SPREADSHEET_NAME, MASTER_LOG_WORKSHEET_NAME)
+        _settle_mirror(sheet, snapshot)
+
+        print(f"📦 {len(all_new_rows)} new events added across {len(summary)} libraries.")
+        print(f"🔁 {len(all_update_requests)} existing events updated.")
+
+    except Exception as e:
+        print(f"❌ upload_libraries_to_sheet failed: {e}")
+        traceback.print_exc()
+
+    return summary
+
+
 def export_all_events_to_csv_and_email():
     LIBRARIES = [
         "vbpl",
@@ -1024,13 +1262,8 @@ def export_all_events_to_csv_and_email():
     for lib in LIBRARIES:
         print(f"📥 Fetching events from: {lib.upper()}")
         config = get_library_config(lib)
-        creds = service_account.Credentials.from_service_account_file(
-            "/etc/secrets/GOOGLE_APPLICATION_CREDENTIALS_JSON",
-            scopes=["https://www.googleapis.com/auth/spreadsheets"]
-        )
-        client = gspread.authorize(creds)
-        sheet = client.open(config["spreadsheet_name"]).worksheet(config["worksheet_name"])
-        rows = sheet.get_all_values()
+        sheet = sheets_client.worksheet(config["worksheet_name"], name=config["spreadsheet_name"])
+        rows = sheets_io.read(sheet.get_all_values)
         if not all_rows:
             all_rows.append(rows[0])  # headers once
         all_rows.extend(rows[1:])     # all events